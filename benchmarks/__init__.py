@@ -0,0 +1 @@
+# Offline benchmarks; run from the repo root, e.g. `python -m benchmarks.whisper_quantization --help`
@@ -0,0 +1,224 @@
+"""
+Benchmark the single-framing acoustic feature extractor against the previous
+librosa implementation (separate rms / zero_crossing_rate / spectral_centroid /
+effects.split passes plus Python pause loops) on 2-minute clips.
+
+    python -m benchmarks.acoustic_features --clips 5 --repeat 3
+
+Synthetic speech-like clips are used by default; pass --audio FILE to time a real recording.
+"""
+import argparse
+import time
+
+import librosa
+import numpy as np
+
+from evaluators.speaking_audio import (
+    compute_intonation_score,
+    compute_micro_timing,
+    extract_acoustic_features,
+    refine_pronunciation_with_word_confidence,
+)
+from utils.audio_normalizer import SAMPLE_RATE
+from utils.pitch import pitch_statistics, yin_pitch
+
+TRANSCRIPT = (
+    "Well, I would like to talk about a trip I took last summer. We went to the mountains, "
+    "and it was really relaxing. I think, overall, it was one of the best holidays I have had; "
+    "the weather was great and the people were friendly."
+)
+
+
+def legacy_extract_acoustic_features(y: np.ndarray, sr: int, transcript: str = "") -> dict:
+    """The librosa-based extractor this benchmark (and tests_acoustic_features) compares against."""
+    duration = librosa.get_duration(y=y, sr=sr)
+    intervals = librosa.effects.split(y, top_db=25)
+    pause_count = max(0, len(intervals) - 1)
+
+    # Pause durations and positions
+    pause_durations = []
+    pause_positions = []
+    for i in range(len(intervals) - 1):
+        gap_frames = (intervals[i + 1][0] - intervals[i][1])
+        gap = gap_frames / sr
+        if gap > 0:
+            pause_durations.append(gap)
+            mid = (intervals[i][1] + gap_frames // 2) / len(y)
+            pause_positions.append(mid)
+    avg_pause_duration = round(float(np.mean(pause_durations)), 2) if pause_durations else 0.0
+
+    # Voiced time to estimate speech rate (WPM proxy assuming 150 wpm fully voiced)
+    voiced_time = sum((end - start) / sr for start, end in intervals) if len(intervals) > 0 else 0.0
+    speech_rate = round((voiced_time / duration) * 150, 2) if duration > 0 else 0.0
+
+    # Pause distribution scoring (natural vs mid-sentence)
+    punctuation_marks = [",", ".", "?", "!", ";", ":"]
+    total_words = len(transcript.split())
+    punct_positions = []
+    if total_words > 0:
+        words = transcript.split()
+        cumulative = 0
+        for idx, w in enumerate(words):
+            cumulative += 1
+            if any(w.endswith(p) for p in punctuation_marks):
+                punct_positions.append(cumulative / total_words)
+    def _natural_pause_ratio():
+        if not pause_positions:
+            return 1.0
+        if not punct_positions:
+            return 0.7  # neutral when transcript lacks punctuation cues
+        naturals = 0
+        for p in pause_positions:
+            if any(abs(p - pp) < 0.05 for pp in punct_positions):
+                naturals += 1
+        return naturals / len(pause_positions)
+    natural_ratio = _natural_pause_ratio()
+    pause_distribution_score = round(8 - (1 - natural_ratio) * 4, 2) if pause_positions else 7.5
+    pause_distribution_score = max(4.0, min(8.0, pause_distribution_score))
+
+    # Rhythm consistency (lower CV of voiced segment lengths => better)
+    voiced_durations = [ (end - start) / sr for start, end in intervals ] if len(intervals) > 0 else []
+    if voiced_durations:
+        mean_v = np.mean(voiced_durations)
+        cv = np.std(voiced_durations) / mean_v if mean_v > 0 else 1.0
+    else:
+        cv = 1.0
+    if cv <= 0.25:
+        speech_rhythm_score = 8.0
+    elif cv <= 0.4:
+        speech_rhythm_score = 7.0
+    elif cv <= 0.55:
+        speech_rhythm_score = 6.0
+    else:
+        speech_rhythm_score = 5.0
+
+    # Hesitation & sentence flow
+    short_pauses = len([p for p in pause_durations if p < 0.25])
+    hesitation_score = max(4.0, min(8.0, 8 - (short_pauses * 0.2 + pause_count * 0.1)))
+    sentence_flow_score = round((pause_distribution_score + speech_rhythm_score) / 2, 2)
+
+    # Variability metrics
+    rms = librosa.feature.rms(y=y, frame_length=2048, hop_length=512)[0]
+    speech_variability = round(float(np.std(rms)), 4)
+    zcr = librosa.feature.zero_crossing_rate(y)[0]
+    energy_variation = round(float(np.std(zcr)), 4)
+
+    # Audio quality detection (noise, clipping, low volume)
+    peak = np.max(np.abs(y)) if len(y) else 0
+    rms_mean = float(np.mean(rms)) if len(rms) else 0.0
+    noise_floor = float(np.percentile(np.abs(y), 10)) if len(y) else 0.0
+    snr_proxy = peak / (noise_floor + 1e-4)
+    clipping_ratio = float(np.mean(np.abs(y) > 0.98)) if len(y) else 0.0
+    low_volume_penalty = 1.0 if rms_mean < 0.01 else 0.0
+    audio_quality_score = 8 - (clipping_ratio * 4) - low_volume_penalty
+    if snr_proxy < 5:
+        audio_quality_score -= 1.0
+    audio_quality_score = max(4.0, min(8.0, round(audio_quality_score, 2)))
+
+    # Pronunciation scoring (heuristic phoneme proxy)
+    # Use clarity + variability + ASR confidence
+    spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
+    centroid_var = float(np.std(spectral_centroid)) if len(spectral_centroid) else 0.0
+    clarity_factor = max(0.0, min(1.0, (snr_proxy / 20)))
+    phoneme_accuracy_auto = max(0.0, min(1.0, (clarity_factor * 0.5) + (1 - cv) * 0.3 + (1 - centroid_var / 1000) * 0.2))
+
+    # Word-level confidence refinement (if available)
+    word_timestamps = []
+    # Placeholder: derive simple timestamps from intervals as proxy
+    for start, end in intervals:
+        word_timestamps.append({"start": start / sr, "end": end / sr, "confidence": 0.8})
+    phoneme_accuracy_conf, mispronunciation_rate_conf, stress_accuracy_conf = refine_pronunciation_with_word_confidence(word_timestamps)
+    phoneme_accuracy = max(phoneme_accuracy_auto, phoneme_accuracy_conf)
+    mispronunciation_rate = round(max(0.0, 1 - phoneme_accuracy), 3)
+    stress_accuracy = round(min(1.0, max(stress_accuracy_conf, phoneme_accuracy * 0.8 + (speech_rhythm_score - 5) / 10)), 3)
+
+    pitch = pitch_statistics(yin_pitch(y, sr, intervals))
+    intonation_score = compute_intonation_score(pitch)
+    micro_timing_score = compute_micro_timing(word_timestamps)
+
+    # Confidence for pronunciation
+    pronunciation_confidence = max(0.0, min(1.0, (audio_quality_score / 8) * 0.5 + 0.5 * clarity_factor))
+
+    return {
+        "duration_sec": round(duration, 2),
+        "pause_count": pause_count,
+        "avg_pause_duration": avg_pause_duration,
+        "speech_rate": speech_rate,
+        "speech_variability": speech_variability,
+        "energy_variation": energy_variation,
+        "pause_distribution_score": pause_distribution_score,
+        "speech_rhythm_score": speech_rhythm_score,
+        "hesitation_score": round(hesitation_score, 2),
+        "sentence_flow_score": sentence_flow_score,
+        "phoneme_accuracy": round(phoneme_accuracy, 3),
+        "mispronunciation_rate": mispronunciation_rate,
+        "stress_accuracy": stress_accuracy,
+        "audio_quality_score": audio_quality_score,
+        "pronunciation_confidence": round(pronunciation_confidence, 3),
+        "intonation_score": intonation_score,
+        "pitch_range_semitones": pitch["range_semitones"],
+        "pitch_variability": pitch["variability_semitones"],
+        "micro_timing_score": micro_timing_score,
+    }
+
+
+
+
+def synthetic_speech(seconds: float, seed: int = 0, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Voiced bursts (harmonic tone + noise, varying pitch/loudness) separated by pauses."""
+    rng = np.random.default_rng(seed)
+    out = []
+    total = 0
+    while total < seconds * sr:
+        burst = int(rng.uniform(0.3, 2.5) * sr)
+        t = np.arange(burst) / sr
+        f0 = rng.uniform(100, 240) * (1 + 0.1 * np.sin(2 * np.pi * rng.uniform(0.5, 3) * t))
+        phase = 2 * np.pi * np.cumsum(f0) / sr
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 6)) * rng.uniform(0.05, 0.4)
+        voiced += rng.normal(0, 0.01, burst)
+        pause = rng.normal(0, 0.0005, int(rng.uniform(0.05, 1.2) * sr))
+        out += [voiced, pause]
+        total += burst + pause.size
+    return np.concatenate(out)[: int(seconds * sr)].astype(np.float32)
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=120.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--audio", default=None)
+    args = parser.parse_args()
+
+    if args.audio:
+        signals = [librosa.load(args.audio, sr=SAMPLE_RATE)[0]]
+    else:
+        signals = [synthetic_speech(args.seconds, seed=i) for i in range(args.clips)]
+
+    # Warm up librosa's numba kernels so compile time isn't billed to the legacy path
+    warm = synthetic_speech(2.0, seed=99)
+    legacy_extract_acoustic_features(warm, SAMPLE_RATE, TRANSCRIPT)
+    extract_acoustic_features(warm, TRANSCRIPT)
+
+    legacy_total = new_total = 0.0
+    for y in signals:
+        legacy_total += _time(lambda: legacy_extract_acoustic_features(y, SAMPLE_RATE, TRANSCRIPT), args.repeat)
+        new_total += _time(lambda: extract_acoustic_features(y, TRANSCRIPT), args.repeat)
+
+    print(f"clips={len(signals)} seconds/clip={signals[0].size / SAMPLE_RATE:.0f}")
+    print(f"legacy (librosa, 3 framings + loops): {legacy_total / len(signals) * 1000:.1f} ms/clip")
+    print(f"single framing (vectorised):          {new_total / len(signals) * 1000:.1f} ms/clip")
+    print(f"speed-up: {legacy_total / max(new_total, 1e-9):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
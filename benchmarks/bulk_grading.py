@@ -0,0 +1,80 @@
+"""
+Bulk reading / listening grading against one-at-a-time evaluation.
+
+    python -m benchmarks.bulk_grading --submissions 20000 --repeat 3
+
+Generates a 40-question key and random candidate submissions, then times
+evaluate_reading / evaluate_listening in a loop against the *_bulk functions
+and checks that both produce the same bands.
+"""
+import argparse
+import random
+import time
+
+from evaluators.listening import evaluate_listening, evaluate_listening_bulk
+from evaluators.reading import evaluate_reading, evaluate_reading_bulk
+
+TYPES = ["TRUE_FALSE_NOT_GIVEN", "MCQ", "FILL_IN_THE_BLANKS", "MATCHING_HEADINGS"]
+CHOICES = ["A", "B", "C", "D", "TRUE", "FALSE", "NOT GIVEN"]
+
+
+def make_cohort(n_submissions: int, n_questions: int = 40, seed: int = 0) -> tuple:
+    rng = random.Random(seed)
+    questions = [
+        {"question_id": f"q{i}", "answer_key": rng.choice(CHOICES), "type": TYPES[i % len(TYPES)]}
+        for i in range(1, n_questions + 1)
+    ]
+    submissions = []
+    for n in range(n_submissions):
+        skill = rng.random()
+        answers = {
+            q["question_id"]: q["answer_key"] if rng.random() < skill else rng.choice(CHOICES)
+            for q in questions
+        }
+        submissions.append({"submission_id": n, "user_answers": answers})
+    return questions, submissions
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--submissions", type=int, default=20000)
+    parser.add_argument("--questions", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    questions, submissions = make_cohort(args.submissions, args.questions)
+    key = {q["question_id"]: q["answer_key"] for q in questions}
+
+    cases = {
+        "reading": (
+            lambda: [evaluate_reading({"questions": questions, **s}) for s in submissions],
+            lambda: evaluate_reading_bulk({"questions": questions, "submissions": submissions})["results"],
+        ),
+        "listening": (
+            lambda: [evaluate_listening({"answer_key": key, **s}) for s in submissions],
+            lambda: evaluate_listening_bulk({"answer_key": key, "submissions": submissions})["results"],
+        ),
+    }
+
+    print(f"{args.submissions} submissions x {args.questions} questions")
+    print(f"{'module':<10} {'loop s':>8} {'bulk s':>8} {'speed-up':>9}")
+    for name, (loop, bulk) in cases.items():
+        loop_bands = [r["overall_band"] for r in loop()]
+        bulk_bands = [r["overall_band"] for r in bulk()]
+        if loop_bands != bulk_bands:
+            raise SystemExit(f"{name}: bulk bands differ from single evaluation")
+        loop_s, bulk_s = _best(loop, args.repeat), _best(bulk, args.repeat)
+        print(f"{name:<10} {loop_s:>8.3f} {bulk_s:>8.3f} {loop_s / bulk_s:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Cost and accuracy of the YIN pitch tracker used for the intonation score.
+
+    python -m benchmarks.pitch --clips 5 --repeat 10
+
+For each clip length, times the pitch stage against the rest of
+extract_acoustic_features and reports the overhead (exits non-zero above --max-overhead percent):
+both are warmed up, then timed alternately and the median kept, so one noisy run cannot
+fail the check. Then
+compares the pitch range / variability against librosa.pyin on shorter clips.
+Synthetic speech-like clips are used by default; pass --audio FILE to time a real recording.
+"""
+import argparse
+import statistics
+import time
+from unittest.mock import patch
+
+import librosa
+import numpy as np
+
+from benchmarks.acoustic_features import TRANSCRIPT, synthetic_speech
+from evaluators import speaking_audio
+from utils.acoustic_frames import analyze_frames
+from utils.audio_normalizer import SAMPLE_RATE
+from utils.pitch import PITCH_FMAX, PITCH_FMIN, pitch_statistics, yin_pitch
+
+
+def _without_pitch(*args, **kwargs):
+    return np.empty(0)
+
+
+def _median_times(fns: list, repeat: int) -> list:
+    """Median seconds per call of each fn: one warm-up call each, then calls interleaved."""
+    for fn in fns:
+        fn()
+    samples = [[] for _ in fns]
+    for _ in range(repeat):
+        for fn, times in zip(fns, samples):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    return [statistics.median(times) for times in samples]
+
+
+def pitch_overhead(signals: list, repeat: int) -> tuple:
+    """
+    (ms/clip for the pitch stage, ms/clip for extract_acoustic_features without it).
+    The stage is timed on its own: the difference of two end-to-end timings is
+    mostly noise at this size.
+    """
+    pitch_total = base_total = 0.0
+    with patch.object(speaking_audio, "yin_pitch", _without_pitch):
+        for y in signals:
+            intervals = analyze_frames(y, SAMPLE_RATE, keep_magnitude=False).intervals
+            pitch_s, base_s = _median_times([
+                lambda: pitch_statistics(yin_pitch(y, SAMPLE_RATE, intervals)),
+                lambda: speaking_audio.extract_acoustic_features(y, TRANSCRIPT),
+            ], repeat)
+            pitch_total, base_total = pitch_total + pitch_s, base_total + base_s
+    return pitch_total / len(signals) * 1000, base_total / len(signals) * 1000
+
+
+def compare_with_pyin(y: np.ndarray) -> dict:
+    intervals = analyze_frames(y, SAMPLE_RATE, keep_magnitude=False).intervals
+    start = time.perf_counter()
+    yin = pitch_statistics(yin_pitch(y, SAMPLE_RATE, intervals))
+    yin_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    f0, _, _ = librosa.pyin(y, fmin=PITCH_FMIN, fmax=PITCH_FMAX, sr=SAMPLE_RATE)
+    pyin_ms = (time.perf_counter() - start) * 1000
+    return {"yin": yin, "pyin": pitch_statistics(f0), "yin_ms": yin_ms, "pyin_ms": pyin_ms}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", type=int, default=5)
+    parser.add_argument("--seconds", type=float, nargs="+", default=[20.0, 60.0, 120.0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--pyin-seconds", type=float, default=15.0)
+    parser.add_argument("--max-overhead", type=float, default=5.0, help="percent")
+    parser.add_argument("--audio", default=None)
+    args = parser.parse_args()
+
+    if args.audio:
+        groups = {"file": [librosa.load(args.audio, sr=SAMPLE_RATE)[0]]}
+    else:
+        groups = {f"{s:.0f}s": [synthetic_speech(s, seed=i) for i in range(args.clips)] for s in args.seconds}
+
+    speaking_audio.extract_acoustic_features(synthetic_speech(2.0, seed=99), TRANSCRIPT)  # warm-up
+
+    worst = 0.0
+    print(f"{'clips':<8} {'features ms':>12} {'pitch ms':>9} {'overhead':>9}")
+    for name, signals in groups.items():
+        pitch_ms, base_ms = pitch_overhead(signals, args.repeat)
+        overhead = pitch_ms / max(base_ms, 1e-9) * 100
+        worst = max(worst, overhead)
+        print(f"{name:<8} {base_ms:>12.1f} {pitch_ms:>9.2f} {overhead:>8.1f}%")
+
+    print()
+    print(f"{'clip':<6} {'YIN range/var (st)':>20} {'pYIN range/var (st)':>20} {'YIN ms':>8} {'pYIN ms':>9}")
+    for seed in range(min(args.clips, 3)):
+        row = compare_with_pyin(synthetic_speech(args.pyin_seconds, seed=seed))
+        yin, pyin = row["yin"], row["pyin"]
+        print(f"{seed:<6} {yin['range_semitones']:>11} / {yin['variability_semitones']:<6} "
+              f"{pyin['range_semitones']:>11} / {pyin['variability_semitones']:<6} "
+              f"{row['yin_ms']:>8.1f} {row['pyin_ms']:>9.0f}")
+
+    print()
+    print(f"worst pitch overhead: {worst:.1f}% (limit {args.max_overhead:.1f}%)")
+    if worst > args.max_overhead:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Compare fp32 vs dynamic-int8 Whisper on a fixed local set of clips.
+
+Clips directory layout: one audio file per clip plus a reference transcript
+with the same stem, e.g. `p2_city.webm` + `p2_city.txt`.
+
+    python -m benchmarks.whisper_quantization --clips benchmarks/clips --model-size small
+
+Reports per-clip and total word error rate for both modes, the WER delta and the
+transcription speed-up, so the throughput/accuracy trade-off is an explicit choice.
+"""
+import argparse
+import re
+import time
+from pathlib import Path
+
+import whisper
+
+from utils.whisper_registry import WHISPER_DECODE_OPTIONS, quantize_whisper_int8
+
+AUDIO_SUFFIXES = {".wav", ".mp3", ".m4a", ".webm", ".ogg", ".flac"}
+
+
+def normalize_words(text: str) -> list:
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_errors(reference: list, hypothesis: list) -> int:
+    """Word-level Levenshtein distance (substitutions + insertions + deletions)."""
+    prev = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, start=1):
+        cur = [i] + [0] * len(hypothesis)
+        for j, hyp_word in enumerate(hypothesis, start=1):
+            cur[j] = min(
+                prev[j] + 1,
+                cur[j - 1] + 1,
+                prev[j - 1] + (ref_word != hyp_word),
+            )
+        prev = cur
+    return prev[-1]
+
+
+def load_clips(clips_dir: Path) -> list:
+    clips = []
+    for path in sorted(clips_dir.iterdir()):
+        ref_path = path.with_suffix(".txt")
+        if path.suffix.lower() in AUDIO_SUFFIXES and ref_path.exists():
+            clips.append({
+                "name": path.name,
+                # Decode up front so timings measure inference only
+                "audio": whisper.load_audio(str(path)),
+                "reference": normalize_words(ref_path.read_text(encoding="utf-8")),
+            })
+    return clips
+
+
+def run_mode(model, clips: list) -> dict:
+    model.transcribe(clips[0]["audio"][:16000], **WHISPER_DECODE_OPTIONS)  # warm-up
+
+    rows = []
+    total_errors = total_words = 0
+    start_all = time.perf_counter()
+    for clip in clips:
+        start = time.perf_counter()
+        text = model.transcribe(clip["audio"], **WHISPER_DECODE_OPTIONS)["text"]
+        seconds = time.perf_counter() - start
+        errors = word_errors(clip["reference"], normalize_words(text))
+        total_errors += errors
+        total_words += len(clip["reference"])
+        rows.append({
+            "name": clip["name"],
+            "seconds": seconds,
+            "wer": errors / max(len(clip["reference"]), 1),
+        })
+
+    return {
+        "rows": rows,
+        "seconds": time.perf_counter() - start_all,
+        "wer": total_errors / max(total_words, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", type=Path, default=Path("benchmarks/clips"))
+    parser.add_argument("--model-size", default="small")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        import torch
+
+        torch.set_num_threads(args.threads)
+
+    clips = load_clips(args.clips)
+    if not clips:
+        raise SystemExit(f"No <clip>.<audio> + <clip>.txt pairs found in {args.clips}")
+
+    fp32 = run_mode(whisper.load_model(args.model_size, device="cpu"), clips)
+    int8 = run_mode(quantize_whisper_int8(whisper.load_model(args.model_size, device="cpu")), clips)
+
+    print(f"{'clip':<32} {'fp32 s':>8} {'int8 s':>8} {'fp32 WER':>9} {'int8 WER':>9}")
+    for a, b in zip(fp32["rows"], int8["rows"]):
+        print(f"{a['name']:<32} {a['seconds']:>8.2f} {b['seconds']:>8.2f} {a['wer']:>9.3f} {b['wer']:>9.3f}")
+
+    print()
+    print(f"model={args.model_size} clips={len(clips)}")
+    print(f"fp32: {fp32['seconds']:.2f}s  WER={fp32['wer']:.3f}")
+    print(f"int8: {int8['seconds']:.2f}s  WER={int8['wer']:.3f}")
+    print(f"WER delta (int8 - fp32): {int8['wer'] - fp32['wer']:+.3f}")
+    print(f"speed-up: {fp32['seconds'] / max(int8['seconds'], 1e-9):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
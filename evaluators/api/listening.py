@@ -1,12 +1,37 @@
 from fastapi import APIRouter, HTTPException
-from evaluators.listening import evaluate_listening
+from evaluators.listening import evaluate_listening, evaluate_listening_bulk
+from utils.answer_keys import AnswerKeyConflict, AnswerKeyNotFound, register_answer_key
 
 router = APIRouter(prefix="/listening", tags=["Listening"])
 
+
+@router.post("/tests")
+def register_listening_test_api(data: dict):
+    """Register { "test_id", "answer_key" } once; evaluations then send only test_id."""
+    try:
+        return register_answer_key(data.get("test_id"), "listening", data, replace=bool(data.get("replace")))
+    except AnswerKeyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/evaluate")
 def evaluate_listening_api(data: dict):
     try:
         result = evaluate_listening(data)
         return result
+    except AnswerKeyNotFound as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/evaluate/bulk")
+def evaluate_listening_bulk_api(data: dict):
+    try:
+        return evaluate_listening_bulk(data)
+    except AnswerKeyNotFound as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
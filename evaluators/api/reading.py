@@ -1,14 +1,28 @@
 from fastapi import APIRouter, HTTPException
 from typing import Dict, Any
-from evaluators.reading import evaluate_reading
+from evaluators.reading import evaluate_reading, evaluate_reading_bulk
+from utils.answer_keys import AnswerKeyConflict, AnswerKeyNotFound, register_answer_key
 
 router = APIRouter(prefix="/reading", tags=["Reading"])
 
 
+@router.post("/tests")
+def register_reading_test_api(data: Dict[str, Any]):
+    """Register { "test_id", "questions", "test_type" } once; evaluations then send only test_id."""
+    try:
+        return register_answer_key(data.get("test_id"), "reading", data, replace=bool(data.get("replace")))
+    except AnswerKeyConflict as ce:
+        raise HTTPException(status_code=409, detail=str(ce))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+
 @router.post("/evaluate")
 def evaluate_reading_api(data: Dict[str, Any]):
     try:
         return evaluate_reading(data)
+    except AnswerKeyNotFound as ne:
+        raise HTTPException(status_code=404, detail=ne.args[0])
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception:
@@ -16,3 +30,18 @@ def evaluate_reading_api(data: Dict[str, Any]):
             status_code=500,
             detail="Reading evaluation failed due to server error"
         )
+
+
+@router.post("/evaluate/bulk")
+def evaluate_reading_bulk_api(data: Dict[str, Any]):
+    try:
+        return evaluate_reading_bulk(data)
+    except AnswerKeyNotFound as ne:
+        raise HTTPException(status_code=404, detail=ne.args[0])
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception:
+        raise HTTPException(
+            status_code=500,
+            detail="Bulk reading evaluation failed due to server error"
+        )
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Request, HTTPException
 from evaluator import evaluate_attempt
-from evaluators.speaking import evaluate_speaking_part
-from storage.speaking_store import SPEAKING_ATTEMPTS
-from utils.audio_transcriber import transcribe_audio
-from utils.audio_features import extract_audio_features
-from uuid import uuid4
+from evaluators.speaking_audio import (
+    _attempt_for_part,
+    _compat_part_response,
+    _evaluate_speaking_part_audio,
+    _ingest,
+    _store_part_result,
+)
 
 router = APIRouter(
     prefix="/speaking",
@@ -40,37 +42,28 @@ async def evaluate_speaking_text(request: Request):
         except (TypeError, ValueError):
             raise HTTPException(status_code=400, detail="Invalid part number")
 
-        attempt_id = form.get("attempt_id")
         if part not in [1, 2, 3]:
             raise HTTPException(status_code=400, detail="Invalid part number")
-        attempt_id = (attempt_id or "").strip() or uuid4().hex
+        attempt_id = await _attempt_for_part(part, form.get("attempt_id"))
 
+        # Same pipeline as /speaking/part/{part}/audio: inference pool, shared Whisper, caches
+        audio = await _ingest(upload)
         try:
-            transcript = transcribe_audio(upload)
-            audio_metrics = extract_audio_features(upload)
-
-            # Speech rate (WPM)
-            words = len(transcript.split())
-            duration = audio_metrics.get("duration_sec", 1)
-            speech_rate = round((words / duration) * 60) if duration > 0 else 0
-            audio_metrics["speech_rate_wpm"] = speech_rate
-
-            result = evaluate_speaking_part(
-                part=part,
-                transcript=transcript,
-                audio_metrics=audio_metrics
-            )
+            part_result = await _evaluate_speaking_part_audio(audio_bytes=audio, part=part)
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Audio evaluation failed for part {part}: {e}")
+        finally:
+            audio.close()
 
-        SPEAKING_ATTEMPTS[attempt_id]["parts"][part] = result
+        response = _compat_part_response(part_result, part, attempt_id)
+        await _store_part_result(attempt_id, part, response["result"])
 
         return {
             "attempt_id": attempt_id,
             "part": part,
-            "result": result
+            "result": response["result"]
         }
 
     # JSON payload handling
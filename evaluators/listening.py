@@ -1,27 +1,51 @@
-from utils.band import listening_band_from_correct
+import numpy as np
+
+from utils.band import LISTENING_BANDS, bands_from_totals, listening_band_from_correct
+from utils.answer_keys import resolve_answer_key
+from utils.objective_grading import (
+    BULK_GRADING_MAX_SUBMISSIONS,
+    INVALID_SUBMISSION,
+    band_distribution,
+    grade_submissions,
+    submission_answers,
+)
+
+DETAIL_IMPROVEMENT = (
+    "Improve ability to catch specific details, spellings, and common distractors in listening sections."
+)
+
+
+def _examiner_feedback(band: float, has_errors: bool) -> str:
+    return (
+        f"This is a Band {band} listening performance. "
+        "Errors suggest difficulty with identifying precise details and managing distractors."
+        if has_errors else
+        f"This is a Band {band} listening performance with a high level of accuracy."
+    )
 
 
 def evaluate_listening(data):
     # -----------------------------
     # Input validation
     # -----------------------------
-    if "user_answers" not in data or "answer_key" not in data:
+    # "answer_key" inline, or the "test_id" of a registered key
+    if "user_answers" not in data or ("answer_key" not in data and not data.get("test_id")):
         raise ValueError("user_answers and answer_key are required")
 
     user = data["user_answers"]
-    key = data["answer_key"]
+    key = resolve_answer_key("listening", data)
 
-    total = len(key)
+    total = key.total_questions
     correct = 0
     error_types = set()   # 👈 store error categories only
 
     # -----------------------------
     # Answer checking
     # -----------------------------
-    for qid, ans in key.items():
+    for qid, matches in zip(key.question_ids, key.matchers):
         user_ans = user.get(qid)
 
-        if user_ans == ans:
+        if matches(user_ans):
             correct += 1
         else:
             # Listening IELTS-style generic error classification
@@ -33,21 +57,14 @@ def evaluate_listening(data):
     improvements = []
 
     if "Spelling / Distractor" in error_types:
-        improvements.append(
-            "Improve ability to catch specific details, spellings, and common distractors in listening sections."
-        )
+        improvements.append(DETAIL_IMPROVEMENT)
 
     # -----------------------------
     # Examiner feedback
     # -----------------------------
     band = listening_band_from_correct(correct)
 
-    examiner_feedback = (
-        f"This is a Band {band} listening performance. "
-        "Errors suggest difficulty with identifying precise details and managing distractors."
-        if error_types else
-        f"This is a Band {band} listening performance with a high level of accuracy."
-    )
+    examiner_feedback = _examiner_feedback(band, bool(error_types))
 
     # -----------------------------
     # Final response (FLAT FORMAT)
@@ -59,3 +76,56 @@ def evaluate_listening(data):
         "improvements": improvements,
         "examiner_feedback": examiner_feedback
     }
+
+
+def evaluate_listening_bulk(data):
+    """
+    Grade many submissions against one answer key:
+    { "answer_key": {...}, "submissions": [{"submission_id": ..., "user_answers": {...}}, ...] }
+    ("test_id" of a registered key may replace "answer_key"). Each result matches
+    evaluate_listening for that submission; "summary" adds the band distribution and
+    per-question accuracy across the cohort.
+    """
+    submissions = data.get("submissions")
+    if not isinstance(submissions, list) or not submissions:
+        raise ValueError("answer_key and submissions are required")
+    if len(submissions) > BULK_GRADING_MAX_SUBMISSIONS:
+        raise ValueError(f"At most {BULK_GRADING_MAX_SUBMISSIONS} submissions per request")
+
+    key = resolve_answer_key("listening", data)
+
+    answers, valid = submission_answers(submissions)
+
+    question_ids = list(key.question_ids)
+    grades = grade_submissions(question_ids, list(key.key_values), [answers[i] for i in valid], matchers=key.matchers)
+    bands = bands_from_totals(grades["totals"], LISTENING_BANDS)
+    has_errors = (grades["totals"] < len(question_ids)).tolist()
+    totals, band_values = grades["totals"].tolist(), bands.tolist()
+
+    results = [{"error": INVALID_SUBMISSION} for _ in submissions]
+    for row, i in enumerate(valid):
+        results[i] = {
+            "module": "listening",
+            "overall_band": band_values[row],
+            "accuracy": f"{totals[row]}/{len(question_ids)}",
+            "improvements": [DETAIL_IMPROVEMENT] if has_errors[row] else [],
+            "examiner_feedback": _examiner_feedback(band_values[row], has_errors[row]),
+        }
+
+    for result, submission in zip(results, submissions):
+        if isinstance(submission, dict) and "submission_id" in submission:
+            result["submission_id"] = submission["submission_id"]
+
+    return {
+        "module": "listening",
+        "results": results,
+        "summary": {
+            "submissions": len(submissions),
+            "graded": len(valid),
+            "mean_band": round(float(np.mean(bands)), 2) if len(valid) else None,
+            "band_distribution": band_distribution(bands),
+            "question_accuracy": {
+                qid: round(float(acc), 3) for qid, acc in zip(question_ids, grades["question_accuracy"])
+            },
+        },
+    }
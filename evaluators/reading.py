@@ -1,34 +1,64 @@
-from utils.band import band_from_correct, general_reading_band
+import numpy as np
+
+from utils.band import (
+    ACADEMIC_READING_BANDS,
+    GENERAL_READING_BANDS,
+    band_from_correct,
+    bands_from_totals,
+    general_reading_band,
+)
+from utils.answer_keys import resolve_answer_key
+from utils.objective_grading import (
+    BULK_GRADING_MAX_SUBMISSIONS,
+    INVALID_SUBMISSION,
+    band_distribution,
+    grade_submissions,
+    submission_answers,
+)
+
+
+def _improvement_for(qtype: str) -> str:
+    if qtype == "TRUE_FALSE_NOT_GIVEN":
+        return "Improve ability to distinguish clearly between TRUE, FALSE and NOT GIVEN statements."
+    if qtype == "MCQ":
+        return "Practise multiple-choice questions by identifying distractors more carefully."
+    if qtype == "FILL_IN_THE_BLANKS":
+        return "Work on scanning and word-matching skills for fill in the blanks questions."
+    return f"Improve accuracy in {qtype} type reading questions."
+
+
+def _examiner_feedback(band: float, has_errors: bool) -> str:
+    return (
+        f"This is a Band {band} reading performance. "
+        "Errors were observed in specific question types, indicating areas "
+        "where targeted practice is required."
+        if has_errors else
+        f"This is a Band {band} reading performance with a high level of accuracy."
+    )
 
 
 def evaluate_reading(data: dict):
     # =========================
     # SAFE EXTRACTION
     # =========================
-    questions = data.get("questions", [])
+    # Either inline "questions" or the "test_id" of a registered key
     user_answers = data.get("user_answers", {})
-    test_type = data.get("test_type", "academic")  # 👈 NEW (default safe)
-
-    if not questions or not user_answers:
+    if not user_answers:
         raise ValueError("Invalid reading input format")
 
+    key = resolve_answer_key("reading", data)
+    test_type = data.get("test_type", key.test_type or "academic")  # 👈 NEW (default safe)
+
     correct = 0
     wrong_question_types = set()
 
     # =========================
     # EVALUATION LOGIC
     # =========================
-    for q in questions:
-        qid = q.get("question_id")
-        answer_key = q.get("answer_key")
-        qtype = q.get("type", "UNKNOWN")
-
-        if not qid or answer_key is None:
-            continue
-
+    for qid, matches, qtype in zip(key.question_ids, key.matchers, key.question_types):
         user_ans = user_answers.get(qid)
 
-        if user_ans == answer_key:
+        if matches(user_ans):
             correct += 1
         else:
             wrong_question_types.add(qtype)
@@ -44,36 +74,12 @@ def evaluate_reading(data: dict):
     # =========================
     # IMPROVEMENTS
     # =========================
-    improvements = []
-
-    for qtype in wrong_question_types:
-        if qtype == "TRUE_FALSE_NOT_GIVEN":
-            improvements.append(
-                "Improve ability to distinguish clearly between TRUE, FALSE and NOT GIVEN statements."
-            )
-        elif qtype == "MCQ":
-            improvements.append(
-                "Practise multiple-choice questions by identifying distractors more carefully."
-            )
-        elif qtype == "FILL_IN_THE_BLANKS":
-            improvements.append(
-                "Work on scanning and word-matching skills for fill in the blanks questions."
-            )
-        else:
-            improvements.append(
-                f"Improve accuracy in {qtype} type reading questions."
-            )
+    improvements = [_improvement_for(qtype) for qtype in wrong_question_types]
 
     # =========================
     # FEEDBACK
     # =========================
-    examiner_feedback = (
-        f"This is a Band {band} reading performance. "
-        "Errors were observed in specific question types, indicating areas "
-        "where targeted practice is required."
-        if wrong_question_types else
-        f"This is a Band {band} reading performance with a high level of accuracy."
-    )
+    examiner_feedback = _examiner_feedback(band, bool(wrong_question_types))
 
     # =========================
     # FINAL RESPONSE
@@ -82,7 +88,71 @@ def evaluate_reading(data: dict):
         "module": "reading",
         "test_type": test_type,  # 👈 NEW (optional but useful)
         "overall_band": band,
-        "accuracy": f"{correct}/{len(questions)}",
+        "accuracy": f"{correct}/{key.total_questions}",
         "improvements": improvements,
         "examiner_feedback": examiner_feedback
-    }
\ No newline at end of file
+    }
+
+
+def evaluate_reading_bulk(data: dict):
+    """
+    Grade many submissions against one set of questions:
+    { "questions": [...], "test_type": "academic", "submissions": [{"submission_id": ..., "user_answers": {...}}, ...] }
+    ("test_id" of a registered key may replace "questions"). Each result matches
+    evaluate_reading for that submission; "summary" adds the band distribution and
+    per-question accuracy across the cohort.
+    """
+    submissions = data.get("submissions", [])
+    if not isinstance(submissions, list) or not submissions:
+        raise ValueError("Invalid bulk reading input format")
+    if len(submissions) > BULK_GRADING_MAX_SUBMISSIONS:
+        raise ValueError(f"At most {BULK_GRADING_MAX_SUBMISSIONS} submissions per request")
+
+    key = resolve_answer_key("reading", data)
+    test_type = data.get("test_type", key.test_type or "academic")
+    answers, valid = submission_answers(submissions)
+
+    grades = grade_submissions(
+        list(key.question_ids), list(key.key_values), [answers[i] for i in valid], list(key.question_types),
+        matchers=key.matchers,
+    )
+    table = GENERAL_READING_BANDS if test_type == "general" else ACADEMIC_READING_BANDS
+    bands = bands_from_totals(grades["totals"], table)
+
+    # Submissions with the same error types share their improvement text
+    improvements_by_errors = {}
+    has_errors = grades["type_errors"].any(axis=1).tolist()
+    totals, band_values = grades["totals"].tolist(), bands.tolist()
+    results = [{"error": INVALID_SUBMISSION} for _ in submissions]
+    for row, (i, errors) in enumerate(zip(valid, map(tuple, grades["type_errors"].tolist()))):
+        if errors not in improvements_by_errors:
+            improvements_by_errors[errors] = [
+                _improvement_for(qtype) for qtype, wrong in zip(grades["types"], errors) if wrong
+            ]
+        results[i] = {
+            "module": "reading",
+            "test_type": test_type,
+            "overall_band": band_values[row],
+            "accuracy": f"{totals[row]}/{key.total_questions}",
+            "improvements": list(improvements_by_errors[errors]),
+            "examiner_feedback": _examiner_feedback(band_values[row], has_errors[row]),
+        }
+
+    for result, submission in zip(results, submissions):
+        if isinstance(submission, dict) and "submission_id" in submission:
+            result["submission_id"] = submission["submission_id"]
+
+    return {
+        "module": "reading",
+        "test_type": test_type,
+        "results": results,
+        "summary": {
+            "submissions": len(submissions),
+            "graded": len(valid),
+            "mean_band": round(float(np.mean(bands)), 2) if len(valid) else None,
+            "band_distribution": band_distribution(bands),
+            "question_accuracy": {
+                qid: round(float(acc), 3) for qid, acc in zip(key.question_ids, grades["question_accuracy"])
+            },
+        },
+    }
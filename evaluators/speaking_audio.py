@@ -1,13 +1,38 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request, WebSocket, WebSocketDisconnect
 
-from utils.audio_normalizer import normalize_to_wav
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from utils.audio_normalizer import SAMPLE_RATE, AudioDecodeError
+
+from utils.audio_clip import AudioClip
+
+from utils.audio_fingerprint import get_fingerprint_index
+
+from utils.audio_stream import StreamDecoder, StreamSegmenter
+
+from utils.acoustic_frames import CLIPPING_LEVEL, FrameStream, analyze_frame_block, analyze_frames
+
+from utils.pitch import pitch_statistics, yin_pitch
 
-from utils.audio_transcriber import transcribe_audio
 
 from utils.gpt_client import call_gpt
 
 from utils.safety import safe_gpt_call, normalize_feedback
 
+from utils.inference_pool import InferencePoolBusy, inference_admission, run_inference
+
+from utils.job_queue import DONE, FAILED, JobError, enqueue_job, get_job, register_job_handler
+
+from utils.result_cache import get_result_cache
+
+from utils.upload_ingest import IngestedUpload, UploadTooLarge, ingest_upload
+
+from utils.stage_graph import Stage, StageTimeout, run_stage_graph
+
+from utils.whisper_batcher import stitch_words, transcribe_batched, transcribe_long
+
+from storage.speaking_store import AttemptNotFound, get_attempt_store
+
 from evaluators.speaking import (
 
     evaluate_speaking_part,
@@ -54,7 +79,7 @@ import re
 
 from difflib import SequenceMatcher
 
-import whisper
+from contextlib import AsyncExitStack
 
 import os
 
@@ -142,6 +167,44 @@ _RATE_LIMIT_THRESHOLD = 500
 
 
 
+# Hard cap on decoded answer length (Part 2 long turns run up to 2 minutes)
+
+SPEAKING_MAX_AUDIO_SECONDS = float(os.getenv("SPEAKING_MAX_AUDIO_SECONDS", "180"))
+
+
+
+# Clips of one /audio/question-wise request evaluated at the same time
+
+QUESTION_WISE_CONCURRENCY = max(1, int(os.getenv("QUESTION_WISE_CONCURRENCY", "4")))
+
+
+
+# Multi-question parts: "derive" the part result from the per-question scores (default),
+
+# or "gpt" to also send the combined transcript for a holistic evaluation
+
+SPEAKING_COMBINED_EVAL = os.getenv("SPEAKING_COMBINED_EVAL", "derive").strip().lower()
+
+
+
+# WebSocket streaming uploads (/part/{part}/stream)
+
+STREAM_MAX_SESSIONS = int(os.getenv("STREAM_MAX_SESSIONS", "16"))
+
+STREAM_MAX_SECONDS = float(os.getenv("STREAM_MAX_SECONDS", "150"))
+
+STREAM_MAX_BYTES = int(os.getenv("STREAM_MAX_BYTES", str(25 * 1024 * 1024)))
+
+_STREAM_SESSIONS = 0
+
+
+
+# How often /jobs/{job_id}/events checks the job table
+
+JOB_EVENTS_POLL_SECONDS = 0.5
+
+
+
 
 
 def _check_rate_limit():
@@ -156,29 +219,24 @@ def _check_rate_limit():
 
 
 
-# In-memory caches to avoid repeated ASR/feature work within a process
-
-_ASR_CACHE = {}
-
-_FEATURE_CACHE = {}
-
-_USED_VOCAB = set()
+# Bounded LRU/TTL caches (optionally shared on disk via RESULT_CACHE_DB) to avoid
 
+# repeated ASR/feature work for the same audio
 
+_ASR_CACHE = get_result_cache("speaking_asr")
 
-# Load Whisper once per process (CPU-friendly)
+_FEATURE_CACHE = get_result_cache("speaking_features")
 
-try:
+# Second-chance lookup when the exact hash misses: the same answer re-encoded
+# (another container/codec) maps to the hash its results are cached under
 
-    # Use a faster Whisper variant to reduce latency; switch to "tiny" if extreme speed is needed.
+_FINGERPRINT_INDEX = get_fingerprint_index()
 
-    WHISPER_MODEL = whisper.load_model("small")
 
-except Exception as exc:
 
-    WHISPER_MODEL = None
+# Whisper is loaded lazily (once per process) by utils.whisper_registry;
 
-    print({"event": "whisper_load_failed", "error": str(exc)})
+# set WHISPER_MODEL_SIZE=tiny if extreme speed is needed.
 
 
 
@@ -199,9 +257,8 @@ async def evaluate_part_audio_compat(
     if part not in (1, 2, 3):
         raise HTTPException(status_code=400, detail="Invalid part number")
 
-    audio_bytes = await file.read()
-    if not audio_bytes:
-        raise HTTPException(status_code=400, detail="No audio file provided")
+    attempt_id = await _attempt_for_part(part, attempt_id)
+    upload = await _ingest(file)
 
     default_question_by_part = {
         1: "Tell me about yourself.",
@@ -209,12 +266,67 @@ async def evaluate_part_audio_compat(
         3: "What are your views on this topic and why?",
     }
 
-    part_result = await _evaluate_speaking_part_audio(
-        audio_bytes=audio_bytes,
-        part=part,
-        question=(question or default_question_by_part.get(part)),
-    )
+    try:
+        part_result = await _evaluate_speaking_part_audio(
+            audio_bytes=upload,
+            part=part,
+            question=(question or default_question_by_part.get(part)),
+        )
+    finally:
+        upload.close()
 
+    response = _compat_part_response(part_result, part, attempt_id)
+    await _store_part_result(attempt_id, part, response["result"])
+    return response
+
+
+def _open_attempt(part: int, attempt_id: str | None) -> str:
+    """
+    Part 1 starts the attempt (under the client's id if it sent one); parts 2 and 3
+    must name a live attempt. Raises AttemptNotFound otherwise.
+    """
+    attempt_id = (attempt_id or "").strip()
+    store = get_attempt_store()
+    if part == 1:
+        return store.create(attempt_id or None)
+    if not attempt_id or not store.exists(attempt_id):
+        raise AttemptNotFound(attempt_id)
+    return attempt_id
+
+
+async def _attempt_for_part(part: int, attempt_id: str | None) -> str:
+    """_open_attempt for HTTP routes: 400 without an attempt_id on parts 2 and 3, 404 for an unknown one."""
+    if part != 1 and not (attempt_id or "").strip():
+        raise HTTPException(status_code=400, detail="attempt_id is required for Part 2 and Part 3")
+    try:
+        return await asyncio.to_thread(_open_attempt, part, attempt_id)
+    except AttemptNotFound:
+        raise HTTPException(status_code=404, detail="Invalid attempt_id")
+
+
+async def _store_part_result(attempt_id: str, part: int, result: dict):
+    """Record a scored part (and its share of the band aggregate) on the attempt; 404 if it expired meanwhile."""
+    try:
+        await asyncio.to_thread(get_attempt_store().set_part, attempt_id, part, result)
+    except AttemptNotFound:
+        raise HTTPException(status_code=404, detail="Invalid attempt_id")
+
+
+async def _ingest(file: UploadFile) -> IngestedUpload:
+    """Read one upload in chunks (hashing as it goes); 413 past the limits, 400 if empty."""
+    try:
+        upload = await ingest_upload(file)
+    except UploadTooLarge as exc:
+        print({"event": "audio_error", "reason": "upload_too_large", "details": str(exc)})
+        raise HTTPException(status_code=413, detail=str(exc))
+    if not upload.size:
+        upload.close()
+        raise HTTPException(status_code=400, detail="No audio file provided")
+    return upload
+
+
+def _compat_part_response(part_result, part: int, attempt_id: str | None = None) -> dict:
+    """Shape a part evaluation like the original /part/{part}/audio response."""
     if not isinstance(part_result, dict):
         raise HTTPException(status_code=500, detail="Unexpected evaluator response")
 
@@ -243,6 +355,162 @@ async def evaluate_part_audio_compat(
     }
 
 
+def _stream_control(message: dict) -> dict:
+    """Parse a JSON control message; anything else (binary, invalid JSON) yields {}."""
+    if message.get("type") == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    try:
+        parsed = json.loads(message.get("text") or "")
+    except ValueError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+@router.websocket("/part/{part}/stream")
+async def stream_part_audio(websocket: WebSocket, part: int):
+    """
+    Streaming variant of /part/{part}/audio. Protocol:
+    - client -> {"event": "start", "format": "webm" | "pcm_s16le" | "pcm_f32le", "question": ..., "attempt_id": ...}
+      (part 1 starts the attempt; parts 2 and 3 must name a live one)
+    - client -> binary audio chunks while the candidate speaks
+    - server -> {"event": "segment", ...} as each pause-delimited segment is transcribed
+    - client -> {"event": "stop"}
+    - server -> {"event": "result", ...} with the same body as /part/{part}/audio, then closes
+    Errors are sent as {"event": "error", "error": ..., "message": ...}.
+    """
+    global _STREAM_SESSIONS
+
+    await websocket.accept()
+    if part not in (1, 2, 3):
+        await websocket.send_json({"event": "error", "error": "invalid_part", "message": "Invalid part number"})
+        await websocket.close(code=1008)
+        return
+    if _STREAM_SESSIONS >= STREAM_MAX_SESSIONS:
+        await websocket.send_json({"event": "error", "error": "busy", "message": "Too many streaming sessions"})
+        await websocket.close(code=1013)
+        return
+
+    _STREAM_SESSIONS += 1
+    part_start = time.time()
+    segmenter = StreamSegmenter()
+    segment_tasks = []
+    # Frame statistics are computed block by block as audio arrives, so stopping
+    # only merges them instead of analysing the whole buffer again
+    frame_stream = FrameStream(SAMPLE_RATE)
+    frame_tasks = []
+    send_lock = asyncio.Lock()
+    decoder = None
+    # Segment transcription and frame analysis run on the inference pool: the
+    # session holds one admission slot for both, released before GPT scoring
+    admission = AsyncExitStack()
+
+    async def send(payload: dict):
+        async with send_lock:
+            await websocket.send_json(payload)
+
+    async def transcribe_segment(index: int, start: int, end: int) -> dict:
+        asr = await transcribe_batched(segmenter.samples()[start:end].copy(), True)
+        text = asr["text"].strip()
+        await send({
+            "event": "segment",
+            "index": index,
+            "start_sec": round(start / SAMPLE_RATE, 3),
+            "end_sec": round(end / SAMPLE_RATE, 3),
+            "text": text,
+            **segmenter.stats(),
+        })
+        return {"text": text, "words": asr["words"], "bounds": (start / SAMPLE_RATE, end / SAMPLE_RATE)}
+
+    async def analyze_block(args: tuple):
+        frame_stream.add(await run_inference(analyze_frame_block, *args))
+
+    def schedule(segments: list, final: bool = False):
+        for start, end in segments:
+            segment_tasks.append(asyncio.create_task(transcribe_segment(len(segment_tasks), start, end)))
+        block = frame_stream.next_block(segmenter.samples(), final)
+        if block is not None:
+            frame_tasks.append(asyncio.create_task(analyze_block(block)))
+
+    try:
+        first = _stream_control(await websocket.receive())
+        if first.get("event") != "start":
+            await send({"event": "error", "error": "protocol", "message": "First message must be {\"event\": \"start\"}"})
+            await websocket.close(code=1008)
+            return
+        try:
+            attempt_id = await asyncio.to_thread(_open_attempt, part, str(first.get("attempt_id") or ""))
+        except AttemptNotFound:
+            await send({"event": "error", "error": "attempt_not_found", "message": "Invalid attempt_id"})
+            await websocket.close(code=1008)
+            return
+        try:
+            await admission.enter_async_context(inference_admission())
+        except InferencePoolBusy as exc:
+            await send({"event": "error", "error": "busy", "message": str(exc)})
+            await websocket.close(code=1013)
+            return
+
+        decoder = StreamDecoder(first.get("format"), lambda samples: schedule(segmenter.push(samples)))
+        await decoder.start()
+
+        received = 0
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes") is not None:
+                received += len(message["bytes"])
+                if received > STREAM_MAX_BYTES or segmenter.duration > STREAM_MAX_SECONDS:
+                    await send({"event": "error", "error": "too_long", "message": "Streamed answer exceeds the allowed length"})
+                    await websocket.close(code=1009)
+                    return
+                await decoder.feed(message["bytes"])
+            elif _stream_control(message).get("event") == "stop":
+                break
+
+        await decoder.close()
+        schedule(segmenter.finish(), final=True)
+        segments = await asyncio.gather(*segment_tasks)
+        await asyncio.gather(*frame_tasks)
+        transcript = " ".join(s["text"] for s in segments if s["text"])
+        words = stitch_words([s["words"] for s in segments], [s["bounds"] for s in segments])
+        print({"event": "stream_transcribed", "part": part, "segments": len(segment_tasks), **segmenter.stats()})
+
+        if segmenter.samples().size < 1000:
+            part_result = {"part": part, "error": "conversion_failed", "message": "No audio received", "result": None}
+        else:
+            # Merge the per-block statistics; only pitch reads the samples (bounded, see utils.pitch)
+            frames, levels = frame_stream.finish(segmenter.samples().size)
+            audio_metrics = await asyncio.to_thread(
+                extract_acoustic_features, segmenter.samples(), transcript, words, frames=frames, levels=levels
+            )
+            await admission.aclose()
+            part_result = await _score_part_transcript(transcript, audio_metrics, part, first.get("question"), None, part_start)
+
+        try:
+            response = _compat_part_response(part_result, part, attempt_id)
+            await _store_part_result(attempt_id, part, response["result"])
+        except HTTPException as exc:
+            await send({"event": "error", "error": exc.detail, "message": part_result.get("message", exc.detail)})
+        else:
+            await send({"event": "result", **response})
+        await websocket.close()
+    except WebSocketDisconnect:
+        print({"event": "stream_disconnected", "part": part, **segmenter.stats()})
+    except AudioDecodeError as exc:
+        print({"event": "audio_error", "part": part, "reason": "stream_decode_failed", "details": str(exc)})
+        await send({"event": "error", "error": "conversion_failed", "message": str(exc)})
+        await websocket.close(code=1003)
+    finally:
+        _STREAM_SESSIONS -= 1
+        for task in segment_tasks + frame_tasks:
+            task.cancel()
+        if decoder is not None:
+            await decoder.abort()
+        await asyncio.gather(*segment_tasks, *frame_tasks, return_exceptions=True)
+        await admission.aclose()
+
+
 
 
 
@@ -274,158 +542,164 @@ def _safe_log10(x):
 
 
 
-def _wav_duration_seconds(path: str) -> float:
+def refine_pronunciation_with_word_confidence(words):
 
-    import wave
+    return _confidence_scores(np.array([w.get("confidence", 0.8) for w in words], dtype=np.float64))
 
-    with wave.open(path, "rb") as wf:
 
-        frames = wf.getnframes()
 
-        rate = wf.getframerate()
 
-        return frames / float(rate) if rate else 0.0
 
+def _confidence_scores(confidences: np.ndarray):
 
+    if not confidences.size:
 
+        return 0.6, 0.4, 0.6
 
 
-def _trim_wav(path: str, max_seconds: float = 90.0):
 
-    """Trim WAV file to max_seconds in-place."""
+    avg_conf = float(confidences.mean())
 
-    import wave
 
-    if not os.path.exists(path):
 
-        return
+    phoneme_accuracy = avg_conf
 
-    with wave.open(path, "rb") as wf:
+    mispronunciation_rate = max(0, 1 - avg_conf)
 
-        params = wf.getparams()
+    stress_accuracy = min(1.0, avg_conf + 0.1)
 
-        frames = wf.getnframes()
 
-        rate = wf.getframerate()
 
-        duration = frames / float(rate) if rate else 0
+    return phoneme_accuracy, mispronunciation_rate, stress_accuracy
 
-        if duration <= max_seconds or rate == 0:
 
-            return
 
-        max_frames = int(max_seconds * rate)
 
-        audio_data = wf.readframes(max_frames)
 
-    tmp_fd, tmp_path = tempfile.mkstemp(suffix=".wav")
+def compute_intonation_score(pitch: dict):
 
-    os.close(tmp_fd)
+    """Intonation from pitch_statistics(): range and variability of the voiced pitch in semitones."""
 
-    with wave.open(tmp_path, "wb") as wf_out:
+    variability, pitch_range = pitch.get("variability_semitones"), pitch.get("range_semitones")
 
-        wf_out.setparams(params)
 
-        wf_out.writeframes(audio_data)
 
-    os.replace(tmp_path, path)
+    if variability is None:
 
+        return 0.6  # too little voiced speech to judge
 
+    if variability < 1.5 or pitch_range < 3:
 
+        return 0.4  # monotone
 
+    elif variability < 2.5 or variability > 7:
 
-def refine_pronunciation_with_word_confidence(words):
+        return 0.6  # flat, or erratic jumps
 
-    confidences = [w.get("confidence", 0.8) for w in words]
+    else:
 
+        return 0.8
 
 
-    if not confidences:
 
-        return 0.6, 0.4, 0.6
 
 
+def compute_micro_timing(word_timestamps):
 
-    avg_conf = sum(confidences) / len(confidences)
+    return _micro_timing_score(np.array([w["end"] - w["start"] for w in word_timestamps], dtype=np.float64))
 
 
 
-    phoneme_accuracy = avg_conf
 
-    mispronunciation_rate = max(0, 1 - avg_conf)
 
-    stress_accuracy = min(1.0, avg_conf + 0.1)
+def _micro_timing_score(durations: np.ndarray):
 
+    if not durations.size:
 
+        return 0.5
 
-    return phoneme_accuracy, mispronunciation_rate, stress_accuracy
 
 
+    variance = float(durations.var())
 
 
 
-def compute_intonation_score(signal):
+    if variance < 0.01:
 
-    variation = np.std(signal)
+        return 0.8
 
+    elif variance < 0.03:
 
+        return 0.6
 
-    if variation < 0.01:
+    else:
 
-        return 0.4  # monotone
+        return 0.4
 
-    elif variation < 0.05:
 
-        return 0.6
 
-    else:
 
-        return 0.8
 
+_CLAUSE_END = (",", ".", "?", "!", ";", ":")
 
 
 
 
-def compute_micro_timing(word_timestamps):
 
-    durations = [w["end"] - w["start"] for w in word_timestamps]
+def _word_timing_features(words: list, pause_seconds: np.ndarray):
 
+    """
 
+    Micro-timing score, confidence scores and the share of pauses that follow a
 
-    if not durations:
+    clause-ending word, from ASR word timings (one set of arrays for all three).
 
-        return 0.5
+    """
 
+    starts = np.array([w["start"] for w in words], dtype=np.float64)
 
+    ends = np.array([w["end"] for w in words], dtype=np.float64)
 
-    avg = sum(durations) / len(durations)
+    probabilities = np.array([w.get("probability", 0.8) for w in words], dtype=np.float64)
 
-    variance = sum((d - avg) ** 2 for d in durations) / len(durations)
+    clause_end = np.array([w["word"].endswith(_CLAUSE_END) for w in words], dtype=bool)
 
 
 
-    if variance < 0.01:
+    # The word spoken last before a pause is the last one starting before its midpoint
 
-        return 0.8
+    before = np.searchsorted(starts, pause_seconds, side="right") - 1
 
-    elif variance < 0.03:
+    natural = (before >= 0) & clause_end[np.maximum(before, 0)]
 
-        return 0.6
+    natural_ratio = float(natural.mean()) if pause_seconds.size else 1.0
 
-    else:
 
-        return 0.4
+
+    return _micro_timing_score(ends - starts), _confidence_scores(probabilities), natural_ratio
 
 
 
 
 
-def extract_acoustic_features(audio_path, transcript: str = ""):
+def extract_acoustic_features(audio, transcript: str = "", words: list | None = None, frames=None, levels=None):
 
     """
 
     Lightweight acoustic feature extraction for real-time scoring.
 
+    `audio` is an AudioClip (preferred: decoded once per request), raw 16 kHz samples or a file path.
+
+    `words` are the ASR word timings ({"word", "start", "end", "probability"}, seconds on the
+
+    clip's timeline). When given they drive pause alignment, micro-timing and the confidence
+
+    proxy; otherwise transcript punctuation positions and the voiced intervals stand in.
+
+    `frames` and `levels` (FrameStream.finish) carry an analysis built while the audio was
+
+    streamed in; with them only the pitch pass reads the samples, at its bounded cost.
+
     Returns dict with:
 
         - duration_sec
@@ -460,103 +734,119 @@ def extract_acoustic_features(audio_path, transcript: str = ""):
 
         - intonation_score
 
+        - pitch_range_semitones
+
+        - pitch_variability
+
         - micro_timing_score
 
     """
 
-    if librosa is None:
+    if isinstance(audio, AudioClip):
 
-        raise RuntimeError("Audio feature extraction requires librosa. Please install with `pip install librosa`.")
+        y, sr = audio.samples, audio.sample_rate
 
-    y, sr = librosa.load(audio_path, sr=16000)
+    elif isinstance(audio, np.ndarray):
 
+        y, sr = audio, SAMPLE_RATE
 
+    else:
 
-    duration = librosa.get_duration(y=y, sr=sr)
+        if librosa is None:
 
-    intervals = librosa.effects.split(y, top_db=25)
+            raise RuntimeError("Audio feature extraction requires librosa. Please install with `pip install librosa`.")
 
-    pause_count = max(0, len(intervals) - 1)
+        y, sr = librosa.load(audio, sr=SAMPLE_RATE)
 
 
 
-    # Pause durations and positions
+    # One framing pass: RMS, ZCR, spectral centroid (shared STFT) and speech intervals.
+
+    # A clip decoded by the pipeline already carries it (the same intervals gated Whisper).
 
-    pause_durations = []
+    if frames is None:
 
-    pause_positions = []
+        frames = audio.frames if isinstance(audio, AudioClip) and audio.frames is not None else analyze_frames(y, sr, top_db=25)
 
-    for i in range(len(intervals) - 1):
+    intervals = frames.intervals
 
-        gap_frames = (intervals[i + 1][0] - intervals[i][1])
+    starts, ends = intervals[:, 0], intervals[:, 1]
 
-        gap = gap_frames / sr
 
-        if gap > 0:
 
-            pause_durations.append(gap)
+    duration = y.size / float(sr)
 
-            mid = (intervals[i][1] + gap_frames // 2) / len(y)
+    pause_count = max(0, len(intervals) - 1)
+
+
+
+    # Pause durations and positions
+
+    gaps = starts[1:] - ends[:-1]
+
+    has_gap = gaps > 0
+
+    pause_durations = gaps[has_gap] / sr
 
-            pause_positions.append(mid)
+    pause_midpoints = ends[:-1][has_gap] + gaps[has_gap] // 2
 
-    avg_pause_duration = round(float(np.mean(pause_durations)), 2) if pause_durations else 0.0
+    pause_positions = pause_midpoints / y.size
+
+    avg_pause_duration = round(float(pause_durations.mean()), 2) if pause_durations.size else 0.0
 
 
 
     # Voiced time to estimate speech rate (WPM proxy assuming 150 wpm fully voiced)
 
-    voiced_time = sum((end - start) / sr for start, end in intervals) if len(intervals) > 0 else 0.0
+    voiced_durations = (ends - starts) / sr
+
+    voiced_time = float(voiced_durations.sum())
 
     speech_rate = round((voiced_time / duration) * 150, 2) if duration > 0 else 0.0
 
 
 
-    # Pause distribution scoring (natural vs mid-sentence)
+    # Word-level timing from the ASR pass, if available
 
-    punctuation_marks = [",", ".", "?", "!", ";", ":"]
+    word_timing = _word_timing_features(words, pause_midpoints / sr) if words else None
 
-    total_words = len(transcript.split())
 
-    punct_positions = []
 
-    if total_words > 0:
+    # Pause distribution scoring (natural vs mid-sentence)
 
-        words = transcript.split()
+    transcript_words = transcript.split()
 
-        cumulative = 0
+    punct_positions = np.array([
 
-        for idx, w in enumerate(words):
+        (idx + 1) / len(transcript_words)
 
-            cumulative += 1
+        for idx, w in enumerate(transcript_words)
 
-            if any(w.endswith(p) for p in punctuation_marks):
+        if w.endswith(_CLAUSE_END)
 
-                punct_positions.append(cumulative / total_words)
+    ])
 
-    def _natural_pause_ratio():
 
-        if not pause_positions:
 
-            return 1.0
+    if not pause_positions.size:
 
-        if not punct_positions:
+        natural_ratio = 1.0
 
-            return 0.7  # neutral when transcript lacks punctuation cues
+    elif word_timing is not None:
 
-        naturals = 0
+        natural_ratio = word_timing[2]
 
-        for p in pause_positions:
+    elif not punct_positions.size:
 
-            if any(abs(p - pp) < 0.05 for pp in punct_positions):
+        natural_ratio = 0.7  # neutral when transcript lacks punctuation cues
 
-                naturals += 1
+    else:
 
-        return naturals / len(pause_positions)
+        near_punct = np.abs(pause_positions[:, None] - punct_positions[None, :]) < 0.05
 
-    natural_ratio = _natural_pause_ratio()
+        natural_ratio = float(near_punct.any(axis=1).mean())
 
-    pause_distribution_score = round(8 - (1 - natural_ratio) * 4, 2) if pause_positions else 7.5
+    pause_distribution_score = round(8 - (1 - natural_ratio) * 4, 2) if pause_positions.size else 7.5
 
     pause_distribution_score = max(4.0, min(8.0, pause_distribution_score))
 
@@ -564,18 +854,18 @@ def extract_acoustic_features(audio_path, transcript: str = ""):
 
     # Rhythm consistency (lower CV of voiced segment lengths => better)
 
-    voiced_durations = [ (end - start) / sr for start, end in intervals ] if len(intervals) > 0 else []
-
-    if voiced_durations:
+    if voiced_durations.size:
 
-        mean_v = np.mean(voiced_durations)
+        mean_v = float(voiced_durations.mean())
 
-        cv = np.std(voiced_durations) / mean_v if mean_v > 0 else 1.0
+        cv = float(voiced_durations.std()) / mean_v if mean_v > 0 else 1.0
 
     else:
 
         cv = 1.0
 
+
+
     if cv <= 0.25:
 
         speech_rhythm_score = 8.0
@@ -596,7 +886,7 @@ def extract_acoustic_features(audio_path, transcript: str = ""):
 
     # Hesitation & sentence flow
 
-    short_pauses = len([p for p in pause_durations if p < 0.25])
+    short_pauses = int(np.count_nonzero(pause_durations < 0.25))
 
     hesitation_score = max(4.0, min(8.0, 8 - (short_pauses * 0.2 + pause_count * 0.1)))
 
@@ -606,30 +896,38 @@ def extract_acoustic_features(audio_path, transcript: str = ""):
 
     # Variability metrics
 
-    rms = librosa.feature.rms(y=y, frame_length=2048, hop_length=512)[0]
+    speech_variability = round(float(np.std(frames.rms)), 4)
 
-    speech_variability = round(float(np.std(rms)), 4)
+    energy_variation = round(float(np.std(frames.zcr)), 4)
 
-    zcr = librosa.feature.zero_crossing_rate(y)[0]
 
-    energy_variation = round(float(np.std(zcr)), 4)
 
+    # Audio quality detection (noise, clipping, low volume)
 
+    if levels is not None:
 
-    # Audio quality detection (noise, clipping, low volume)
+        peak, noise_floor, clipped = levels.peak, levels.percentile(10), levels.clipped
+
+    else:
 
-    peak = np.max(np.abs(y)) if len(y) else 0
+        abs_y = np.abs(y)
 
-    rms_mean = float(np.mean(rms)) if len(rms) else 0.0
+        peak = float(abs_y.max()) if y.size else 0.0
 
-    noise_floor = float(np.percentile(np.abs(y), 10)) if len(y) else 0.0
+        noise_floor = _percentile_10(abs_y) if y.size else 0.0
+
+        clipped = int(np.count_nonzero(abs_y > CLIPPING_LEVEL))
+
+    rms_mean = float(frames.rms.mean()) if frames.rms.size else 0.0
 
     snr_proxy = peak / (noise_floor + 1e-4)
 
-    clipping_ratio = float(np.mean(np.abs(y) > 0.98)) if len(y) else 0.0
+    clipping_ratio = clipped / y.size if y.size else 0.0
 
     low_volume_penalty = 1.0 if rms_mean < 0.01 else 0.0
 
+
+
     audio_quality_score = 8 - (clipping_ratio * 4) - low_volume_penalty
 
     if snr_proxy < 5:
@@ -644,9 +942,7 @@ def extract_acoustic_features(audio_path, transcript: str = ""):
 
     # Use clarity + variability + ASR confidence
 
-    spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-
-    centroid_var = float(np.std(spectral_centroid)) if len(spectral_centroid) else 0.0
+    centroid_var = float(np.std(frames.centroid)) if frames.centroid.size else 0.0
 
     clarity_factor = max(0.0, min(1.0, (snr_proxy / 20)))
 
@@ -654,17 +950,27 @@ def extract_acoustic_features(audio_path, transcript: str = ""):
 
 
 
-    # Word-level confidence refinement (if available)
+    # Word-level confidence refinement: ASR word probabilities, or one pseudo-word per
+
+    # voiced interval at a neutral confidence when there are no word timings
+
+    if word_timing is not None:
+
+        micro_timing_score, (phoneme_accuracy_conf, mispronunciation_rate_conf, stress_accuracy_conf), _ = word_timing
 
-    word_timestamps = []
+    else:
+
+        word_timestamps = [
 
-    # Placeholder: derive simple timestamps from intervals as proxy
+            {"start": start / sr, "end": end / sr, "confidence": 0.8}
 
-    for start, end in intervals:
+            for start, end in intervals.tolist()
 
-        word_timestamps.append({"start": start / sr, "end": end / sr, "confidence": 0.8})
+        ]
 
-    phoneme_accuracy_conf, mispronunciation_rate_conf, stress_accuracy_conf = refine_pronunciation_with_word_confidence(word_timestamps)
+        phoneme_accuracy_conf, mispronunciation_rate_conf, stress_accuracy_conf = refine_pronunciation_with_word_confidence(word_timestamps)
+
+        micro_timing_score = compute_micro_timing(word_timestamps)
 
     phoneme_accuracy = max(phoneme_accuracy_auto, phoneme_accuracy_conf)
 
@@ -674,9 +980,11 @@ def extract_acoustic_features(audio_path, transcript: str = ""):
 
 
 
-    intonation_score = compute_intonation_score(y) if len(y) else 0.6
+    # Pitch contour from the voiced intervals only (bounded cost, see utils.pitch)
+
+    pitch = pitch_statistics(yin_pitch(y, sr, intervals))
 
-    micro_timing_score = compute_micro_timing(word_timestamps)
+    intonation_score = compute_intonation_score(pitch)
 
 
 
@@ -720,6 +1028,10 @@ def extract_acoustic_features(audio_path, transcript: str = ""):
 
         "intonation_score": intonation_score,
 
+        "pitch_range_semitones": pitch["range_semitones"],
+
+        "pitch_variability": pitch["variability_semitones"],
+
         "micro_timing_score": micro_timing_score,
 
     }
@@ -728,6 +1040,24 @@ def extract_acoustic_features(audio_path, transcript: str = ""):
 
 
 
+def _percentile_10(values: np.ndarray) -> float:
+
+    """np.percentile(values, 10) via a linear-time partial sort instead of a full sort."""
+
+    pos = 0.1 * (values.size - 1)
+
+    lo = int(np.floor(pos))
+
+    hi = min(lo + 1, values.size - 1)
+
+    part = np.partition(values, (lo, hi))
+
+    return float(part[lo] + (part[hi] - part[lo]) * (pos - lo))
+
+
+
+
+
 def split_transcript_with_gpt(transcript: str, questions: list):
 
     """
@@ -1401,199 +1731,614 @@ Do NOT include explanations or markdown."""
 
 # ------------------------------------------------------------
 
-# Helper to process a single part (reused by both endpoints)
+# CPU-bound audio stages (executed on the inference pool)
 
 # ------------------------------------------------------------
 
-async def _evaluate_speaking_part_audio(audio_bytes: bytes, part: int, question: str = None, questions: str = None, debug: bool = False):
+def _convert_audio(source, audio_hash: str, part: int) -> AudioClip:
 
-    part_start = time.time()
+    """
+    Decode uploaded bytes once into an AudioClip with its frame analysis (speech intervals)
+    attached. `source` is the upload's bytes or the path of its spooled file.
+    Only recordings beyond SPEAKING_MAX_AUDIO_SECONDS are cut (ffmpeg stops decoding just
+    past the limit); long Part 2 turns are kept whole and transcribed in parallel chunks.
+    """
 
-    # Validate raw bytes
+    max_decode_seconds = SPEAKING_MAX_AUDIO_SECONDS + 1.0
+    if isinstance(source, str):
+        clip = AudioClip.from_file(source, audio_hash, max_decode_seconds)
+    else:
+        clip = AudioClip.from_bytes(source, audio_hash, max_decode_seconds)
 
-    if not audio_bytes or len(audio_bytes) < 1000:
+    if clip.duration > SPEAKING_MAX_AUDIO_SECONDS:
 
-        print({"event": "audio_error", "part": part, "reason": "invalid_audio_bytes"})
+        print({"event": "audio_warn", "part": part, "reason": "trimmed_to_max", "duration": round(clip.duration, 2), "max_seconds": SPEAKING_MAX_AUDIO_SECONDS})
 
-        return {
+        clip = clip.trimmed(SPEAKING_MAX_AUDIO_SECONDS)
 
-            "part": part,
+    return clip.with_frames(top_db=25).with_fingerprint()
 
-            "error": "invalid_audio",
 
-            "message": "Uploaded audio is empty or too small",
 
-            "transcript": "",
 
-            "audio_metrics": {},
 
-            "result": None,
+async def _transcribe_speech(clip: AudioClip, part: int) -> dict:
 
-            "processing_time": round(time.time() - part_start, 3)
+    """
 
-        }
+    Transcribe only the voiced intervals (joined with short gaps); silence never reaches Whisper.
 
-    audio_hash = hashlib.sha256(audio_bytes).hexdigest()
+    Returns {"text", "words"}: word timings and probabilities from the same Whisper pass,
 
-    # Convert to wav once using in-memory bytes
+    mapped back to the clip's own timeline (None if alignment failed).
 
-    dummy_upload = type("DummyUpload", (), {"file": io.BytesIO(audio_bytes)})
+    """
 
-    wav_path = normalize_to_wav(dummy_upload)
+    speech = clip.speech_only()
 
+    print({
 
+        "event": "vad_condensed",
 
-    if (not os.path.exists(wav_path)) or (os.path.getsize(wav_path) < 2000):
+        "part": part,
 
-        print({"event": "audio_error", "part": part, "reason": "conversion_failed"})
+        "duration": round(clip.duration, 2),
 
-        return {
+        "speech_duration": round(speech.duration, 2),
 
-            "part": part,
+        "segments": len(speech.segments),
 
-            "error": "conversion_failed",
+    })
 
-            "message": "Audio conversion failed or produced empty file",
+    if speech.samples.size == 0:
 
-            "transcript": "",
+        return {"text": "", "words": []}
 
-            "audio_metrics": {},
+    result = await transcribe_long(speech.samples, speech.sample_rate, word_timestamps=True)
 
-            "result": None,
+    words = result["words"]
 
-            "processing_time": round(time.time() - part_start, 3)
+    if words:
 
-        }
+        starts = speech.to_original([w["start"] for w in words])
 
+        ends = speech.to_original([w["end"] for w in words])
 
+        words = [
 
-    # Cap overly long audio to keep Whisper fast
+            {**w, "start": round(float(start), 3), "end": round(float(end), 3)}
 
-    try:
+            for w, start, end in zip(words, starts, ends)
 
-        dur_sec = _wav_duration_seconds(wav_path)
+        ]
 
-        if dur_sec > 90:
+    return {"text": result["text"], "words": words}
 
-            _trim_wav(wav_path, 90)
 
-    except Exception as exc:
 
-        print({"event": "audio_warn", "part": part, "reason": "duration_check_failed", "details": str(exc)})
 
 
+def _asr_entry(cached):
 
-    if audio_hash in _ASR_CACHE:
+    """ASR cache value as {"text", "words"}; entries cached before word timings were kept are plain text."""
 
-        transcript = _ASR_CACHE[audio_hash]
+    if isinstance(cached, str):
 
-    else:
+        return {"text": cached, "words": None}
 
-        if WHISPER_MODEL is None:
+    return cached
 
-            raise RuntimeError("Whisper model not available; install dependencies.")
 
-        try:
 
-            print({"event": "transcription_start", "part": part})
 
-            transcript = WHISPER_MODEL.transcribe(
 
-                wav_path,
+# Per-stage time limits for the part pipeline (seconds, 0 = none). A slow ASR ends the
 
-                fp16=False,
+# part with an error; slow features or transcript split fall back to a partial result.
 
-                verbose=False
+SPEAKING_ASR_TIMEOUT_SECONDS = float(os.getenv("SPEAKING_ASR_TIMEOUT_SECONDS", "300"))
 
-            )["text"]
+SPEAKING_FEATURES_TIMEOUT_SECONDS = float(os.getenv("SPEAKING_FEATURES_TIMEOUT_SECONDS", "60"))
 
-        except Exception as exc:
+SPEAKING_SPLIT_TIMEOUT_SECONDS = float(os.getenv("SPEAKING_SPLIT_TIMEOUT_SECONDS", "30"))
 
-            print({"event": "audio_error", "part": part, "reason": "transcription_failed", "details": str(exc)})
 
-            return {
 
-                "part": part,
 
-                "error": "transcription_failed",
 
-                "details": str(exc),
+class _PartFailed(Exception):
 
-                "transcript": "",
+    """Raised by a pipeline stage to end the part early with `response`."""
 
-                "audio_metrics": {},
 
-                "result": None,
 
-                "processing_time": round(time.time() - part_start, 3)
+    def __init__(self, response: dict):
 
-            }
+        super().__init__(response.get("error"))
 
-        _ASR_CACHE[audio_hash] = transcript
+        self.response = response
 
 
 
-    if audio_hash in _FEATURE_CACHE:
 
-        audio_metrics = _FEATURE_CACHE[audio_hash].copy()
 
-    else:
+def _partial_audio_metrics(clip: AudioClip) -> dict:
 
-        audio_metrics = extract_acoustic_features(wav_path, transcript)
+    """Metrics available from the decode stage alone (duration, pauses), used when feature extraction fails."""
 
-        _FEATURE_CACHE[audio_hash] = audio_metrics.copy()
+    intervals = clip.frames.intervals if clip.frames is not None else np.empty((0, 2))
 
+    return {
 
+        "duration_sec": round(clip.duration, 2),
 
-    if not transcript or not transcript.strip():
+        "pause_count": max(0, len(intervals) - 1),
 
-        print({"event": "audio_error", "part": part, "reason": "no_speech_detected"})
+        "features_partial": True,
 
-        return {
+    }
 
-            "part": part,
 
-            "error": "no_speech_detected",
 
-            "message": "No speech detected in audio",
 
-            "transcript": "",
 
-            "audio_metrics": audio_metrics,
+def _audio_stages(audio_source, audio_hash: str, part: int, part_start: float) -> list:
 
-            "result": None,
+    """
 
-            "processing_time": round(time.time() - part_start, 3)
+    Decode -> ASR -> acoustic features as stage-graph nodes ("decode", "asr", "features").
 
-        }
+    "asr" yields {"text", "words"} (see _transcribe_speech); the word timings feed the features.
 
+    CPU work runs on the inference pool so the event loop stays free; results cached under
 
+    the exact hash (or found via the audio fingerprint) short-circuit their stage.
 
-    # Speech rate
+    """
 
-    words = len(transcript.split())
 
-    duration = audio_metrics["duration_sec"]
 
-    audio_metrics["speech_rate_wpm"] = round((words / duration) * 60) if duration > 0 else 0
+    async def decode():
 
+        transcript = _asr_entry(_ASR_CACHE.get(audio_hash))
 
+        audio_metrics = _FEATURE_CACHE.get(audio_hash)
 
-    # Duration validation + ASR confidence + pronunciation proxy
+        if transcript is not None and audio_metrics is not None:
 
-    audio_metrics["duration_valid"] = duration >= 45
+            # Both stages cached (possibly by another worker): skip decoding entirely
 
-    audio_metrics["asr_confidence"] = 0.9 if transcript.strip() else 0.6
+            return {"clip": None, "transcript": transcript, "audio_metrics": audio_metrics}
 
-    audio_metrics["pronunciation_score"] = compute_pronunciation_score(audio_metrics, audio_metrics["asr_confidence"])
 
-    if "pronunciation_confidence" in audio_metrics:
 
-        base_pc = audio_metrics["pronunciation_confidence"]
+        try:
 
-        audio_metrics["pronunciation_confidence"] = round(min(1.0, (base_pc * 0.5) + (audio_metrics["asr_confidence"] * 0.5)), 3)
+            clip = await run_inference(_convert_audio, audio_source, audio_hash, part)
+
+        except AudioDecodeError as exc:
+
+            print({"event": "audio_warn", "part": part, "reason": "decode_failed", "details": str(exc)})
+
+            clip = None
+
+        if clip is None or clip.samples.size < 1000:
+
+            print({"event": "audio_error", "part": part, "reason": "conversion_failed"})
+
+            raise _PartFailed({
+
+                "part": part,
+
+                "error": "conversion_failed",
+
+                "message": "Audio conversion failed or produced empty file",
+
+                "transcript": "",
+
+                "audio_metrics": {},
+
+                "result": None,
+
+                "processing_time": round(time.time() - part_start, 3)
+
+            })
+
+
+
+        similar = _FINGERPRINT_INDEX.match(clip.fingerprint, exclude=audio_hash)
+
+        if similar is not None:
+
+            similar_hash, bit_error_rate = similar
+
+            if transcript is None:
+
+                transcript = _asr_entry(_ASR_CACHE.get(similar_hash))
+
+                if transcript is not None:
+
+                    _ASR_CACHE.set(audio_hash, transcript)
+
+            if audio_metrics is None:
+
+                audio_metrics = _FEATURE_CACHE.get(similar_hash)
+
+                if audio_metrics is not None:
+
+                    _FEATURE_CACHE.set(audio_hash, audio_metrics)
+
+            print({"event": "fingerprint_cache_hit", "part": part, "bit_error_rate": round(bit_error_rate, 3), "transcript": transcript is not None, "features": audio_metrics is not None})
+
+        if transcript is None or audio_metrics is None:
+
+            _FINGERPRINT_INDEX.add(audio_hash, clip.fingerprint)
+
+
+
+        return {"clip": clip, "transcript": transcript, "audio_metrics": audio_metrics}
+
+
+
+    async def asr(decode):
+
+        if decode["transcript"] is not None:
+
+            return decode["transcript"]
+
+        try:
+
+            print({"event": "transcription_start", "part": part})
+
+            transcript = await _transcribe_speech(decode["clip"], part)
+
+        except Exception as exc:
+
+            print({"event": "audio_error", "part": part, "reason": "transcription_failed", "details": str(exc)})
+
+            raise _PartFailed({
+
+                "part": part,
+
+                "error": "transcription_failed",
+
+                "details": str(exc),
+
+                "transcript": "",
+
+                "audio_metrics": {},
+
+                "result": None,
+
+                "processing_time": round(time.time() - part_start, 3)
+
+            })
+
+        _ASR_CACHE.set(audio_hash, transcript)
+
+        return transcript
+
+
+
+    async def features(decode, asr):
+
+        if decode["audio_metrics"] is not None:
+
+            return decode["audio_metrics"]
+
+        audio_metrics = await run_inference(extract_acoustic_features, decode["clip"], asr["text"], asr["words"])
+
+        _FEATURE_CACHE.set(audio_hash, audio_metrics)
+
+        return audio_metrics
+
+
+
+    def partial_features(decode, asr):
+
+        return _partial_audio_metrics(decode["clip"])
+
+
+
+    return [
+
+        Stage("decode", decode),
+
+        Stage("asr", asr, needs=("decode",), timeout=SPEAKING_ASR_TIMEOUT_SECONDS or None),
+
+        Stage("features", features, needs=("decode", "asr"), timeout=SPEAKING_FEATURES_TIMEOUT_SECONDS or None,
+
+              fallback=partial_features),
+
+    ]
+
+
+
+
+
+_SCORE_KEYS = ("fluency", "lexical", "grammar", "pronunciation")
+
+
+
+
+
+def _is_scored_evaluation(raw) -> bool:
+
+    """True when evaluate_speaking_part produced real scores rather than its fallback."""
+
+    return (
+
+        isinstance(raw, dict)
+
+        and not raw.get("error")
+
+        and all(isinstance(raw.get(k), (int, float)) for k in _SCORE_KEYS)
+
+    )
+
+
+
+
+
+def _merge_feedback(values: list):
+
+    """Merge per-question feedback: distinct strings are joined, lists concatenated (max 4 items)."""
+
+    merged = {}
+
+    for value in values:
+
+        if not isinstance(value, dict):
+
+            continue
+
+        for key, item in value.items():
+
+            current = merged.get(key)
+
+            if isinstance(item, str):
+
+                item = item.strip()
+
+                if not item:
+
+                    continue
+
+                if current is None:
+
+                    merged[key] = item
+
+                elif isinstance(current, str) and item not in current:
+
+                    merged[key] = f"{current} {item}"
+
+            elif isinstance(item, list):
+
+                current = current if isinstance(current, list) else []
+
+                merged[key] = (current + [x for x in item if x not in current])[:4]
+
+            elif current is None:
+
+                merged[key] = item
+
+    return merged
+
+
+
+
+
+def _derive_combined_result(qa_results: list) -> dict:
+
+    """
+
+    Part-level result from sanitized per-question results: criteria averaged and
+
+    rounded to the nearest half band, feedback merged.
+
+    """
+
+    derived = {
+
+        key: round_to_ielts_band(sum(float(r.get(key, 5)) for r in qa_results) / len(qa_results))
+
+        for key in _SCORE_KEYS
+
+    }
+
+    derived["feedback"] = _merge_feedback([r.get("feedback") for r in qa_results])
+
+    derived["vocabulary_feedback"] = _merge_feedback([r.get("vocabulary_feedback") for r in qa_results])
+
+    relevance = [r.get("relevance_score") for r in qa_results if isinstance(r.get("relevance_score"), (int, float))]
+
+    derived["relevance_score"] = round(sum(relevance) / len(relevance), 3) if relevance else 0.5
+
+    return derived
+
+
+
+
+
+# ------------------------------------------------------------
+
+# Helper to process a single part (reused by both endpoints)
+
+# ------------------------------------------------------------
+
+async def _evaluate_speaking_part_audio(audio_bytes, part: int, question: str = None, questions: str = None, debug: bool = False, on_stage=None, admitted: bool = False):
+
+    """
+
+    audio_bytes is the raw upload or an IngestedUpload (already hashed, possibly on disk).
+
+    The part runs as a stage graph: decode -> asr, then acoustic features and the GPT
+
+    transcript split side by side, then scoring. on_stage(name, value, timing), if given, is
+
+    awaited as each stage finishes. admitted=True when the caller already holds an
+
+    inference_admission() slot for this work.
+
+    """
+
+    part_start = time.time()
+
+
+
+    # Validate raw bytes
+
+    if not audio_bytes or len(audio_bytes) < 1000:
+
+        print({"event": "audio_error", "part": part, "reason": "invalid_audio_bytes"})
+
+        return {
+
+            "part": part,
+
+            "error": "invalid_audio",
+
+            "message": "Uploaded audio is empty or too small",
+
+            "transcript": "",
+
+            "audio_metrics": {},
+
+            "result": None,
+
+            "processing_time": round(time.time() - part_start, 3)
 
+        }
+
+
+
+    if isinstance(audio_bytes, IngestedUpload):
+
+        audio_hash, audio_source = audio_bytes.sha256, audio_bytes.source
+
+    else:
+
+        audio_hash, audio_source = hashlib.sha256(audio_bytes).hexdigest(), audio_bytes
+
+
+
+    # The admission slot covers the inference-pool stages: it is released once features
+
+    # exist, while the GPT split / scoring may still be running
+
+    admission = AsyncExitStack()
+
+    if not admitted:
+
+        try:
+
+            await admission.enter_async_context(inference_admission())
+
+        except InferencePoolBusy as exc:
+
+            print({"event": "audio_error", "part": part, "reason": "inference_pool_busy"})
+
+            raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "5"})
+
+
+
+    _, question_list = _parse_question_list(question, questions)
+
+
+
+    async def split(asr):
+
+        return await _split_answers(asr["text"], question_list)
+
+
+
+    def unsplit(asr):
+
+        # Split failed or timed out: every question is scored against the whole transcript
+
+        return [asr["text"]] * len(question_list) if question_list else [asr["text"]]
+
+
+
+    async def score(asr, features, split):
+
+        return await _score_part_transcript(asr["text"], features, part, question, questions, part_start, answers=split)
+
+
+
+    async def stage_done(name, value, timing):
+
+        if name == "features":
+
+            await admission.aclose()
+
+        if on_stage is not None:
+
+            await on_stage(name, value, timing)
+
+
+
+    stages = _audio_stages(audio_source, audio_hash, part, part_start) + [
+
+        Stage("split", split, needs=("asr",), timeout=SPEAKING_SPLIT_TIMEOUT_SECONDS or None, fallback=unsplit),
+
+        Stage("score", score, needs=("asr", "features", "split")),
+
+    ]
+
+    try:
 
+        results, timings = await run_stage_graph(stages, on_done=stage_done)
+
+    except _PartFailed as exc:
+
+        return exc.response
+
+    except StageTimeout as exc:
+
+        print({"event": "audio_error", "part": part, "reason": "stage_timeout", "details": str(exc)})
+
+        return {
+
+            "part": part,
+
+            "error": "stage_timeout",
+
+            "details": str(exc),
+
+            "transcript": "",
+
+            "audio_metrics": {},
+
+            "result": None,
+
+            "processing_time": round(time.time() - part_start, 3)
+
+        }
+
+    finally:
+
+        await admission.aclose()
+
+
+
+    print({"event": "stage_timings", "part": part, "stages": timings})
+
+    part_result = results["score"]
+
+    if isinstance(part_result, dict):
+
+        part_result["stage_timings"] = timings
+
+    return part_result
+
+
+
+
+
+def _parse_question_list(question: str = None, questions: str = None):
+
+    """(clean single question or None, list of questions) from the form fields."""
 
     clean_question = question if question and str(question).strip().lower() != "string" else None
 
@@ -1633,9 +2378,103 @@ async def _evaluate_speaking_part_audio(audio_bytes: bytes, part: int, question:
 
     question_list = [q.strip().lstrip(". ") for q in question_list if str(q).strip().lower() != "string"]
 
+    return clean_question, question_list
+
+
+
+
 
+async def _split_answers(transcript: str, question_list: list) -> list:
 
-    answers = split_transcript_with_gpt(transcript, question_list) if question_list else [transcript]
+    """One answer per question, split from the transcript by GPT (the whole transcript without questions)."""
+
+    if not question_list or not transcript or not transcript.strip():
+
+        return [transcript]
+
+    # GPT calls use the blocking OpenAI client; run them on threads so other clips keep progressing
+
+    return await asyncio.to_thread(split_transcript_with_gpt, transcript, question_list)
+
+
+
+
+
+async def _score_part_transcript(transcript: str, audio_metrics: dict, part: int, question: str = None,
+
+                                 questions: str = None, part_start: float = None, answers: list = None):
+
+    """
+
+    Everything after ASR and feature extraction: derived speech metrics, the GPT
+
+    transcript split (unless `answers` were already split) and per-question / part scoring.
+
+    """
+
+    part_start = part_start or time.time()
+
+
+
+    if not transcript or not transcript.strip():
+
+        print({"event": "audio_error", "part": part, "reason": "no_speech_detected"})
+
+        return {
+
+            "part": part,
+
+            "error": "no_speech_detected",
+
+            "message": "No speech detected in audio",
+
+            "transcript": "",
+
+            "audio_metrics": audio_metrics,
+
+            "result": None,
+
+            "processing_time": round(time.time() - part_start, 3)
+
+        }
+
+
+
+    # Speech rate
+
+    words = len(transcript.split())
+
+    duration = audio_metrics["duration_sec"]
+
+    audio_metrics["speech_rate_wpm"] = round((words / duration) * 60) if duration > 0 else 0
+
+
+
+    # Duration validation + ASR confidence + pronunciation proxy
+
+    audio_metrics["duration_valid"] = duration >= 45
+
+    audio_metrics["asr_confidence"] = 0.9 if transcript.strip() else 0.6
+
+    audio_metrics["pronunciation_score"] = compute_pronunciation_score(audio_metrics, audio_metrics["asr_confidence"])
+
+    if "pronunciation_confidence" in audio_metrics:
+
+        base_pc = audio_metrics["pronunciation_confidence"]
+
+        audio_metrics["pronunciation_confidence"] = round(min(1.0, (base_pc * 0.5) + (audio_metrics["asr_confidence"] * 0.5)), 3)
+
+
+
+    clean_question, question_list = _parse_question_list(question, questions)
+
+
+
+    if answers is None:
+
+        answers = await _split_answers(transcript, question_list)
+
+    answers = list(answers)
 
     if len(answers) != len(question_list):
 
@@ -1661,20 +2500,48 @@ async def _evaluate_speaking_part_audio(audio_bytes: bytes, part: int, question:
 
 
 
-    evaluated_qas = []
+    # Per-question evaluations are independent GPT calls: issue them as one concurrent wave.
 
-    for idx, q in enumerate(question_list):
+    # The combined (part-level) result is derived from them when every question was scored;
 
-        ans = answers[idx] if idx < len(answers) else ""
+    # SPEAKING_COMBINED_EVAL=gpt instead evaluates the combined text in the same wave.
 
-        eval_text = f"Question: {q}\nAnswer: {ans}"
+    qa_answers = [answers[idx] if idx < len(answers) else "" for idx in range(len(question_list))]
+
+    qa_texts = [f"Question: {q}\nAnswer: {ans}" for q, ans in zip(question_list, qa_answers)]
+
+    if question_list:
+
+        combined_eval_text = "\n\n".join(
+
+            [f"Question: {q}\nAnswer: {a}" for q, a in zip(question_list, answers)]
 
-        qa_result = evaluate_speaking_part(
-            part=part,
-            transcript=eval_text,
-            audio_metrics=audio_metrics
         )
 
+    else:
+
+        combined_eval_text = f"Question: {clean_question}\nAnswer: {transcript}" if clean_question else transcript
+
+    request_combined = not question_list or (len(question_list) > 1 and SPEAKING_COMBINED_EVAL == "gpt")
+
+
+
+    evaluations = await asyncio.gather(*(
+
+        asyncio.to_thread(evaluate_speaking_part, part=part, transcript=text, audio_metrics=audio_metrics)
+
+        for text in qa_texts + ([combined_eval_text] if request_combined else [])
+
+    ))
+
+    raw_qa_results = list(evaluations[:len(qa_texts)])
+
+
+
+    evaluated_qas = []
+
+    for q, ans, qa_result in zip(question_list, qa_answers, raw_qa_results):
+
         try:
             qa_result = sanitize_result(qa_result)
         except Exception as e:
@@ -1696,39 +2563,29 @@ async def _evaluate_speaking_part_audio(audio_bytes: bytes, part: int, question:
 
 
 
-    if question_list:
-
-        combined_eval_text = "\n\n".join(
-
-            [f"Question: {q}\nAnswer: {a}" for q, a in zip(question_list, answers)]
-
-        )
-
-        # Reuse single QA evaluation when only one question is present
-
-        if len(evaluated_qas) == 1:
-
-            result = evaluated_qas[0]["result"]
-
-        else:
+    if request_combined:
 
-            result = evaluate_speaking_part(
+        result = sanitize_result(evaluations[-1])
 
-                part=part,
+    elif len(evaluated_qas) == 1:
 
-                transcript=combined_eval_text,
+        # Reuse single QA evaluation when only one question is present
 
-                audio_metrics=audio_metrics
+        result = evaluated_qas[0]["result"]
 
-            )
+    elif all(_is_scored_evaluation(r) for r in raw_qa_results):
 
-            result = sanitize_result(result)
+        result = _derive_combined_result([qa["result"] for qa in evaluated_qas])
 
     else:
 
-        combined_eval_text = f"Question: {clean_question}\nAnswer: {transcript}" if clean_question else transcript
+        # A question fell back to default scores, so averaging would be misleading
 
-        result = evaluate_speaking_part(
+        print({"event": "combined_eval_fallback", "part": part, "questions": len(question_list)})
+
+        result = sanitize_result(await asyncio.to_thread(
+
+            evaluate_speaking_part,
 
             part=part,
 
@@ -1736,9 +2593,7 @@ async def _evaluate_speaking_part_audio(audio_bytes: bytes, part: int, question:
 
             audio_metrics=audio_metrics
 
-        )
-
-        result = sanitize_result(result)
+        ))
 
 
 
@@ -1783,6 +2638,26 @@ async def _evaluate_speaking_part_audio(audio_bytes: bytes, part: int, question:
 
 
 
+async def _gpt_stage(source: str, fallback, func, *args, **kwargs):
+
+    """
+
+    Run a blocking GPT helper on a worker thread, or return `fallback`
+
+    without calling GPT when its input text is empty.
+
+    """
+
+    if not source:
+
+        return fallback
+
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+
+
+
+
 # ------------------------------------------------------------
 
 # New endpoint: question-wise audio evaluation (1-15 questions)
@@ -1855,7 +2730,7 @@ async def evaluate_question_wise_audio(
 
 ):
 
-    test_result = safe_gpt_call("Say the word HELLO only.")
+    test_result = await asyncio.to_thread(safe_gpt_call, "Say the word HELLO only.")
     print(f"[GPT TEST] result={test_result}")
 
     audios = [
@@ -1902,21 +2777,93 @@ async def evaluate_question_wise_audio(
 
 
 
-    results = []
+    # Ingest every upload first, then evaluate the clips concurrently (bounded);
 
-    for audio_file, question in filtered:
+    # gather keeps the original question order.
 
-        audio_bytes = await audio_file.read()
+    clips = []
 
-        part_result = await _evaluate_speaking_part_audio(
+    try:
 
-            audio_bytes=audio_bytes,
+        for audio_file, question in filtered:
 
-            part=1,
+            clips.append((await _ingest(audio_file), question))
 
-            question=question
+        return await _evaluate_question_wise_clips(clips)
 
-        )
+    finally:
+
+        for upload, _ in clips:
+
+            upload.close()
+
+
+
+
+
+async def _no_emit(event: str, data):
+
+    return None
+
+
+
+
+
+async def _evaluate_question_wise_clips(clips: list, emit=None) -> dict:
+
+    """
+
+    Full-test evaluation of (audio, question) pairs in question order; audio is
+
+    raw bytes (job payloads) or an IngestedUpload.
+
+    Shared by /audio/question-wise, its SSE variant and the job queue. emit(event, data),
+
+    if given, is awaited with each partial result: transcript, metrics, question_score,
+
+    band9_answer, vocabulary and part_summary.
+
+    The whole test holds one inference admission, so it is either rejected up front or
+
+    runs to completion; if one clip fails the others are cancelled before returning.
+
+    """
+
+    emit = emit or _no_emit
+
+    semaphore = asyncio.Semaphore(QUESTION_WISE_CONCURRENCY)
+
+
+
+    async def _evaluate_clip(index: int, audio_bytes, question: str) -> dict:
+
+        async def on_stage(name, value, timing):
+
+            if name == "asr":
+
+                await emit("transcript", {"index": index, "question": question, "transcript": value["text"]})
+
+            elif name == "features":
+
+                await emit("metrics", {"index": index, "question": question, "audio_metrics": value})
+
+
+
+        async with semaphore:
+
+            part_result = await _evaluate_speaking_part_audio(
+
+                audio_bytes=audio_bytes,
+
+                part=1,
+
+                question=question,
+
+                on_stage=on_stage,
+
+                admitted=True
+
+            )
 
         if isinstance(part_result, dict):
 
@@ -1925,17 +2872,22 @@ async def evaluate_question_wise_audio(
             if pr:
 
                 try:
+
                     part_result["result"] = sanitize_result(pr)
+
                 except Exception as e:
+
                     print("sanitize_result error:", e)
+
                     part_result["result"] = {}
 
             if not part_result.get("result"):
+
                 part_result["result"] = {}
 
 
 
-        results.append({
+        item = {
 
             "question": question,
 
@@ -1943,7 +2895,49 @@ async def evaluate_question_wise_audio(
 
             "result": part_result.get("result")
 
-        })
+        }
+
+        await emit("question_score", {"index": index, **item})
+
+        return item
+
+
+
+    admission = AsyncExitStack()
+
+    try:
+
+        await admission.enter_async_context(inference_admission())
+
+    except InferencePoolBusy as exc:
+
+        print({"event": "audio_error", "part": "question_wise", "reason": "inference_pool_busy"})
+
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "5"})
+
+    tasks = [
+
+        asyncio.create_task(_evaluate_clip(index, audio_bytes, question))
+
+        for index, (audio_bytes, question) in enumerate(clips, start=1)
+
+    ]
+
+    try:
+
+        results = list(await asyncio.gather(*tasks))
+
+    finally:
+
+        # Nothing may outlive the request: the caller closes the uploads next
+
+        for task in tasks:
+
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        await admission.aclose()
 
 
 
@@ -1966,9 +2960,13 @@ async def evaluate_question_wise_audio(
         raw_overall = (avg_fluency + avg_lexical + avg_grammar + avg_pronunciation) / 4
 
         try:
+
             overall_band = round_to_ielts_band(raw_overall)
+
         except Exception as e:
+
             print("band rounding error:", e)
+
             overall_band = 5.0
 
     else:
@@ -1978,62 +2976,103 @@ async def evaluate_question_wise_audio(
 
 
     # Build part-wise aggregation using cue-card detection
+
     def is_cue_card(question_text: str) -> bool:
+
         text = (question_text or "").strip().lstrip(".,; ")
+
         if "|" in text:
+
             return True
+
         if text.lower().startswith("describe"):
+
             return True
+
         if len(text.split()) > 15:
+
             return True
+
         return False
 
     def _clean_result(r):
+
         return {
+
             "question": str(r.get("question", "")).strip(),
+
             "user_answer": str(r.get("transcript", "")).strip()
+
         }
 
     part_1_qas = []
+
     part_2_qas = []
+
     part_3_qas = []
+
     cue_card_found = False
 
     for r in results:
+
         question_text = r.get("question") or r.get("question_text", "")
+
         if not cue_card_found and is_cue_card(question_text):
+
             part_2_qas.append(r)
+
             cue_card_found = True
+
         elif not cue_card_found:
+
             part_1_qas.append(r)
+
         else:
+
             part_3_qas.append(r)
 
     if not cue_card_found:
+
         part_1_qas = results[:3]
+
         part_2_qas = []
+
         part_3_qas = results[3:]
 
     part_1_qas_clean = [_clean_result(r) for r in part_1_qas]
+
     part_2_qas_clean = [_clean_result(r) for r in part_2_qas]
+
     part_3_qas_clean = [_clean_result(r) for r in part_3_qas]
 
     try:
+
         part_1_summary = normalize_summary_bands(refine_feedback(_aggregate_part(part_1_qas)))
+
     except Exception as e:
+
         print("normalize_summary_bands error:", e)
+
         part_1_summary = {}
 
     try:
+
         part_2_summary = normalize_summary_bands(refine_feedback(_aggregate_part(part_2_qas)))
+
     except Exception as e:
+
         print("normalize_summary_bands error:", e)
+
         part_2_summary = {}
 
     try:
+
         part_3_summary = normalize_summary_bands(refine_feedback(_aggregate_part(part_3_qas)))
+
     except Exception as e:
+
         print("normalize_summary_bands error:", e)
+
         part_3_summary = {}
 
 
@@ -2043,8 +3082,11 @@ async def evaluate_question_wise_audio(
         if isinstance(summary, dict):
 
             summary["fluency"] = round_to_ielts_band(summary.get("fluency"))
+
             summary["lexical"] = round_to_ielts_band(summary.get("lexical"))
+
             summary["grammar"] = round_to_ielts_band(summary.get("grammar"))
+
             summary["pronunciation"] = round_to_ielts_band(summary.get("pronunciation"))
 
             fb = summary.get("feedback", {})
@@ -2054,134 +3096,161 @@ async def evaluate_question_wise_audio(
                 fb["improvements"] = clean_feedback(fb.get("improvements", ""))
 
     def _combine_context(qas_clean):
+
         return "\n\n".join(
+
             [
+
                 f"Question: {qa.get('question', '')}\nStudent answer: {qa.get('user_answer', '')}"
+
                 for qa in qas_clean
+
                 if qa.get("question") or qa.get("user_answer")
+
             ]
+
         ).strip()
 
     def _combine_answers_only(qas_clean):
+
         return "\n\n".join(
+
             [qa.get("user_answer", "") for qa in qas_clean if qa.get("user_answer")]
+
         ).strip()
 
     def _combine_transcripts(qas):
+
         return " ".join(
+
             [qa.get("transcript", "") for qa in qas if qa.get("transcript")]
+
         ).strip()
 
     p1_combined_context = _combine_context(part_1_qas_clean)
+
     p2_combined_context = _combine_context(part_2_qas_clean)
+
     p3_combined_context = _combine_context(part_3_qas_clean)
 
     p1_answers_only = _combine_answers_only(part_1_qas_clean)
+
     p2_answers_only = _combine_answers_only(part_2_qas_clean)
+
     p3_answers_only = _combine_answers_only(part_3_qas_clean)
 
     p1_combined_transcripts = _combine_transcripts(part_1_qas)
-    p2_combined_transcripts = _combine_transcripts(part_2_qas)
-    p3_combined_transcripts = _combine_transcripts(part_3_qas)
 
-    band9_part1 = generate_band9_answer(1, p1_combined_context, answers_only=p1_answers_only) if p1_combined_context else p1_answers_only
-    band9_part2 = generate_band9_answer(2, p2_combined_context, answers_only=p2_answers_only) if p2_combined_context else p2_answers_only
-    band9_part3 = generate_band9_answer(3, p3_combined_context, answers_only=p3_answers_only) if p3_combined_context else p3_answers_only
+    p2_combined_transcripts = _combine_transcripts(part_2_qas)
 
-    vocab_part1 = generate_vocabulary(1, p1_combined_transcripts) if p1_combined_transcripts else VOCAB_FALLBACK_PART1
-    vocab_part2 = generate_vocabulary(2, p2_combined_transcripts) if p2_combined_transcripts else VOCAB_FALLBACK_PART2
-    vocab_part3 = generate_vocabulary(3, p3_combined_transcripts) if p3_combined_transcripts else VOCAB_FALLBACK_PART3
+    p3_combined_transcripts = _combine_transcripts(part_3_qas)
 
     def _combined_for_feedback(qas_clean):
+
         return "\n\n".join(
+
             [
+
                 f"Q: {qa.get('question', '')}\nA: {qa.get('user_answer', '')}"
+
                 for qa in qas_clean
+
                 if qa.get("question") or qa.get("user_answer")
+
             ]
+
         ).strip()
 
     p1_feedback_text = _combined_for_feedback(part_1_qas_clean)
+
     p2_feedback_text = _combined_for_feedback(part_2_qas_clean)
+
     p3_feedback_text = _combined_for_feedback(part_3_qas_clean)
 
-    p1_scores = generate_scores(1, p1_feedback_text) if p1_feedback_text else {"fluency": 5.0, "lexical": 5.0, "grammar": 5.0, "pronunciation": 5.0}
-    p2_scores = generate_scores(2, p2_feedback_text) if p2_feedback_text else {"fluency": 5.0, "lexical": 5.0, "grammar": 5.0, "pronunciation": 5.0}
-    p3_scores = generate_scores(3, p3_feedback_text) if p3_feedback_text else {"fluency": 5.0, "lexical": 5.0, "grammar": 5.0, "pronunciation": 5.0}
+    # The twelve part-level GPT stages are independent: issue them as one concurrent wave.
 
-    p1_feedback = generate_mistakes(1, p1_feedback_text) if p1_feedback_text else {}
-    p2_feedback = generate_mistakes(2, p2_feedback_text) if p2_feedback_text else {}
-    p3_feedback = generate_mistakes(3, p3_feedback_text) if p3_feedback_text else {}
+    # Band-9 answers and vocabulary are emitted as they land, each part's summary once its four are in.
 
-    part_1 = {
+    async def _emitted(event: str, part: int, key: str, stage):
 
-        "questions": part_1_qas_clean,
+        value = await stage
 
-        "scores": p1_scores,
+        await emit(event, {"part": part, key: value})
 
-        "mistakes": {
-            "fluency": p1_feedback.get("fluency", ""),
-            "grammar": p1_feedback.get("grammar", ""),
-            "vocabulary": p1_feedback.get("vocabulary", ""),
-            "pronunciation": p1_feedback.get("pronunciation", "")
-        },
+        return value
 
-        "improvement": p1_feedback.get("improvement", "Focus on expanding your answers with specific examples."),
 
-        "band9_answer": band9_part1,
 
-        "vocabulary_to_learn": vocab_part1,
+    async def _part_level(part, qas_clean, context, answers_only, transcripts, feedback_text, vocab_fallback):
 
-    }
+        band9, vocab, scores, feedback = await asyncio.gather(
 
-    part_2 = {
+            _emitted("band9_answer", part, "band9_answer",
 
-        "questions": part_2_qas_clean,
+                     _gpt_stage(context, answers_only, generate_band9_answer, part, context, answers_only=answers_only)),
 
-        "scores": p2_scores,
+            _emitted("vocabulary", part, "vocabulary_to_learn",
 
-        "mistakes": {
-            "fluency": p2_feedback.get("fluency", ""),
-            "grammar": p2_feedback.get("grammar", ""),
-            "vocabulary": p2_feedback.get("vocabulary", ""),
-            "pronunciation": p2_feedback.get("pronunciation", "")
-        },
+                     _gpt_stage(transcripts, vocab_fallback, generate_vocabulary, part, transcripts)),
 
-        "improvement": p2_feedback.get("improvement", "Focus on expanding your answers with specific examples."),
+            _gpt_stage(feedback_text, {"fluency": 5.0, "lexical": 5.0, "grammar": 5.0, "pronunciation": 5.0}, generate_scores, part, feedback_text),
 
-        "band9_answer": band9_part2,
+            _gpt_stage(feedback_text, {}, generate_mistakes, part, feedback_text),
 
-        "vocabulary_to_learn": vocab_part2,
+        )
 
-    }
+        block = {
 
-    part_3 = {
+            "questions": qas_clean,
 
-        "questions": part_3_qas_clean,
+            "scores": scores,
 
-        "scores": p3_scores,
+            "mistakes": {
 
-        "mistakes": {
-            "fluency": p3_feedback.get("fluency", ""),
-            "grammar": p3_feedback.get("grammar", ""),
-            "vocabulary": p3_feedback.get("vocabulary", ""),
-            "pronunciation": p3_feedback.get("pronunciation", "")
-        },
+                "fluency": feedback.get("fluency", ""),
 
-        "improvement": p3_feedback.get("improvement", "Focus on expanding your answers with specific examples."),
+                "grammar": feedback.get("grammar", ""),
 
-        "band9_answer": band9_part3,
+                "vocabulary": feedback.get("vocabulary", ""),
 
-        "vocabulary_to_learn": vocab_part3,
+                "pronunciation": feedback.get("pronunciation", "")
+
+            },
+
+            "improvement": feedback.get("improvement", "Focus on expanding your answers with specific examples."),
+
+            "band9_answer": band9,
+
+            "vocabulary_to_learn": vocab,
+
+        }
+
+        await emit("part_summary", {"part": part, **block})
+
+        return block
 
-    }
+
+
+    part_1, part_2, part_3 = await asyncio.gather(
+
+        _part_level(1, part_1_qas_clean, p1_combined_context, p1_answers_only, p1_combined_transcripts, p1_feedback_text, VOCAB_FALLBACK_PART1),
+
+        _part_level(2, part_2_qas_clean, p2_combined_context, p2_answers_only, p2_combined_transcripts, p2_feedback_text, VOCAB_FALLBACK_PART2),
+
+        _part_level(3, part_3_qas_clean, p3_combined_context, p3_answers_only, p3_combined_transcripts, p3_feedback_text, VOCAB_FALLBACK_PART3),
+
+    )
 
 
 
     recalculated_overall = calculate_overall_band(
+
         part_1.get("scores", {}),
+
         part_2.get("scores", {}),
+
         part_3.get("scores", {})
+
     )
 
     final_response = {
@@ -2202,10 +3271,218 @@ async def evaluate_question_wise_audio(
 
         "mode": "part_wise",
 
-        "questions": len(questions)
+        "questions": len(clips)
 
     })
 
 
 
     return final_response
+
+
+
+# ------------------------------------------------------------
+# Job API: enqueue now, fetch the result later (polling or SSE)
+# ------------------------------------------------------------
+async def _run_part_job(payload: dict) -> dict:
+    part_result = await _evaluate_speaking_part_audio(
+        audio_bytes=payload["audio"],
+        part=payload["part"],
+        question=payload.get("question"),
+        questions=payload.get("questions"),
+    )
+    if isinstance(part_result, dict) and part_result.get("error") and not part_result.get("result"):
+        # Bad audio / no speech: retrying cannot help
+        raise JobError(part_result.get("error"))
+    response = _compat_part_response(part_result, payload["part"], payload["attempt_id"])
+    try:
+        await asyncio.to_thread(get_attempt_store().set_part, payload["attempt_id"], payload["part"], response["result"])
+    except AttemptNotFound:
+        # The attempt expired while the job was queued
+        raise JobError("attempt_not_found")
+    return response
+
+
+async def _run_question_wise_job(payload: dict) -> dict:
+    return await _evaluate_question_wise_clips(payload["clips"])
+
+
+register_job_handler("speaking_part", _run_part_job)
+register_job_handler("speaking_question_wise", _run_question_wise_job)
+
+
+def _question_wise_form_files(form) -> list:
+    """(upload, question) pairs from audio_1..audio_15 / question_1..question_15, in question order."""
+    pairs = []
+    for idx in range(1, 16):
+        audio_file, question = form.get(f"audio_{idx}"), form.get(f"question_{idx}")
+        if audio_file is not None and question and hasattr(audio_file, "read"):
+            pairs.append((audio_file, question))
+    return pairs
+
+
+def _job_accepted(job_id: str, **extra) -> JSONResponse:
+    return JSONResponse(status_code=202, content={
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/speaking/jobs/{job_id}",
+        "events_url": f"/speaking/jobs/{job_id}/events",
+        **extra,
+    })
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=float)}\n\n"
+
+
+@router.post("/jobs/part/{part}")
+async def enqueue_part_audio_job(
+    part: int,
+    file: UploadFile = File(...),
+    attempt_id: str | None = Form(None),
+    question: str | None = Form(None),
+    questions: str | None = Form(None),
+    priority: int = Form(0),
+):
+    """Queue a /part/{part}/audio evaluation; the job result has the same body."""
+    if part not in (1, 2, 3):
+        raise HTTPException(status_code=400, detail="Invalid part number")
+    attempt_id = await _attempt_for_part(part, attempt_id)
+    upload = await _ingest(file)
+    try:
+        audio_bytes = await asyncio.to_thread(upload.read_bytes)
+    finally:
+        upload.close()
+    job_id = await asyncio.to_thread(enqueue_job, "speaking_part", {
+        "audio": audio_bytes,
+        "part": part,
+        "question": question,
+        "questions": questions,
+        "attempt_id": attempt_id,
+    }, priority)
+    return _job_accepted(job_id, attempt_id=attempt_id)
+
+
+@router.post("/jobs/question-wise")
+async def enqueue_question_wise_job(request: Request):
+    """
+    Queue an /audio/question-wise evaluation. Same form fields (audio_1..audio_15,
+    question_1..question_15) plus an optional integer `priority`.
+    """
+    form = await request.form()
+    clips = []
+    for audio_file, question in _question_wise_form_files(form):
+        upload = await _ingest(audio_file)
+        try:
+            clips.append((await asyncio.to_thread(upload.read_bytes), question))
+        finally:
+            upload.close()
+    if not clips:
+        raise HTTPException(status_code=400, detail="no_audio_provided")
+    try:
+        priority = int(form.get("priority") or 0)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="priority must be an integer")
+    job_id = await asyncio.to_thread(enqueue_job, "speaking_question_wise", {"clips": clips}, priority)
+    return _job_accepted(job_id)
+
+
+@router.get("/jobs/{job_id}")
+async def get_speaking_job(job_id: str):
+    job = await asyncio.to_thread(get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_speaking_job(job_id: str):
+    """Server-sent events: `status` on every change, then `result` (or `error`) and the stream ends."""
+    if await asyncio.to_thread(get_job, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        last_status = None
+        while True:
+            job = await asyncio.to_thread(get_job, job_id)
+            if job is None:
+                yield _sse("error", {"job_id": job_id, "error": "job_not_found"})
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield _sse("status", {"job_id": job_id, "status": last_status, "attempts": job["attempts"]})
+            if last_status == DONE:
+                yield _sse("result", job["result"])
+                return
+            if last_status == FAILED:
+                yield _sse("error", {"job_id": job_id, "error": job["error"]})
+                return
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+# ------------------------------------------------------------
+# Progressive question-wise evaluation (server-sent events)
+# ------------------------------------------------------------
+# Comment lines sent while nothing else is ready keep proxies and clients from timing out
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+
+
+@router.post("/audio/question-wise/stream")
+async def stream_question_wise_audio(request: Request):
+    """
+    Same form fields as /audio/question-wise, answered as server-sent events while the
+    evaluation runs: `transcript` and `metrics` per question as its audio is processed,
+    `question_score` per question, `band9_answer` / `vocabulary` / `part_summary` per part,
+    then `result` with the /audio/question-wise response body (or `error`).
+    """
+    form = await request.form()
+    clips = []
+    try:
+        for audio_file, question in _question_wise_form_files(form):
+            clips.append((await _ingest(audio_file), question))
+    except BaseException:
+        for upload, _ in clips:
+            upload.close()
+        raise
+    if not clips:
+        raise HTTPException(status_code=400, detail="no_audio_provided")
+
+    queue = asyncio.Queue()
+
+    async def emit(event: str, data):
+        await queue.put(_sse(event, data))
+
+    async def run():
+        try:
+            await emit("result", await _evaluate_question_wise_clips(clips, emit=emit))
+        except HTTPException as exc:
+            await emit("error", {"error": exc.detail, "status_code": exc.status_code})
+        except Exception as exc:
+            print({"event": "question_wise_stream_error", "error": str(exc)})
+            await emit("error", {"error": "evaluation_failed", "details": str(exc)})
+        finally:
+            await queue.put(None)
+
+    async def events():
+        task = asyncio.create_task(run())
+        try:
+            yield _sse("accepted", {"questions": [question for _, question in clips]})
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    return
+                yield item
+        finally:
+            # Client gone (or stream finished): stop the evaluation and drop spooled uploads
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            for upload, _ in clips:
+                upload.close()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -1,27 +1,34 @@
 from fastapi import APIRouter, HTTPException
-from storage.speaking_store import SPEAKING_ATTEMPTS
-from utils.band import calculate_final_speaking_band
+from storage.speaking_store import get_attempt_store
+from utils.band import speaking_band_from_aggregate
 
 router = APIRouter(prefix="/speaking", tags=["Speaking"])
 
 
 @router.get("/final/{attempt_id}")
 def get_final_speaking_result(attempt_id: str):
-    if attempt_id not in SPEAKING_ATTEMPTS:
+    """
+    Band of the parts received so far, read from the attempt's running aggregate.
+    Clients poll this while later parts are evaluated: a provisional band is
+    available from two parts, and the part results are attached once all three are in.
+    """
+    store = get_attempt_store()
+    aggregate = store.get_aggregate(attempt_id)
+    if aggregate is None:
         raise HTTPException(status_code=404, detail="Invalid attempt_id")
 
-    parts = SPEAKING_ATTEMPTS[attempt_id]["parts"]
-
-    if not all(p in parts for p in [1, 2, 3]):
-        raise HTTPException(
-            status_code=400,
-            detail="All three parts (1, 2, 3) are required"
-        )
-
-    final_band = calculate_final_speaking_band(parts)
-
-    return {
+    summary = speaking_band_from_aggregate(aggregate)
+    response = {
         "attempt_id": attempt_id,
-        "part_results": parts,
-        "final_speaking_band": final_band
+        "status": "complete" if summary["complete"] else "provisional" if summary["band"] is not None else "pending",
+        "parts_received": summary["parts_received"],
+        "criteria": summary["criteria"],
+        "provisional_band": None if summary["complete"] else summary["band"],
+        "final_speaking_band": summary["band"] if summary["complete"] else None,
     }
+
+    if summary["complete"]:
+        attempt = store.get(attempt_id)
+        response["part_results"] = attempt["parts"] if attempt else {}
+
+    return response
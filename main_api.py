@@ -12,17 +12,40 @@ load_dotenv(dotenv_path=dotenv_path)
 # Debug print: was the key loaded?
 print("OPENAI_API_KEY loaded:", os.getenv("OPENAI_API_KEY") is not None)
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from evaluators.api.writing import router as writing_router
 from evaluators.api.reading import router as reading_router
 from evaluators.api.listening import router as listening_router
-from evaluators import speaking_audio
+from evaluators.api.speaking_text import router as speaking_text_router
+from evaluators import speaking_audio, speaking_final
+from utils.inference_pool import start_inference_pool, shutdown_inference_pool, inference_pool_stats
+from utils.audio_fingerprint import fingerprint_index_stats
+from utils.result_cache import result_cache_stats
+from utils.whisper_batcher import whisper_batcher_stats
+from utils.job_queue import start_job_workers, stop_job_workers, job_queue_stats
+from storage.speaking_store import attempt_store_stats
+from utils.answer_keys import answer_key_stats
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Spawn inference workers (and load Whisper in them) before the first upload
+    start_inference_pool()
+    # Background workers for /speaking/jobs (persisted in SQLite)
+    start_job_workers()
+    yield
+    await stop_job_workers()
+    shutdown_inference_pool()
+
 
 app = FastAPI(
     title="IELTS AI Evaluator API",
     description="AI-powered IELTS Writing, Reading, Listening & Speaking Evaluation API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # --------------------
@@ -32,6 +55,8 @@ app.include_router(writing_router)
 app.include_router(reading_router)
 app.include_router(listening_router)
 app.include_router(speaking_audio.router)
+app.include_router(speaking_text_router)
+app.include_router(speaking_final.router)
 
 # --------------------
 # Health Check
@@ -43,6 +68,21 @@ def health():
         "service": "IELTS AI Evaluator API"
     }
 
+# --------------------
+# Metrics
+# --------------------
+@app.get("/metrics")
+def metrics():
+    return {
+        "inference": inference_pool_stats(),
+        "caches": result_cache_stats(),
+        "audio_fingerprints": fingerprint_index_stats(),
+        "whisper_batching": whisper_batcher_stats(),
+        "jobs": job_queue_stats(),
+        "speaking_attempts": attempt_store_stats(),
+        "answer_keys": answer_key_stats()
+    }
+
 # --------------------
 # Root
 # --------------------
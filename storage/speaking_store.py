@@ -1,4 +1,506 @@
-from collections import defaultdict
+import copy
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from urllib.parse import unquote, urlparse
 
-# attempt_id -> { "parts": {1: {...}, 2: {...}, 3: {...}} }
-SPEAKING_ATTEMPTS = defaultdict(lambda: {"parts": {}})
+from utils.band import add_speaking_part
+
+
+# attempt_id -> {"parts": {1: {...}, 2: {...}, 3: {...}}} plus a running band aggregate
+# (utils.band.add_speaking_part) updated in the same write as each part, so the final /
+# provisional band is one small read however often clients poll for it.
+# Parts of one attempt can be uploaded to different uvicorn workers (or hosts), so the
+# backend is chosen by SPEAKING_STORE:
+#   memory - per-process LRU with TTL (single worker, tests)
+#   sqlite - SPEAKING_STORE_DB in WAL mode, shared by every worker process on the host
+#   redis  - any Redis-protocol server at SPEAKING_STORE_URL, shared across hosts
+SPEAKING_STORE = os.getenv("SPEAKING_STORE", "memory").strip().lower()
+SPEAKING_STORE_TTL_SECONDS = float(os.getenv("SPEAKING_STORE_TTL_SECONDS", "86400"))
+SPEAKING_STORE_MAX_ATTEMPTS = int(os.getenv("SPEAKING_STORE_MAX_ATTEMPTS", "10000"))
+SPEAKING_STORE_DB = os.getenv("SPEAKING_STORE_DB", "speaking_attempts.sqlite3")
+SPEAKING_STORE_URL = os.getenv("SPEAKING_STORE_URL", "redis://localhost:6379/0")
+
+# Expired attempts are purged from the SQLite store once every this many writes
+_SQLITE_PRUNE_EVERY = 200
+
+
+class AttemptNotFound(KeyError):
+    """The attempt does not exist (or has expired)."""
+
+
+def _json_default(value):
+    # numpy scalars in audio metrics
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps(result) -> str:
+    return json.dumps(result, default=_json_default)
+
+
+class AttemptStore(ABC):
+    """
+    Interface shared by the backends. Part results are stored as JSON, one entry per
+    part, so concurrent uploads of different parts never overwrite each other; the
+    band aggregate is updated atomically with each part. Every write refreshes the
+    attempt's TTL; nothing is created implicitly.
+    """
+
+    backend = "base"
+
+    @abstractmethod
+    def create(self, attempt_id: str | None = None) -> str:
+        """Start an attempt (a new id unless one is given) and return its id."""
+
+    @abstractmethod
+    def exists(self, attempt_id: str) -> bool:
+        """Whether the attempt is live."""
+
+    @abstractmethod
+    def set_part(self, attempt_id: str, part: int, result, create: bool = False):
+        """Store one part's result. Raises AttemptNotFound unless the attempt exists or create=True."""
+
+    @abstractmethod
+    def get(self, attempt_id: str) -> dict | None:
+        """{"parts": {part: result}} for a live attempt, else None."""
+
+    @abstractmethod
+    def get_aggregate(self, attempt_id: str) -> dict | None:
+        """The attempt's band aggregate ({} before any part), None if it does not exist."""
+
+    @abstractmethod
+    def delete(self, attempt_id: str):
+        """Drop the attempt and its parts."""
+
+    def stats(self) -> dict:
+        return {"backend": self.backend}
+
+
+# ------------------------------------------------------------
+# In-process LRU / TTL
+# ------------------------------------------------------------
+class MemoryAttemptStore(AttemptStore):
+    backend = "memory"
+
+    def __init__(self, ttl_seconds: float = SPEAKING_STORE_TTL_SECONDS, max_attempts: int = SPEAKING_STORE_MAX_ATTEMPTS):
+        self.ttl_seconds = ttl_seconds
+        self.max_attempts = max(1, int(max_attempts))
+        self._attempts = OrderedDict()  # attempt_id -> (parts {part: json}, aggregate, expires_at)
+        self._lock = threading.Lock()
+        self._stats = {"evictions": 0, "expirations": 0}
+
+    def _expires_at(self) -> float:
+        return time.time() + self.ttl_seconds if self.ttl_seconds > 0 else float("inf")
+
+    def _live(self, attempt_id: str):
+        entry = self._attempts.get(attempt_id)
+        if entry is None:
+            return None
+        if entry[2] <= time.time():
+            del self._attempts[attempt_id]
+            self._stats["expirations"] += 1
+            return None
+        self._attempts.move_to_end(attempt_id)
+        return entry
+
+    def _put(self, attempt_id: str, parts: dict, aggregate: dict):
+        self._attempts[attempt_id] = (parts, aggregate, self._expires_at())
+        self._attempts.move_to_end(attempt_id)
+        while len(self._attempts) > self.max_attempts:
+            self._attempts.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def create(self, attempt_id: str | None = None) -> str:
+        attempt_id = attempt_id or uuid.uuid4().hex
+        with self._lock:
+            entry = self._live(attempt_id)
+            self._put(attempt_id, *(entry[:2] if entry else ({}, {})))
+        return attempt_id
+
+    def exists(self, attempt_id: str) -> bool:
+        with self._lock:
+            return self._live(attempt_id) is not None
+
+    def set_part(self, attempt_id: str, part: int, result, create: bool = False):
+        payload = _dumps(result)
+        with self._lock:
+            entry = self._live(attempt_id)
+            if entry is None and not create:
+                raise AttemptNotFound(attempt_id)
+            parts = entry[0] if entry else {}
+            parts[int(part)] = payload
+            self._put(attempt_id, parts, add_speaking_part(entry[1] if entry else None, part, result))
+
+    def get(self, attempt_id: str) -> dict | None:
+        with self._lock:
+            entry = self._live(attempt_id)
+            if entry is None:
+                return None
+            parts = dict(entry[0])
+        return {"parts": {part: json.loads(payload) for part, payload in sorted(parts.items())}}
+
+    def get_aggregate(self, attempt_id: str) -> dict | None:
+        with self._lock:
+            entry = self._live(attempt_id)
+            return None if entry is None else copy.deepcopy(entry[1])
+
+    def delete(self, attempt_id: str):
+        with self._lock:
+            self._attempts.pop(attempt_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": self.backend, "attempts": len(self._attempts), **self._stats}
+
+
+# ------------------------------------------------------------
+# SQLite (WAL): shared by the worker processes of one host
+# ------------------------------------------------------------
+class SQLiteAttemptStore(AttemptStore):
+    backend = "sqlite"
+
+    def __init__(self, path: str = SPEAKING_STORE_DB, ttl_seconds: float = SPEAKING_STORE_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread, reopened after a fork (pre-forking servers)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS attempts ("
+                "id TEXT PRIMARY KEY, expires_at REAL NOT NULL, aggregate TEXT NOT NULL DEFAULT '{}')"
+            )
+            if "aggregate" not in {row[1] for row in conn.execute("PRAGMA table_info(attempts)")}:
+                conn.execute("ALTER TABLE attempts ADD COLUMN aggregate TEXT NOT NULL DEFAULT '{}'")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS attempt_parts ("
+                "attempt_id TEXT NOT NULL, part INTEGER NOT NULL, result TEXT NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (attempt_id, part))"
+            )
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _expires_at(self, now: float) -> float:
+        return now + self.ttl_seconds if self.ttl_seconds > 0 else float("inf")
+
+    def _write(self, attempt_id: str, part: int | None, result, create: bool):
+        payload = None if part is None else _dumps(result)
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT expires_at, aggregate FROM attempts WHERE id = ?", (attempt_id,)).fetchone()
+            if row is None or row[0] <= now:
+                if not create:
+                    raise AttemptNotFound(attempt_id)
+                # Expired attempts start over
+                conn.execute("DELETE FROM attempt_parts WHERE attempt_id = ?", (attempt_id,))
+                aggregate = {}
+            else:
+                aggregate = json.loads(row[1])
+            if part is not None:
+                aggregate = add_speaking_part(aggregate, part, result)
+                conn.execute(
+                    "INSERT OR REPLACE INTO attempt_parts (attempt_id, part, result, updated_at) VALUES (?, ?, ?, ?)",
+                    (attempt_id, int(part), payload, now),
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO attempts (id, expires_at, aggregate) VALUES (?, ?, ?)",
+                (attempt_id, self._expires_at(now), json.dumps(aggregate)),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        self._writes += 1
+        if self._writes % _SQLITE_PRUNE_EVERY == 0:
+            self.prune()
+
+    def create(self, attempt_id: str | None = None) -> str:
+        attempt_id = attempt_id or uuid.uuid4().hex
+        self._write(attempt_id, None, None, create=True)
+        return attempt_id
+
+    def exists(self, attempt_id: str) -> bool:
+        row = self._connect().execute(
+            "SELECT 1 FROM attempts WHERE id = ? AND expires_at > ?", (attempt_id, time.time())
+        ).fetchone()
+        return row is not None
+
+    def set_part(self, attempt_id: str, part: int, result, create: bool = False):
+        self._write(attempt_id, part, result, create)
+
+    def get(self, attempt_id: str) -> dict | None:
+        conn = self._connect()
+        conn.execute("BEGIN")  # one snapshot for both reads
+        try:
+            if conn.execute(
+                "SELECT 1 FROM attempts WHERE id = ? AND expires_at > ?", (attempt_id, time.time())
+            ).fetchone() is None:
+                return None
+            rows = conn.execute(
+                "SELECT part, result FROM attempt_parts WHERE attempt_id = ? ORDER BY part", (attempt_id,)
+            ).fetchall()
+        finally:
+            conn.execute("COMMIT")
+        return {"parts": {part: json.loads(result) for part, result in rows}}
+
+    def get_aggregate(self, attempt_id: str) -> dict | None:
+        row = self._connect().execute(
+            "SELECT aggregate FROM attempts WHERE id = ? AND expires_at > ?", (attempt_id, time.time())
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def delete(self, attempt_id: str):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM attempt_parts WHERE attempt_id = ?", (attempt_id,))
+        conn.execute("DELETE FROM attempts WHERE id = ?", (attempt_id,))
+        conn.execute("COMMIT")
+
+    def prune(self) -> int:
+        """Delete expired attempts; returns how many were removed."""
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "DELETE FROM attempt_parts WHERE attempt_id IN (SELECT id FROM attempts WHERE expires_at <= ?)", (now,)
+        )
+        removed = conn.execute("DELETE FROM attempts WHERE expires_at <= ?", (now,)).rowcount
+        conn.execute("COMMIT")
+        return removed
+
+    def stats(self) -> dict:
+        row = self._connect().execute(
+            "SELECT COUNT(*) FROM attempts WHERE expires_at > ?", (time.time(),)
+        ).fetchone()
+        return {"backend": self.backend, "path": self.path, "attempts": row[0]}
+
+
+# ------------------------------------------------------------
+# Redis protocol (RESP2) over a plain socket: no client library needed
+# ------------------------------------------------------------
+class RedisError(RuntimeError):
+    """Error reply from the server."""
+
+
+class _RespConnection:
+    def __init__(self, host: str, port: int, timeout: float):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._reader = self._sock.makefile("rb")
+
+    def close(self):
+        try:
+            self._reader.close()
+            self._sock.close()
+        except OSError:
+            pass
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(out)
+
+    def _read(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode("utf-8")
+        if kind == b"-":
+            return RedisError(body.decode("utf-8"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            size = int(body)
+            if size < 0:
+                return None
+            data = self._reader.read(size + 2)
+            return data[:-2].decode("utf-8")
+        if kind == b"*":
+            size = int(body)
+            return None if size < 0 else [self._read() for _ in range(size)]
+        raise ConnectionError(f"Unexpected Redis reply: {line!r}")
+
+    def execute(self, *commands) -> list:
+        """Send several commands in one round trip and return their replies."""
+        self._sock.sendall(b"".join(self._encode(command) for command in commands))
+        return [self._read() for _ in commands]
+
+
+class RedisAttemptStore(AttemptStore):
+    """
+    One hash per attempt (fields "created_at", "aggregate" and "part:<n>") with a key
+    TTL. Part writes are WATCH / MULTI / EXEC transactions, so a part is never written
+    to an attempt that expired or was deleted in between, and concurrent parts never
+    lose each other's contribution to the aggregate.
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str = SPEAKING_STORE_URL, ttl_seconds: float = SPEAKING_STORE_TTL_SECONDS,
+                 prefix: str = "speaking:attempt:", timeout: float = 5.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.ttl_seconds = int(ttl_seconds)
+        self.prefix = prefix
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> _RespConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = _RespConnection(self.host, self.port, self.timeout)
+            setup = ([("AUTH", self.password)] if self.password else []) + ([("SELECT", self.db)] if self.db else [])
+            for reply in conn.execute(*setup) if setup else []:
+                if isinstance(reply, RedisError):
+                    conn.close()
+                    raise reply
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _execute(self, *commands) -> list:
+        """Run commands, reconnecting once if the connection was dropped."""
+        for retry in (False, True):
+            try:
+                return self._connection().execute(*commands)
+            except (ConnectionError, OSError):
+                self.close()
+                if retry:
+                    raise
+
+    def close(self):
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _key(self, attempt_id: str) -> str:
+        return self.prefix + attempt_id
+
+    def _expire(self, key: str) -> tuple:
+        return ("EXPIRE", key, self.ttl_seconds) if self.ttl_seconds > 0 else ("PERSIST", key)
+
+    def create(self, attempt_id: str | None = None) -> str:
+        attempt_id = attempt_id or uuid.uuid4().hex
+        key = self._key(attempt_id)
+        replies = self._execute(("MULTI",), ("HSETNX", key, "created_at", time.time()), self._expire(key), ("EXEC",))
+        _raise_errors(replies)
+        return attempt_id
+
+    def exists(self, attempt_id: str) -> bool:
+        return self._execute(("EXISTS", self._key(attempt_id)))[0] == 1
+
+    def set_part(self, attempt_id: str, part: int, result, create: bool = False):
+        key = self._key(attempt_id)
+        payload = _dumps(result)
+        while True:
+            replies = self._execute(("WATCH", key), ("HMGET", key, "created_at", "aggregate"))
+            _raise_errors(replies)
+            created_at, aggregate = replies[1]
+            if created_at is None and not create:
+                self._execute(("UNWATCH",))
+                raise AttemptNotFound(attempt_id)
+            aggregate = add_speaking_part(json.loads(aggregate or "{}"), part, result)
+            replies = self._execute(
+                ("MULTI",),
+                ("HSETNX", key, "created_at", time.time()),
+                ("HSET", key, f"part:{int(part)}", payload),
+                ("HSET", key, "aggregate", json.dumps(aggregate)),
+                self._expire(key),
+                ("EXEC",),
+            )
+            _raise_errors(replies)
+            if replies[-1] is not None:
+                return
+            # The key changed (expired, deleted) between WATCH and EXEC: decide again
+
+    def get(self, attempt_id: str) -> dict | None:
+        fields = self._execute(("HGETALL", self._key(attempt_id)))[0]
+        _raise_errors([fields])
+        if not fields:
+            return None
+        pairs = dict(zip(fields[::2], fields[1::2]))
+        parts = {
+            int(name.split(":", 1)[1]): json.loads(value)
+            for name, value in pairs.items()
+            if name.startswith("part:")
+        }
+        return {"parts": dict(sorted(parts.items()))}
+
+    def get_aggregate(self, attempt_id: str) -> dict | None:
+        fields = self._execute(("HMGET", self._key(attempt_id), "created_at", "aggregate"))[0]
+        _raise_errors([fields])
+        created_at, aggregate = fields
+        return None if created_at is None else json.loads(aggregate or "{}")
+
+    def delete(self, attempt_id: str):
+        self._execute(("DEL", self._key(attempt_id)))
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, "host": self.host, "port": self.port, "db": self.db}
+
+
+def _raise_errors(replies: list):
+    for reply in replies:
+        if isinstance(reply, RedisError):
+            raise reply
+        if isinstance(reply, list):
+            _raise_errors(reply)
+
+
+# ------------------------------------------------------------
+# Process-wide store
+# ------------------------------------------------------------
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def create_attempt_store(backend: str = SPEAKING_STORE) -> AttemptStore:
+    if backend == "memory":
+        return MemoryAttemptStore(SPEAKING_STORE_TTL_SECONDS, SPEAKING_STORE_MAX_ATTEMPTS)
+    if backend == "sqlite":
+        return SQLiteAttemptStore(SPEAKING_STORE_DB, SPEAKING_STORE_TTL_SECONDS)
+    if backend == "redis":
+        return RedisAttemptStore(SPEAKING_STORE_URL, SPEAKING_STORE_TTL_SECONDS)
+    raise ValueError(f"Unsupported SPEAKING_STORE: {backend}")
+
+
+def get_attempt_store() -> AttemptStore:
+    global _STORE
+
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = create_attempt_store()
+    return _STORE
+
+
+def attempt_store_stats() -> dict:
+    try:
+        return get_attempt_store().stats()
+    except Exception as exc:
+        return {"backend": SPEAKING_STORE, "error": str(exc)}
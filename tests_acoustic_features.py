@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+import numpy as np
+
+from benchmarks.acoustic_features import TRANSCRIPT, legacy_extract_acoustic_features, synthetic_speech
+from evaluators.speaking_audio import extract_acoustic_features
+from utils.acoustic_frames import FrameStream, analyze_frame_block, analyze_frames, condense_speech
+from utils.audio_clip import AudioClip
+
+SR = 16000
+
+
+class AcousticFeatureParityTests(unittest.TestCase):
+    def assertSameFeatures(self, y, transcript):
+        expected = legacy_extract_acoustic_features(y, SR, transcript)
+        actual = extract_acoustic_features(y, transcript)
+        self.assertEqual(set(actual), set(expected))
+        for key, value in expected.items():
+            if isinstance(value, float):
+                self.assertAlmostEqual(actual[key], value, places=3, msg=key)
+            else:
+                self.assertEqual(actual[key], value, msg=key)
+
+    def test_matches_librosa_pipeline(self):
+        for seed in range(3):
+            with self.subTest(seed=seed):
+                self.assertSameFeatures(synthetic_speech(20, seed), TRANSCRIPT)
+
+    def test_transcript_without_punctuation(self):
+        self.assertSameFeatures(synthetic_speech(10, 7), "i think it is good because people like it")
+
+    def test_short_and_quiet_clips(self):
+        self.assertSameFeatures(synthetic_speech(1, 3), "")
+        self.assertSameFeatures(np.full(SR, 1e-6, dtype=np.float32), TRANSCRIPT)
+
+    def test_frames_match_librosa(self):
+        import librosa
+
+        y = synthetic_speech(15, 11)
+        frames = analyze_frames(y, SR)
+        np.testing.assert_allclose(frames.rms, librosa.feature.rms(y=y)[0], atol=1e-6)
+        np.testing.assert_array_equal(frames.zcr, librosa.feature.zero_crossing_rate(y)[0])
+        np.testing.assert_allclose(frames.centroid, librosa.feature.spectral_centroid(y=y, sr=SR)[0], atol=1e-2)
+        np.testing.assert_array_equal(frames.intervals, librosa.effects.split(y, top_db=25))
+
+    def test_clip_frames_reused_for_features(self):
+        y = synthetic_speech(12, 5)
+        clip = AudioClip(y, SR, "hash").with_frames()
+        self.assertIsNone(clip.frames.magnitude)
+        self.assertEqual(extract_acoustic_features(clip, TRANSCRIPT), extract_acoustic_features(y, TRANSCRIPT))
+
+    def test_streamed_frames_match_whole_clip(self):
+        y = synthetic_speech(20, 2)
+        stream = FrameStream(SR)
+        rng = np.random.default_rng(0)
+        received = 0
+        while received < y.size:
+            received = min(y.size, received + int(rng.integers(1, 8000)))  # uneven decoder chunks
+            block = stream.next_block(y[:received])
+            if block is not None:
+                stream.add(analyze_frame_block(*block))
+        stream.add(analyze_frame_block(*stream.next_block(y, final=True)))
+        frames, levels = stream.finish(y.size)
+
+        expected = analyze_frames(y, SR)
+        for name in ("rms", "zcr", "centroid"):
+            np.testing.assert_allclose(getattr(frames, name), getattr(expected, name), rtol=1e-5, atol=1e-6)
+        np.testing.assert_array_equal(frames.intervals, expected.intervals)
+        self.assertEqual((levels.n_samples, levels.peak), (y.size, float(np.abs(y).max())))
+        self.assertAlmostEqual(levels.percentile(10), np.percentile(np.abs(y), 10), delta=1e-3 * np.abs(y).max())
+
+        streamed = extract_acoustic_features(y, TRANSCRIPT, frames=frames, levels=levels)
+        self.assertEqual(streamed, extract_acoustic_features(y, TRANSCRIPT))
+
+
+class CondensedSpeechTests(unittest.TestCase):
+    def test_drops_long_silences_and_maps_times_back(self):
+        y = np.zeros(10 * SR, dtype=np.float32)
+        y[1 * SR:2 * SR] = 0.5
+        y[6 * SR:8 * SR] = 0.5
+        intervals = np.array([[1 * SR, 2 * SR], [6 * SR, 8 * SR]])
+
+        speech = condense_speech(y, intervals, SR, pad_seconds=0.0, gap_seconds=0.2)
+
+        self.assertAlmostEqual(speech.duration, 3.2)
+        np.testing.assert_allclose(speech.to_original([0.0, 0.5, 1.1, 1.2, 2.2]), [1.0, 1.5, 2.0, 6.0, 7.0])
+
+    def test_padded_intervals_merge(self):
+        y = np.ones(4 * SR, dtype=np.float32)
+        speech = condense_speech(y, np.array([[SR, 2 * SR], [2 * SR + 800, 3 * SR]]), SR, pad_seconds=0.1)
+        self.assertEqual(len(speech.segments), 1)
+        self.assertEqual(speech.samples.size, int(2.2 * SR))
+
+    def test_no_speech(self):
+        speech = condense_speech(np.zeros(SR, dtype=np.float32), np.empty((0, 2)), SR)
+        self.assertEqual(speech.samples.size, 0)
+
+
+class WordTimingTests(unittest.TestCase):
+    @staticmethod
+    def _speech(spans, seconds):
+        y = np.zeros(int(seconds * SR), dtype=np.float32)
+        t = np.arange(y.size) / SR
+        for start, end in spans:
+            sl = slice(int(start * SR), int(end * SR))
+            y[sl] = 0.3 * np.sin(2 * np.pi * 150 * t[sl])
+        return y
+
+    def test_pauses_micro_timing_and_confidence_come_from_words(self):
+        y = self._speech([(0.0, 1.0), (1.6, 2.6), (3.2, 4.0)], 4.0)
+        even = [
+            {"word": "I", "start": 0.0, "end": 0.3, "probability": 0.9},
+            {"word": "like", "start": 0.35, "end": 0.65, "probability": 0.9},
+            {"word": "tea,", "start": 0.7, "end": 1.0, "probability": 0.9},   # pause after a clause end
+            {"word": "and", "start": 1.6, "end": 1.9, "probability": 0.9},
+            {"word": "I", "start": 1.95, "end": 2.25, "probability": 0.9},
+            {"word": "also", "start": 2.3, "end": 2.6, "probability": 0.9},   # pause mid-sentence
+            {"word": "coffee.", "start": 3.2, "end": 3.5, "probability": 0.9},
+        ]
+        features = extract_acoustic_features(y, "I like tea, and I also coffee.", even)
+        self.assertEqual(features["pause_count"], 2)
+        self.assertEqual(features["pause_distribution_score"], 6.0)
+        self.assertEqual(features["micro_timing_score"], 0.8)
+
+        uneven = [dict(w, end=w["start"] + (0.05 if i % 2 else 0.6)) for i, w in enumerate(even)]
+        self.assertEqual(extract_acoustic_features(y, "", uneven)["micro_timing_score"], 0.4)
+
+    def test_transcription_words_map_back_to_the_clip(self):
+        from unittest.mock import patch
+
+        from evaluators import speaking_audio
+
+        y = self._speech([(1.0, 2.0), (6.0, 8.0)], 10.0)
+        clip = AudioClip(y, SR, "hash").with_frames()
+
+        async def fake_transcribe_long(samples, sample_rate, word_timestamps=False):
+            self.assertTrue(word_timestamps)
+            return {"text": "hello there", "words": [
+                {"word": "hello", "start": 0.2, "end": 0.8, "probability": 0.9},
+                {"word": "there", "start": 1.7, "end": 2.2, "probability": 0.8},
+            ]}
+
+        with patch.object(speaking_audio, "transcribe_long", fake_transcribe_long):
+            result = asyncio.run(speaking_audio._transcribe_speech(clip, part=1))
+
+        speech = clip.speech_only()
+        self.assertEqual(result["text"], "hello there")
+        self.assertEqual([w["start"] for w in result["words"]], [round(float(speech.to_original(t)), 3) for t in (0.2, 1.7)])
+        self.assertGreater(result["words"][1]["start"], 6.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
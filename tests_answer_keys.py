@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from evaluators.api.listening import router as listening_router
+from evaluators.api.reading import router as reading_router
+from evaluators.listening import evaluate_listening_bulk
+from utils import answer_keys
+
+QUESTIONS = [
+    {"question_id": "q1", "answer_key": "TRUE", "type": "TRUE_FALSE_NOT_GIVEN"},
+    {"question_id": "q2", "answer_key": "B", "type": "MCQ"},
+    {"question_id": "q3", "answer_key": ["river", "bank"], "type": "FILL_IN_THE_BLANKS"},
+    {"question_id": "q4", "type": "MCQ"},  # no key: not marked, still counted
+]
+LISTENING_KEY = {"1": "library", "2": "7 pm", "3": "C"}
+
+
+class AnswerKeyRegistryTests(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        patcher = patch.object(answer_keys, "ANSWER_KEY_DB", os.path.join(tmp_dir.name, "keys.sqlite3"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        answer_keys.clear_answer_key_cache()
+        self.addCleanup(answer_keys.clear_answer_key_cache)
+
+        app = FastAPI()
+        app.include_router(reading_router)
+        app.include_router(listening_router)
+        self.client = TestClient(app)
+
+    def test_registered_reading_key_grades_like_inline_questions(self):
+        response = self.client.post("/reading/tests", json={"test_id": "cam18-1", "questions": QUESTIONS, "test_type": "general"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()["questions"], response.json()["graded_questions"]), (4, 3))
+
+        answers = {"q1": "TRUE", "q2": "C", "q3": ["river", "bank"]}
+        by_id = self.client.post("/reading/evaluate", json={"test_id": "cam18-1", "user_answers": answers}).json()
+        inline = self.client.post("/reading/evaluate", json={
+            "questions": QUESTIONS, "test_type": "general", "user_answers": answers,
+        }).json()
+        self.assertEqual(by_id, inline)
+        self.assertEqual((by_id["accuracy"], by_id["test_type"]), ("2/4", "general"))
+
+        bulk = self.client.post("/reading/evaluate/bulk", json={"test_id": "cam18-1", "submissions": [{"user_answers": answers}]}).json()
+        self.assertEqual(bulk["results"][0]["overall_band"], by_id["overall_band"])
+
+    def test_registered_listening_key(self):
+        self.client.post("/listening/tests", json={"test_id": "l-1", "answer_key": LISTENING_KEY})
+        answers = {"1": "library", "2": "7 pm", "3": "A"}
+
+        by_id = self.client.post("/listening/evaluate", json={"test_id": "l-1", "user_answers": answers}).json()
+        inline = self.client.post("/listening/evaluate", json={"answer_key": LISTENING_KEY, "user_answers": answers}).json()
+        self.assertEqual(by_id, inline)
+        self.assertEqual(evaluate_listening_bulk({"test_id": "l-1", "submissions": [{"user_answers": answers}]})["results"][0], inline)
+
+    def test_registration_is_idempotent_and_conflicts_are_rejected(self):
+        first = answer_keys.register_answer_key("l-1", "listening", {"answer_key": LISTENING_KEY})
+        again = answer_keys.register_answer_key("l-1", "listening", {"answer_key": dict(LISTENING_KEY)})
+        self.assertEqual((first["created"], again["created"]), (True, False))
+        self.assertEqual(first["fingerprint"], again["fingerprint"])
+
+        changed = {"answer_key": {**LISTENING_KEY, "3": "D"}}
+        self.assertEqual(self.client.post("/listening/tests", json={"test_id": "l-1", **changed}).status_code, 409)
+        self.assertEqual(self.client.post("/listening/tests", json={"test_id": "l-1", "replace": True, **changed}).status_code, 200)
+        self.assertEqual(answer_keys.get_answer_key("l-1", "listening").key_values[2], "D")
+
+        self.assertEqual(self.client.post("/reading/tests", json={"questions": QUESTIONS}).status_code, 400)
+
+    def test_unknown_test_id(self):
+        for path in ("/reading/evaluate", "/listening/evaluate", "/listening/evaluate/bulk"):
+            with self.subTest(path=path):
+                response = self.client.post(path, json={"test_id": "nope", "user_answers": {"1": "A"}, "submissions": [{}]})
+                self.assertEqual(response.status_code, 404)
+
+    def test_keys_survive_the_memory_cache(self):
+        answer_keys.register_answer_key("cam18-1", "reading", {"questions": QUESTIONS})
+        answer_keys.clear_answer_key_cache()  # e.g. another worker process
+        disk_loads = answer_keys.answer_key_stats()["disk_loads"]
+
+        key = answer_keys.get_answer_key("cam18-1", "reading")
+        self.assertEqual(key.key_values[2], ["river", "bank"])
+        self.assertEqual(key.type_map["q2"], "MCQ")
+        self.assertEqual(answer_keys.get_answer_key("cam18-1", "reading"), key)
+        self.assertEqual(answer_keys.answer_key_stats()["disk_loads"], disk_loads + 1)
+
+        # Replaced elsewhere: picked up once the cached copy is older than the TTL
+        answer_keys.register_answer_key("cam18-1", "reading", {"questions": QUESTIONS[:2]}, replace=True)
+        answer_keys._CACHE[("reading", "cam18-1")] = (key, 0.0)
+        self.assertEqual(answer_keys.get_answer_key("cam18-1", "reading").total_questions, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import random
+import time
+import unittest
+
+from evaluators.listening import evaluate_listening, evaluate_listening_bulk
+from evaluators.reading import evaluate_reading, evaluate_reading_bulk
+from utils.answer_keys import compile_answer_key
+from utils.answer_matching import AnswerMatcher, matching_rules, normalise_answer
+
+
+class NormalisationTests(unittest.TestCase):
+    def test_equivalent_forms(self):
+        rules = matching_rules()
+        for a, b in [
+            ("The Museum", "museum"),
+            ("  river   bank ", "river bank"),
+            ("twelve", "12"),
+            ("twenty-one", "21"),
+            ("one hundred and five", "105"),
+            ("7pm", "7 pm"),
+            ("1,500", "1500"),
+            (12, "12"),
+            (12.0, "12"),
+            ("Café", "CAFÉ"),
+        ]:
+            with self.subTest(a=a, b=b):
+                self.assertEqual(normalise_answer(a, rules), normalise_answer(b, rules))
+
+    def test_distinct_forms(self):
+        rules = matching_rules()
+        for a, b in [("a", "b"), ("12", "21"), ("river", "rivers"), (True, "true"), (["a", "b"], ["b", "a"])]:
+            with self.subTest(a=a, b=b):
+                self.assertNotEqual(normalise_answer(a, rules), normalise_answer(b, rules))
+
+    def test_articles_are_kept_before_option_letters(self):
+        rules = matching_rules()
+        self.assertEqual(normalise_answer("A, C", rules), "a c")
+        self.assertEqual(normalise_answer("the a", rules), "the a")
+        self.assertEqual(normalise_answer("a", rules), "a")
+        self.assertEqual(normalise_answer("the 1st", rules), "1 st")
+
+    def test_spoken_digit_sequences_stay_digits(self):
+        rules = matching_rules()
+        self.assertEqual(normalise_answer("one two three", rules), "1 2 3")
+        self.assertNotEqual(normalise_answer("one two three", rules), normalise_answer("6", rules))
+        self.assertEqual(normalise_answer("double oh seven, four four", rules), "double oh 7 4 4")
+        self.assertEqual(normalise_answer("twenty one", rules), "21")
+        self.assertEqual(normalise_answer("three and four", rules), "3 and 4")
+        self.assertEqual(normalise_answer("two thousand and three", rules), "2003")
+
+    def test_rules_can_be_switched_off(self):
+        self.assertNotEqual(*(normalise_answer(v, matching_rules(fold_case=False)) for v in ("River", "river")))
+        self.assertNotEqual(*(normalise_answer(v, matching_rules(number_words=False)) for v in ("twelve", "12")))
+        self.assertNotEqual(*(normalise_answer(v, matching_rules(strip_articles=False)) for v in ("the park", "park")))
+
+
+class AnswerMatcherTests(unittest.TestCase):
+    def test_variants(self):
+        matches = AnswerMatcher("colour", ["color"])
+        self.assertTrue(matches("Color"))
+        self.assertTrue(matches("the colour"))
+        self.assertFalse(matches("colours"))
+        self.assertFalse(matches(None))
+
+    def test_spelling_tolerance_scales_with_length(self):
+        rules = matching_rules(spelling_tolerance=2)
+        self.assertTrue(AnswerMatcher("library", rules=rules)("libary"))
+        self.assertTrue(AnswerMatcher("library", rules=rules)("lbirary"))  # adjacent swap
+        self.assertFalse(AnswerMatcher("library", rules=rules)("lbrry"))   # 2 edits on a 7-letter word
+        self.assertTrue(AnswerMatcher("accommodation", rules=rules)("acomodation"))
+        self.assertFalse(AnswerMatcher("cat", rules=rules)("cut"))         # short words: exact only
+        self.assertFalse(AnswerMatcher("1987", rules=rules)("1978"))       # numbers: exact only
+
+    def test_long_answers_are_rejected_without_generating_variants(self):
+        matches = AnswerMatcher("the river bank", rules=matching_rules(spelling_tolerance=2))
+        start = time.perf_counter()
+        self.assertFalse(matches("riverbank " * 150))
+        self.assertLess(time.perf_counter() - start, 0.5)  # seconds to minutes before the length guard
+        self.assertTrue(matches("rivr bank"))
+
+    def test_exact_mode(self):
+        rules = matching_rules({"exact": True})
+        self.assertTrue(AnswerMatcher(["river", "bank"], rules=rules)(["river", "bank"]))
+        self.assertFalse(AnswerMatcher("River", rules=rules)("river"))
+        self.assertFalse(AnswerMatcher(12, rules=rules)("12"))
+
+
+class KeyMatchingTests(unittest.TestCase):
+    def test_reading_questions_carry_variants_and_tolerance(self):
+        questions = [
+            {"question_id": "q1", "answer_key": "TRUE", "type": "TRUE_FALSE_NOT_GIVEN", "spelling_tolerance": 2},
+            {"question_id": "q2", "answer_key": "harbour", "accepted_answers": ["harbor"], "type": "FILL_IN_THE_BLANKS"},
+            {"question_id": "q3", "answer_key": "environment", "spelling_tolerance": 1, "type": "FILL_IN_THE_BLANKS"},
+        ]
+        result = evaluate_reading({"questions": questions, "user_answers": {"q1": "TRUEE", "q2": "Harbor", "q3": "enviroment"}})
+        self.assertEqual(result["accuracy"], "2/3")  # labels are never spelling-corrected
+
+        exact = evaluate_reading({
+            "questions": questions, "matching": {"exact": True},
+            "user_answers": {"q1": "TRUE", "q2": "harbor", "q3": "environment"},
+        })
+        self.assertEqual(exact["accuracy"], "3/3")  # listed variants still count in exact mode
+
+    def test_multi_letter_option_keys(self):
+        questions = [
+            {"question_id": "q1", "answer_key": "A, C", "type": "MCQ"},
+            {"question_id": "q2", "answer_key": "A", "type": "MCQ"},
+            {"question_id": "q3", "answer_key": "one", "type": "MCQ"},
+        ]
+        for answers, accuracy in [
+            ({"q1": "C", "q2": "the a", "q3": "1"}, "0/3"),
+            ({"q1": "a c", "q2": "A", "q3": "One"}, "3/3"),
+        ]:
+            with self.subTest(answers=answers):
+                self.assertEqual(evaluate_reading({"questions": questions, "user_answers": answers})["accuracy"], accuracy)
+
+        key = {"answer_key": {"1": "A, C", "2": "A", "3": "B"}}
+        self.assertEqual(evaluate_listening({**key, "user_answers": {"1": "C", "2": "the a", "3": "the B"}})["accuracy"], "0/3")
+        self.assertEqual(evaluate_listening({**key, "user_answers": {"1": "A,C", "2": "a", "3": "b"}})["accuracy"], "3/3")
+
+    def test_listening_key_rules(self):
+        data = {"answer_key": {"1": "library", "2": "7 pm"}, "accepted_answers": {"2": ["19:00"]}}
+        self.assertEqual(evaluate_listening({**data, "user_answers": {"1": "Library", "2": "19:00"}})["accuracy"], "2/2")
+        self.assertEqual(evaluate_listening({**data, "user_answers": {"1": "libary", "2": "7PM"}})["accuracy"], "1/2")
+        tolerant = {**data, "matching": {"spelling_tolerance": 1}}
+        self.assertEqual(evaluate_listening({**tolerant, "user_answers": {"1": "libary", "2": "7PM"}})["accuracy"], "2/2")
+
+    def test_invalid_rules_are_rejected(self):
+        with self.assertRaises(ValueError):
+            compile_answer_key("listening", {"answer_key": {"1": "a"}, "matching": "loose"})
+        with self.assertRaises(ValueError):
+            compile_answer_key("reading", {"questions": [{"question_id": "q1", "answer_key": "a", "accepted_answers": "b"}]})
+
+    def test_bulk_matches_single_evaluation(self):
+        rng = random.Random(3)
+        words = ["library", "Library", "libary", "the library", "7 pm", "7PM", "seven pm", "A", "a", None]
+        key = {"1": "library", "2": "7 pm", "3": "A"}
+        answers = [{str(q): rng.choice(words) for q in (1, 2, 3)} for _ in range(200)]
+        submissions = [{"user_answers": a} for a in answers]
+        for matching in ({}, {"exact": True}, {"spelling_tolerance": 1}):
+            with self.subTest(matching=matching):
+                data = {"answer_key": key, "matching": matching}
+                bulk = evaluate_listening_bulk({**data, "submissions": submissions})["results"]
+                single = [evaluate_listening({**data, "user_answers": a}) for a in answers]
+                self.assertEqual([r["accuracy"] for r in bulk], [r["accuracy"] for r in single])
+
+        questions = [{"question_id": qid, "answer_key": value, "type": "FILL_IN_THE_BLANKS"} for qid, value in key.items()]
+        bulk = evaluate_reading_bulk({"questions": questions, "submissions": submissions})["results"]
+        self.assertEqual([r["accuracy"] for r in bulk],
+                         [evaluate_reading({"questions": questions, "user_answers": a})["accuracy"] for a in answers])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import shutil
+import subprocess
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.acoustic_features import synthetic_speech
+from evaluators import speaking_audio
+from utils.audio_fingerprint import FingerprintIndex, audio_fingerprint, bit_error_rate
+from utils.audio_normalizer import decode_audio_bytes
+from utils.result_cache import ResultCache
+from utils.stage_graph import run_stage_graph
+
+SR = 16000
+
+
+def _wav_bytes(y: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    sf.write(buf, y, SR, format="WAV", subtype="PCM_16")
+    return buf.getvalue()
+
+
+def _altered(y: np.ndarray) -> np.ndarray:
+    """Quieter, slightly noisy and delayed by 10 ms: what a re-recording pipeline might do."""
+    noise = np.random.default_rng(0).normal(0, 0.002, y.size).astype(np.float32)
+    return np.concatenate([np.zeros(160, dtype=np.float32), 0.6 * y + noise])
+
+
+class FingerprintTests(unittest.TestCase):
+    def test_equivalent_audio_is_close_and_other_audio_is_not(self):
+        y = synthetic_speech(20, 1)
+        reference = audio_fingerprint(y)
+
+        self.assertEqual(bit_error_rate(reference, reference), 0.0)
+        self.assertLess(bit_error_rate(reference, audio_fingerprint(_altered(y))), 0.2)
+        for seed in (2, 3):
+            self.assertGreater(bit_error_rate(reference, audio_fingerprint(synthetic_speech(20, seed))), 0.35)
+
+    @unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg not installed")
+    def test_survives_lossy_reencoding(self):
+        y = synthetic_speech(20, 4)
+        encoded = subprocess.run(
+            ["ffmpeg", "-loglevel", "error", "-i", "pipe:0", "-c:a", "libmp3lame", "-b:a", "32k", "-f", "mp3", "pipe:1"],
+            input=_wav_bytes(y), capture_output=True, check=True,
+        ).stdout
+        decoded = decode_audio_bytes(encoded, SR)
+        self.assertLess(bit_error_rate(audio_fingerprint(y), audio_fingerprint(decoded)), 0.2)
+
+    def test_index_matches_within_tolerance(self):
+        index = FingerprintIndex(max_entries=2)
+        y = synthetic_speech(15, 5)
+        index.add("a", audio_fingerprint(y))
+        index.add("b", audio_fingerprint(synthetic_speech(15, 6)))
+
+        self.assertEqual(index.match(audio_fingerprint(_altered(y)))[0], "a")
+        self.assertIsNone(index.match(audio_fingerprint(y), exclude="a"))
+        self.assertIsNone(index.match(audio_fingerprint(synthetic_speech(15, 7))))
+        self.assertIsNone(index.match(audio_fingerprint(y[: 5 * SR])))  # different length
+
+        index.add("c", audio_fingerprint(synthetic_speech(15, 8)))  # "a" was just matched: evicts "b"
+        self.assertIsNone(index.match(audio_fingerprint(synthetic_speech(15, 6))))
+        self.assertEqual(index.match(audio_fingerprint(y))[0], "a")
+
+
+class FingerprintCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.transcriptions = 0
+
+        async def inline_inference(func, *args, **kwargs):
+            return func(*args, **kwargs)
+
+        async def fake_transcribe(clip, part):
+            self.transcriptions += 1
+            return {"text": "I usually walk to work because it is close.", "words": None}
+
+        patcher = patch.multiple(
+            speaking_audio,
+            run_inference=inline_inference,
+            _transcribe_speech=fake_transcribe,
+            _ASR_CACHE=ResultCache("asr", disk_path=None),
+            _FEATURE_CACHE=ResultCache("features", disk_path=None),
+            _FINGERPRINT_INDEX=FingerprintIndex(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, audio_bytes: bytes):
+        stages = speaking_audio._audio_stages(audio_bytes, hashlib.sha256(audio_bytes).hexdigest(), 1, 0.0)
+        results, _ = asyncio.run(run_stage_graph(stages))
+        return results["asr"], results["features"]
+
+    def test_reencoded_upload_reuses_transcript_and_features(self):
+        y = synthetic_speech(12, 9)
+        first = self._run(_wav_bytes(y))
+        second = self._run(_wav_bytes(_altered(y)))
+
+        self.assertEqual(self.transcriptions, 1)
+        self.assertEqual(second, first)
+
+    def test_different_answer_is_transcribed(self):
+        self._run(_wav_bytes(synthetic_speech(12, 10)))
+        self._run(_wav_bytes(synthetic_speech(12, 11)))
+        self.assertEqual(self.transcriptions, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
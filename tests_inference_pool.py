@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from utils import inference_pool
+
+
+class WorkerModelReportTests(unittest.TestCase):
+    def test_each_initializer_reports_its_model(self):
+        reports = multiprocessing.get_context("spawn").Queue()
+        self.addCleanup(reports.close)
+        models = patch.dict(inference_pool._WORKER_MODELS, clear=True)
+        models.start()
+        self.addCleanup(models.stop)
+
+        with patch.object(inference_pool, "_WORKER_REPORTS", reports), \
+                patch.object(inference_pool, "INFERENCE_WORKERS", 2), \
+                patch.object(inference_pool, "warm_up_whisper"), \
+                patch.object(inference_pool, "whisper_model_stats", return_value={"loaded": True}), \
+                patch.dict(os.environ):
+            inference_pool._init_worker(1, [], reports)
+            deadline = time.time() + 5
+            while not inference_pool._WORKER_MODELS and time.time() < deadline:
+                inference_pool.inference_pool_stats()
+                time.sleep(0.01)
+            stats = inference_pool.inference_pool_stats()
+
+        self.assertEqual(stats["worker_models"], [{"loaded": True}])
+        self.assertEqual(list(inference_pool._WORKER_MODELS), [os.getpid()])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import random
+import unittest
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from evaluators.api.listening import router as listening_router
+from evaluators.api.reading import router as reading_router
+from evaluators.listening import evaluate_listening, evaluate_listening_bulk
+from evaluators.reading import evaluate_reading, evaluate_reading_bulk
+from utils.answer_keys import compile_answer_key
+from utils.band import (
+    ACADEMIC_READING_BANDS,
+    GENERAL_READING_BANDS,
+    LISTENING_BANDS,
+    band_from_correct,
+    bands_from_totals,
+    general_reading_band,
+    listening_band_from_correct,
+)
+from utils.objective_grading import INVALID_SUBMISSION, grade_submissions
+
+TYPES = ["TRUE_FALSE_NOT_GIVEN", "MCQ", "FILL_IN_THE_BLANKS", "MATCHING_HEADINGS"]
+CHOICES = ["A", "B", "C", "D", "TRUE", "FALSE", "NOT GIVEN", "river", "1987"]
+
+
+def _reading_questions(n: int = 40) -> list:
+    rng = random.Random(1)
+    return [
+        {"question_id": f"q{i}", "answer_key": rng.choice(CHOICES), "type": TYPES[i % len(TYPES)]}
+        for i in range(1, n + 1)
+    ]
+
+
+def _submissions(question_ids: list, key: dict, count: int, seed: int = 0) -> list:
+    """Candidates of varying skill; some skip questions."""
+    rng = random.Random(seed)
+    submissions = []
+    for n in range(count):
+        skill = rng.random()
+        answers = {}
+        for qid in question_ids:
+            roll = rng.random()
+            if roll < skill:
+                answers[qid] = key[qid]
+            elif roll < skill + 0.1:
+                continue
+            else:
+                answers[qid] = rng.choice(CHOICES)
+        submissions.append({"submission_id": n, "user_answers": answers})
+    return submissions
+
+
+class BandTableTests(unittest.TestCase):
+    def test_tables_match_band_functions(self):
+        totals = np.arange(-1, 45)
+        for table, band in ((ACADEMIC_READING_BANDS, band_from_correct),
+                            (GENERAL_READING_BANDS, general_reading_band),
+                            (LISTENING_BANDS, listening_band_from_correct)):
+            expected = [band(max(0, int(t))) for t in totals]
+            self.assertEqual(bands_from_totals(totals, table).tolist(), expected)
+
+
+class BulkGradingTests(unittest.TestCase):
+    def test_reading_bulk_matches_single_evaluation(self):
+        questions = _reading_questions() + [{"question_id": "", "answer_key": "A"}]  # ungraded, still counted
+        key = {q["question_id"]: q["answer_key"] for q in questions if q["question_id"]}
+        submissions = _submissions(list(key), key, 300)
+
+        for test_type in ("academic", "general"):
+            bulk = evaluate_reading_bulk({"questions": questions, "test_type": test_type, "submissions": submissions})
+            for submission, result in zip(submissions, bulk["results"]):
+                single = evaluate_reading({"questions": questions, "test_type": test_type, **submission})
+                self.assertEqual(result.pop("submission_id"), submission["submission_id"])
+                self.assertEqual(set(result.pop("improvements")), set(single.pop("improvements")))
+                self.assertEqual(result, single)
+
+        self.assertEqual(sum(bulk["summary"]["band_distribution"].values()), 300)
+        self.assertEqual(len(bulk["summary"]["question_accuracy"]), 40)
+
+    def test_listening_bulk_matches_single_evaluation(self):
+        key = {str(i): random.Random(i).choice(CHOICES) for i in range(1, 41)}
+        key["41"] = None  # a missing answer matches a None key, as in evaluate_listening
+        submissions = _submissions(list(key), key, 300, seed=3)
+
+        bulk = evaluate_listening_bulk({"answer_key": key, "submissions": submissions})
+        for submission, result in zip(submissions, bulk["results"]):
+            single = evaluate_listening({"answer_key": key, "user_answers": submission["user_answers"]})
+            result.pop("submission_id")
+            self.assertEqual(result, single)
+
+    def test_errors_by_question_type_and_unhashable_answers(self):
+        grades = grade_submissions(
+            ["q1", "q2", "q3"],
+            ["A", ["x", "y"], "B"],
+            [{"q1": "A", "q2": ["x", "y"], "q3": "B"}, {"q1": "C", "q2": ["y", "x"]}, {}],
+            ["MCQ", "MATCHING", "MCQ"],
+        )
+        self.assertEqual(grades["totals"].tolist(), [3, 0, 0])
+        self.assertEqual(grades["types"], ["MCQ", "MATCHING"])
+        self.assertEqual(grades["type_errors"].tolist(), [[False, False], [True, True], [True, True]])
+        np.testing.assert_allclose(grades["question_accuracy"], [1 / 3] * 3)
+
+    def test_coded_columns_match_the_matchers(self):
+        matchers = compile_answer_key("listening", {"answer_key": {"1": "river", "2": 1, "3": "A"}}).matchers
+        rows = [
+            {"1": "River", "2": True, "3": "a"},
+            {"1": "the river", "2": 1.0, "3": ["A"]},
+            {"1": None, "2": "1"},
+            {"1": "River", "2": 2, "3": "a"},
+        ]
+        grades = grade_submissions(["1", "2", "3"], [], rows, matchers=matchers)
+        expected = [[m(row.get(qid)) for qid, m in zip("123", matchers)] for row in rows]
+        self.assertEqual(grades["correct"].tolist(), expected)
+
+    def test_invalid_submissions_are_reported_individually(self):
+        submissions = [
+            {},
+            "oops",
+            {"submission_id": "s3", "user_answers": {}},
+            {"test_id": "t1", "candidate_id": "c1", "q1": "A"},  # no user_answers: never graded as answers
+            {"user_answers": {"q1": "A"}},
+        ]
+        reading = evaluate_reading_bulk({"questions": _reading_questions(2), "submissions": submissions})
+        listening = evaluate_listening_bulk({"answer_key": {"q1": "A"}, "submissions": submissions})
+        for bulk in (reading, listening):
+            self.assertEqual([r.get("error") for r in bulk["results"]], [INVALID_SUBMISSION] * 4 + [None])
+            self.assertEqual(bulk["results"][2]["submission_id"], "s3")
+            self.assertEqual(bulk["summary"]["graded"], 1)
+        with self.assertRaises(ValueError):
+            evaluate_listening_bulk({"answer_key": {"1": "A"}, "submissions": []})
+
+
+class BulkEndpointTests(unittest.TestCase):
+    def test_bulk_routes(self):
+        app = FastAPI()
+        app.include_router(reading_router)
+        app.include_router(listening_router)
+        client = TestClient(app)
+
+        response = client.post("/listening/evaluate/bulk", json={
+            "answer_key": {"1": "A", "2": "B"},
+            "submissions": [{"submission_id": "c1", "user_answers": {"1": "A", "2": "B"}}],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["accuracy"], "2/2")
+        self.assertEqual(client.post("/reading/evaluate/bulk", json={"questions": []}).status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
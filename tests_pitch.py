@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+
+from evaluators.speaking_audio import compute_intonation_score, extract_acoustic_features
+from utils import pitch
+from utils.pitch import pitch_statistics, yin_pitch
+
+SR = 16000
+
+
+def _voice(f0: np.ndarray, sr: int = SR) -> np.ndarray:
+    """Harmonic tone following the per-sample pitch contour f0 (Hz)."""
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    return (sum(np.sin(k * phase) / k for k in range(1, 5)) * 0.2).astype(np.float32)
+
+
+class YinPitchTests(unittest.TestCase):
+    def test_tracks_steady_tones(self):
+        for sr in (16000, 22050):
+            for f0 in (85.0, 150.0, 320.0):
+                with self.subTest(sr=sr, f0=f0):
+                    contour = yin_pitch(_voice(np.full(3 * sr, f0), sr), sr)
+                    self.assertTrue(np.isfinite(contour).all())
+                    np.testing.assert_allclose(contour, f0, rtol=0.01)
+
+    def test_only_voiced_intervals_are_analysed(self):
+        noise = np.random.default_rng(0).normal(0, 0.1, 6 * SR).astype(np.float32)
+        self.assertEqual(pitch_statistics(yin_pitch(noise, SR))["range_semitones"], None)
+
+        noise[2 * SR:4 * SR] = _voice(np.full(2 * SR, 200.0))
+        contour = yin_pitch(noise, SR, intervals=np.array([[2 * SR, 4 * SR]]))
+        self.assertTrue(contour.size and np.isfinite(contour).all())
+        self.assertEqual(yin_pitch(noise, SR, intervals=np.empty((0, 2))).size, 0)
+
+    def test_cost_is_bounded(self):
+        y = _voice(np.full(120 * SR, 150.0))
+        self.assertEqual(yin_pitch(y, SR, frames_per_second=2).size, 240)
+        self.assertEqual(yin_pitch(y, SR, frames_per_second=10, max_frames=300).size, 300)
+        self.assertEqual(yin_pitch(y, SR, frames_per_second=10, max_frames=1000, budget_ms=0).size, pitch._BATCH)
+
+
+class IntonationScoreTests(unittest.TestCase):
+    def test_monotone_and_varied_speech(self):
+        t = np.arange(20 * SR) / SR
+        monotone = _voice(np.full(t.size, 140.0))
+        varied = _voice(140.0 * 2 ** (4 * np.sin(2 * np.pi * 0.4 * t) / 12))  # +/- 4 semitone glides
+
+        flat, lively = pitch_statistics(yin_pitch(monotone, SR)), pitch_statistics(yin_pitch(varied, SR))
+        self.assertLess(flat["variability_semitones"], 0.5)
+        self.assertGreater(lively["range_semitones"], 5)
+        self.assertEqual((compute_intonation_score(flat), compute_intonation_score(lively)), (0.4, 0.8))
+        self.assertEqual(compute_intonation_score(pitch_statistics(np.empty(0))), 0.6)
+
+    def test_loudness_alone_does_not_change_intonation(self):
+        t = np.arange(10 * SR) / SR
+        y = _voice(np.full(t.size, 180.0)) * (0.2 + 0.8 * (np.sin(2 * np.pi * 0.5 * t) > 0))
+        features = extract_acoustic_features(y.astype(np.float32), "")
+        self.assertEqual(features["intonation_score"], 0.4)
+        self.assertLess(features["pitch_variability"], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from utils.result_cache import ResultCache
+
+
+class ResultCacheTests(unittest.TestCase):
+    def test_lru_eviction_by_entries(self):
+        cache = ResultCache("lru", max_entries=2, disk_path=None)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)  # "b" is now least recently used
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_byte_budget(self):
+        cache = ResultCache("bytes", max_entries=100, max_mb=0.01, disk_path=None)  # ~10 KB
+        for i in range(10):
+            cache.set(i, "x" * 2000)
+        stats = cache.stats()
+        self.assertLessEqual(stats["bytes"], stats["max_bytes"])
+        self.assertLess(stats["entries"], 10)
+        cache.set("huge", "x" * 50000)  # larger than the whole budget: not cached
+        self.assertIsNone(cache.get("huge"))
+
+    def test_ttl_expiry(self):
+        cache = ResultCache("ttl", ttl_seconds=10, disk_path=None)
+        with patch("utils.result_cache.time.time", return_value=1000.0):
+            cache.set("k", {"v": 1})
+        with patch("utils.result_cache.time.time", return_value=1005.0):
+            self.assertEqual(cache.get("k"), {"v": 1})
+        with patch("utils.result_cache.time.time", return_value=1011.0):
+            self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_get_returns_copy(self):
+        cache = ResultCache("copy", disk_path=None)
+        cache.set("k", {"v": 1})
+        cache.get("k")["v"] = 2
+        self.assertEqual(cache.get("k"), {"v": 1})
+
+    def test_disk_tier_shared_between_instances(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "cache.sqlite3")
+            writer = ResultCache("asr", disk_path=path)
+            reader = ResultCache("asr", disk_path=path)
+            other = ResultCache("features", disk_path=path)
+            writer.set("hash", "hello world")
+
+            # Membership sees the disk tier without counting a lookup
+            self.assertIn("hash", reader)
+            self.assertNotIn("hash", other)
+            self.assertEqual(reader.get("hash"), "hello world")
+            self.assertIsNone(other.get("hash"))
+            self.assertEqual(reader.get("hash"), "hello world")
+
+            stats = reader.stats()
+            self.assertEqual((stats["disk_hits"], stats["hits"], stats["misses"]), (1, 1, 0))
+            self.assertEqual(stats["hit_ratio"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from evaluators import speaking_audio
+from storage.speaking_store import get_attempt_store
+from utils import job_queue
+
+
+class JobQueueTests(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        patcher = patch.object(job_queue, "JOB_QUEUE_DB", os.path.join(tmp_dir.name, "jobs.sqlite3"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_priority_then_arrival_order(self):
+        low = job_queue.enqueue_job("speaking_part", {"n": 1})
+        high = job_queue.enqueue_job("speaking_part", {"n": 2}, priority=5)
+        low_2 = job_queue.enqueue_job("speaking_part", {"n": 3})
+
+        order = [job_queue.claim_job(["speaking_part"])[0] for _ in range(3)]
+        self.assertEqual(order, [high, low, low_2])
+        self.assertIsNone(job_queue.claim_job(["speaking_part"]))
+
+    def test_retry_with_backoff_then_fail(self):
+        job_id = job_queue.enqueue_job("speaking_part", {"n": 1}, max_attempts=2)
+
+        _, _, payload, attempts = job_queue.claim_job(["speaking_part"])
+        self.assertEqual((payload, attempts), ({"n": 1}, 1))
+        job_queue.fail_job(job_id, "busy", attempts)
+        self.assertEqual(job_queue.get_job(job_id)["status"], job_queue.QUEUED)
+        self.assertIsNone(job_queue.claim_job(["speaking_part"]))  # backing off
+
+        with patch("utils.job_queue.time.time", return_value=time.time() + 10):
+            _, _, _, attempts = job_queue.claim_job(["speaking_part"])
+            job_queue.fail_job(job_id, "busy again", attempts)
+        job = job_queue.get_job(job_id)
+        self.assertEqual((job["status"], job["error"], job["attempts"]), (job_queue.FAILED, "busy again", 2))
+
+    def test_expired_lease_requeues_running_job(self):
+        job_id = job_queue.enqueue_job("speaking_part", {"n": 1})
+        job_queue.claim_job(["speaking_part"])
+
+        with patch("utils.job_queue.time.time", return_value=time.time() + job_queue.JOB_LEASE_SECONDS + 1):
+            claimed = job_queue.claim_job(["speaking_part"])
+        self.assertEqual((claimed[0], claimed[3]), (job_id, 2))
+
+    def test_lease_is_renewed_while_the_handler_runs(self):
+        job_id = job_queue.enqueue_job("slow", {"n": 1})
+        claimed_meanwhile = []
+
+        async def slow(payload):
+            for _ in range(5):
+                await asyncio.sleep(0.1)
+                claimed_meanwhile.append(await asyncio.to_thread(job_queue.claim_job, ["slow"]))
+            return {"ok": True}
+
+        with patch.dict(job_queue._HANDLERS, {"slow": slow}), patch.object(job_queue, "JOB_LEASE_SECONDS", 0.15):
+            self.assertTrue(asyncio.run(job_queue._run_one()))
+        self.assertEqual(claimed_meanwhile, [None] * 5)  # never claimable again mid-run
+        job = job_queue.get_job(job_id)
+        self.assertEqual((job["status"], job["attempts"]), (job_queue.DONE, 1))
+
+    def test_exhausted_job_does_not_hide_the_next_one(self):
+        interrupted = job_queue.enqueue_job("speaking_part", {"n": 1}, priority=5, max_attempts=1)
+        job_queue.claim_job(["speaking_part"])  # its worker dies mid-run
+        waiting = job_queue.enqueue_job("speaking_part", {"n": 2})
+
+        with patch("utils.job_queue.time.time", return_value=time.time() + job_queue.JOB_LEASE_SECONDS + 1):
+            claimed = job_queue.claim_job(["speaking_part"])
+        self.assertEqual(claimed[0], waiting)
+        job = job_queue.get_job(interrupted)
+        self.assertEqual((job["status"], job["error"]), (job_queue.FAILED, "worker interrupted"))
+
+    def test_release_returns_job_without_spending_attempt(self):
+        job_id = job_queue.enqueue_job("speaking_part", {"n": 1})
+        job_queue.claim_job(["speaking_part"])
+        job_queue.release_job(job_id)
+        job = job_queue.get_job(job_id)
+        self.assertEqual((job["status"], job["attempts"]), (job_queue.QUEUED, 0))
+
+
+class SpeakingJobApiTests(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        for target, value in (
+            (job_queue, {"JOB_QUEUE_DB": os.path.join(tmp_dir.name, "jobs.sqlite3"), "JOB_POLL_SECONDS": 0.01}),
+            (speaking_audio, {"JOB_EVENTS_POLL_SECONDS": 0.01}),
+        ):
+            patcher = patch.multiple(target, **value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        @asynccontextmanager
+        async def lifespan(app):
+            job_queue.start_job_workers(1)
+            yield
+            await job_queue.stop_job_workers()
+
+        app = FastAPI(lifespan=lifespan)
+        app.include_router(speaking_audio.router)
+        self.client = TestClient(app)
+        self.client.__enter__()
+        self.addCleanup(self.client.__exit__, None, None, None)
+
+    def test_part_job_runs_and_streams_result(self):
+        async def fake_part(audio_bytes, part, question=None, questions=None):
+            return {
+                "part": part,
+                "transcript": "I work as a nurse.",
+                "audio_metrics": {"duration_sec": 12.0},
+                "result": {"fluency": 6, "lexical": 6, "grammar": 7, "pronunciation": 7},
+            }
+
+        with patch.object(speaking_audio, "_evaluate_speaking_part_audio", fake_part):
+            accepted = self.client.post(
+                "/speaking/jobs/part/1",
+                files={"file": ("a.webm", b"x" * 2000, "audio/webm")},
+                data={"question": "Do you work?", "attempt_id": "a1"},
+            )
+            self.assertEqual(accepted.status_code, 202)
+            job_id = accepted.json()["job_id"]
+
+            with self.client.stream("GET", f"/speaking/jobs/{job_id}/events") as response:
+                body = "".join(response.iter_text())
+
+        self.assertIn("event: status", body)
+        self.assertIn("event: result", body)
+        job = self.client.get(f"/speaking/jobs/{job_id}").json()
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["result"]["attempt_id"], "a1")
+        self.assertEqual(job["result"]["result"]["overall_band"], 6.5)
+
+    def test_bad_audio_fails_without_retry(self):
+        async def fake_part(audio_bytes, part, question=None, questions=None):
+            return {"part": part, "error": "no_speech_detected", "result": None}
+
+        with patch.object(speaking_audio, "_evaluate_speaking_part_audio", fake_part):
+            job_id = self.client.post(
+                "/speaking/jobs/part/2", files={"file": ("a.webm", b"x" * 2000, "audio/webm")},
+                data={"attempt_id": get_attempt_store().create()},
+            ).json()["job_id"]
+            with self.client.stream("GET", f"/speaking/jobs/{job_id}/events") as response:
+                body = "".join(response.iter_text())
+
+        self.assertIn("event: error", body)
+        job = self.client.get(f"/speaking/jobs/{job_id}").json()
+        self.assertEqual((job["status"], job["attempts"], job["error"]), ("failed", 1, "no_speech_detected"))
+
+    def test_unknown_job(self):
+        self.assertEqual(self.client.get("/speaking/jobs/nope").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
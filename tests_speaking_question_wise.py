@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import unittest
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from evaluators import speaking_audio
+from utils import inference_pool
+from utils.stage_graph import Stage
+
+
+SCORES = {"fluency": 6.0, "lexical": 6.0, "grammar": 6.0, "pronunciation": 6.0}
+
+
+class QuestionWiseConcurrencyTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        app = FastAPI()
+        app.include_router(speaking_audio.router)
+        cls.client = TestClient(app)
+
+    def _post(self, n_clips):
+        files = {f"audio_{i}": (f"a{i}.webm", f"clip-{i}".encode() * 200, "audio/webm") for i in range(1, n_clips + 1)}
+        data = {f"question_{i}": f"Question number {i}?" for i in range(1, n_clips + 1)}
+        return self.client.post("/speaking/audio/question-wise", files=files, data=data)
+
+    def test_clips_run_concurrently_and_keep_order(self):
+        active = {"now": 0, "peak": 0}
+
+        async def fake_part(audio_bytes, part, question=None, **kwargs):
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+            # Later questions finish first
+            await asyncio.sleep(0.01 * (10 - int(question.split()[2].rstrip("?"))))
+            active["now"] -= 1
+            return {"transcript": audio_bytes.read_bytes()[:6].decode(), "result": dict(SCORES)}
+
+        with patch.object(speaking_audio, "_evaluate_speaking_part_audio", fake_part), \
+                patch.object(speaking_audio, "QUESTION_WISE_CONCURRENCY", 3), \
+                patch.object(speaking_audio, "safe_gpt_call", return_value="HELLO"), \
+                patch.object(speaking_audio, "generate_band9_answer", return_value="model answer"), \
+                patch.object(speaking_audio, "generate_vocabulary", return_value=[]), \
+                patch.object(speaking_audio, "generate_scores", return_value=dict(SCORES)), \
+                patch.object(speaking_audio, "generate_mistakes", return_value={}):
+            response = self._post(6)
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        questions = [qa["question"] for key in ("part_1", "part_2", "part_3") for qa in body[key]["questions"]]
+        self.assertEqual(questions, [f"Question number {i}?" for i in range(1, 7)])
+        answers = [qa["user_answer"] for key in ("part_1", "part_3") for qa in body[key]["questions"]]
+        self.assertEqual(answers, [f"clip-{i}" for i in range(1, 7)])
+        self.assertEqual(active["peak"], 3)
+
+    def test_failing_clip_cancels_the_others(self):
+        cancelled = []
+
+        async def fake_part(audio_bytes, part, question=None, **kwargs):
+            if question == "Q1?":
+                await asyncio.sleep(0.01)
+                raise RuntimeError("decode failed")
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(question)
+                raise
+            return {"transcript": "", "result": dict(SCORES)}
+
+        async def run():
+            clips = [(b"x" * 2000, f"Q{i}?") for i in range(1, 5)]
+            with self.assertRaises(RuntimeError):
+                await speaking_audio._evaluate_question_wise_clips(clips)
+            # Every sibling was cancelled before the error reached the caller
+            self.assertEqual(sorted(cancelled), ["Q2?", "Q3?", "Q4?"])
+            self.assertEqual(inference_pool.inference_pool_stats()["active_requests"], 0)
+
+        with patch.object(speaking_audio, "_evaluate_speaking_part_audio", fake_part), \
+                patch.object(speaking_audio, "QUESTION_WISE_CONCURRENCY", 4):
+            asyncio.run(run())
+
+    def test_whole_test_takes_one_admission(self):
+        seen = []
+
+        async def fake_part(audio_bytes, part, question=None, admitted=False, **kwargs):
+            seen.append((admitted, inference_pool.inference_pool_stats()["active_requests"]))
+            return {"transcript": "", "result": dict(SCORES)}
+
+        with patch.object(speaking_audio, "_evaluate_speaking_part_audio", fake_part), \
+                patch.object(speaking_audio, "safe_gpt_call", return_value="HELLO"), \
+                patch.object(speaking_audio, "generate_band9_answer", return_value="model answer"), \
+                patch.object(speaking_audio, "generate_vocabulary", return_value=[]), \
+                patch.object(speaking_audio, "generate_scores", return_value=dict(SCORES)), \
+                patch.object(speaking_audio, "generate_mistakes", return_value={}), \
+                patch("utils.inference_pool.INFERENCE_MAX_PENDING", 1):
+            self.assertEqual(self._post(12).status_code, 200)
+        self.assertEqual(seen, [(True, 1)] * 12)
+
+
+class QuestionWiseStreamTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        app = FastAPI()
+        app.include_router(speaking_audio.router)
+        cls.client = TestClient(app)
+
+    @staticmethod
+    def _events(body: str):
+        for block in body.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+            if lines:
+                yield lines["event"], json.loads(lines["data"])
+
+    def test_progress_events_then_same_result_as_blocking_endpoint(self):
+        async def fake_part(audio_bytes, part, question=None, on_stage=None, **kwargs):
+            transcript = audio_bytes.read_bytes()[:6].decode()
+            await on_stage("asr", {"text": transcript, "words": None}, {})
+            await on_stage("features", {"duration_sec": 20.0}, {})
+            return {"transcript": transcript, "audio_metrics": {"duration_sec": 20.0}, "result": dict(SCORES)}
+
+        files = {f"audio_{i}": (f"a{i}.webm", f"clip-{i}".encode() * 200, "audio/webm") for i in (1, 2)}
+        data = {f"question_{i}": f"Question number {i}?" for i in (1, 2)}
+        with patch.object(speaking_audio, "_evaluate_speaking_part_audio", fake_part), \
+                patch.object(speaking_audio, "safe_gpt_call", return_value="HELLO"), \
+                patch.object(speaking_audio, "generate_band9_answer", return_value="model answer"), \
+                patch.object(speaking_audio, "generate_vocabulary", return_value=[]), \
+                patch.object(speaking_audio, "generate_scores", return_value=dict(SCORES)), \
+                patch.object(speaking_audio, "generate_mistakes", return_value={}):
+            streamed = self.client.post("/speaking/audio/question-wise/stream", files=files, data=data)
+            blocking = self.client.post("/speaking/audio/question-wise", files=files, data=data)
+
+        self.assertEqual(streamed.status_code, 200)
+        self.assertTrue(streamed.headers["content-type"].startswith("text/event-stream"))
+        events = list(self._events(streamed.text))
+        names = [name for name, _ in events]
+        self.assertEqual(names[0], "accepted")
+        self.assertEqual(names[-1], "result")
+        for name in ("transcript", "metrics", "question_score", "band9_answer", "vocabulary", "part_summary"):
+            self.assertIn(name, names)
+        # Each question's transcript arrives before its score, and all scores before the final result
+        for index in (1, 2):
+            positions = {name: i for i, (name, payload) in enumerate(events) if payload.get("index") == index}
+            self.assertLess(positions["transcript"], positions["question_score"])
+        self.assertEqual(sorted(p["transcript"] for n, p in events if n == "transcript"), ["clip-1", "clip-2"])
+        self.assertEqual(events[-1][1], blocking.json())
+
+    def test_missing_audio_is_rejected_before_streaming(self):
+        response = self.client.post("/speaking/audio/question-wise/stream", data={"question_1": "Q?"})
+        self.assertEqual(response.status_code, 400)
+
+
+class PartScoringTests(unittest.TestCase):
+    METRICS = {"duration_sec": 60.0, "pause_count": 2}
+
+    def _evaluate(self, fake_evaluate, questions):
+        def fake_stages(audio_source, audio_hash, part, part_start):
+            async def decode():
+                return None
+
+            async def asr(decode):
+                return {"text": "first answer. second answer. third answer.", "words": None}
+
+            async def features(decode, asr):
+                return dict(self.METRICS)
+
+            return [Stage("decode", decode), Stage("asr", asr, needs=("decode",)),
+                    Stage("features", features, needs=("decode", "asr"))]
+
+        with patch.object(speaking_audio, "_audio_stages", fake_stages), \
+                patch.object(speaking_audio, "split_transcript_with_gpt", side_effect=lambda t, qs: [f"answer {i}" for i in range(len(qs))]), \
+                patch.object(speaking_audio, "evaluate_speaking_part", side_effect=fake_evaluate) as mock_eval:
+            response = asyncio.run(speaking_audio._evaluate_speaking_part_audio(
+                b"x" * 2000, part=1, questions=json.dumps(questions)
+            ))
+        return response, mock_eval
+
+    def test_questions_scored_concurrently_and_combined_derived(self):
+        barrier = threading.Barrier(3, timeout=5)
+        scores = iter([(6, 7, 6, 6), (7, 7, 6, 7), (6, 6, 7, 6)])
+        lock = threading.Lock()
+
+        def fake_evaluate(part, transcript, audio_metrics):
+            with lock:
+                fluency, lexical, grammar, pronunciation = next(scores)
+            barrier.wait()  # only passes if all three questions are in flight together
+            return {
+                "fluency": fluency, "lexical": lexical, "grammar": grammar, "pronunciation": pronunciation,
+                "feedback": {"strengths": transcript.splitlines()[1], "improvements": "Extend answers."},
+                "relevance_score": 0.8,
+            }
+
+        response, mock_eval = self._evaluate(fake_evaluate, ["Q1?", "Q2?", "Q3?"])
+
+        self.assertEqual(mock_eval.call_count, 3)  # no separate combined call
+        self.assertEqual([qa["answer"] for qa in response["qa_pairs"]], ["answer 0", "answer 1", "answer 2"])
+        result = response["result"]
+        self.assertEqual((result["fluency"], result["lexical"], result["grammar"], result["pronunciation"]), (6.5, 6.5, 6.5, 6.5))
+        self.assertEqual(result["feedback"]["strengths"], "Answer: answer 0 Answer: answer 1 Answer: answer 2")
+        self.assertEqual(result["feedback"]["improvements"], "Extend answers.")
+        self.assertEqual(result["relevance_score"], 0.8)
+
+    def test_falls_back_to_combined_call_when_a_question_failed(self):
+        def fake_evaluate(part, transcript, audio_metrics):
+            if "Q2?" in transcript and "Q1?" not in transcript:
+                return {"error": "invalid_gpt_response", "fluency": 5, "lexical": 5, "grammar": 5, "pronunciation": 6}
+            if "Q1?" in transcript and "Q2?" in transcript:
+                return {"fluency": 8, "lexical": 8, "grammar": 8, "pronunciation": 8}
+            return {"fluency": 6, "lexical": 6, "grammar": 6, "pronunciation": 6}
+
+        response, mock_eval = self._evaluate(fake_evaluate, ["Q1?", "Q2?"])
+
+        self.assertEqual(mock_eval.call_count, 3)
+        self.assertEqual(response["result"]["fluency"], 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
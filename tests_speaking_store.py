@@ -0,0 +1,466 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import socketserver
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import main_api
+from evaluators import speaking_audio, speaking_final
+from evaluators.speaking import apply_ielts_part_weighting
+from storage import speaking_store
+from storage.speaking_store import (
+    AttemptNotFound,
+    MemoryAttemptStore,
+    RedisAttemptStore,
+    SQLiteAttemptStore,
+)
+from utils.job_queue import JobError
+from utils.band import add_speaking_part, calculate_final_speaking_band, speaking_band_from_aggregate
+
+
+def _part(fluency, lexical, grammar, pronunciation, **extra):
+    return {"fluency": fluency, "lexical": lexical, "grammar": grammar, "pronunciation": pronunciation, **extra}
+
+
+class _FakeRedis:
+    """Just enough of Redis for RedisAttemptStore: hashes, key TTLs and WATCH/MULTI/EXEC."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}      # key -> {field: value}
+        self.expires = {}   # key -> unix time
+        self.versions = {}  # key -> write counter, for WATCH
+
+    def _live(self, key):
+        if key in self.expires and self.expires[key] <= time.time():
+            self._touch(key)
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+    def _touch(self, key):
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def run(self, args):
+        name, args = args[0].upper(), args[1:]
+        if name in ("PING", "AUTH", "SELECT"):
+            return "+OK"
+        if name == "EXISTS":
+            return int(self._live(args[0]) is not None)
+        if name in ("HSET", "HSETNX"):
+            key, field, value = args
+            entry = self._live(key)
+            if entry is None:
+                entry = self.data[key] = {}
+            if name == "HSETNX" and field in entry:
+                return 0
+            added = int(field not in entry)
+            entry[field] = value
+            self._touch(key)
+            return added
+        if name == "HMGET":
+            entry = self._live(args[0]) or {}
+            return [entry.get(field) for field in args[1:]]
+        if name == "HGETALL":
+            entry = self._live(args[0]) or {}
+            return [item for pair in entry.items() for item in pair]
+        if name in ("EXPIRE", "PERSIST"):
+            if self._live(args[0]) is None:
+                return 0
+            if name == "EXPIRE":
+                self.expires[args[0]] = time.time() + int(args[1])
+            else:
+                self.expires.pop(args[0], None)
+            return 1
+        if name == "DEL":
+            existed = self._live(args[0]) is not None
+            self.data.pop(args[0], None)
+            self.expires.pop(args[0], None)
+            self._touch(args[0])
+            return int(existed)
+        return RuntimeError(f"ERR unknown command '{name}'")
+
+
+_NIL_ARRAY = object()
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2].decode("utf-8"))
+        return args
+
+    def _encode(self, reply) -> bytes:
+        if reply is _NIL_ARRAY:
+            return b"*-1\r\n"
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, str) and reply.startswith("+"):
+            return reply.encode() + b"\r\n"
+        if isinstance(reply, Exception):
+            return b"-" + str(reply).encode() + b"\r\n"
+        if isinstance(reply, int):
+            return b":%d\r\n" % reply
+        if isinstance(reply, list):
+            return b"*%d\r\n" % len(reply) + b"".join(self._encode(item) for item in reply)
+        data = str(reply).encode()
+        return b"$%d\r\n%s\r\n" % (len(data), data)
+
+    def handle(self):
+        redis = self.server.redis
+        watched, queued = {}, None
+        while (args := self._read_command()) is not None:
+            name = args[0].upper()
+            with redis.lock:
+                if name == "WATCH":
+                    watched.update({key: redis.versions.get(key, 0) for key in args[1:]})
+                    reply = "+OK"
+                elif name == "UNWATCH":
+                    watched, reply = {}, "+OK"
+                elif name == "MULTI":
+                    queued, reply = [], "+OK"
+                elif name == "EXEC":
+                    for key in watched:
+                        redis._live(key)  # an expiry counts as a change
+                    dirty = any(redis.versions.get(key, 0) != version for key, version in watched.items())
+                    reply = _NIL_ARRAY if dirty else [redis.run(command) for command in queued]
+                    watched, queued = {}, None
+                elif queued is not None:
+                    queued.append(args)
+                    reply = "+QUEUED"
+                else:
+                    reply = redis.run(args)
+            self.wfile.write(self._encode(reply))
+
+
+class _FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _RespHandler)
+        self.redis = _FakeRedis()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return "redis://:secret@127.0.0.1:%d/2" % self.server_address[1]
+
+
+class _StoreContract:
+    """Behaviour every backend must share."""
+
+    def make_store(self, ttl_seconds: float = 60):
+        raise NotImplementedError
+
+    def test_parts_round_trip(self):
+        store = self.make_store()
+        attempt_id = store.create()
+        self.assertTrue(store.exists(attempt_id))
+        self.assertEqual(store.get(attempt_id), {"parts": {}})
+
+        store.set_part(attempt_id, 2, {"band": np.float64(6.5), "feedback": ["Good range"]})
+        store.set_part(attempt_id, 1, {"band": 6.0})
+        store.set_part(attempt_id, 2, {"band": 7.0})
+        self.assertEqual(store.get(attempt_id), {"parts": {1: {"band": 6.0}, 2: {"band": 7.0}}})
+
+        store.delete(attempt_id)
+        self.assertFalse(store.exists(attempt_id))
+        self.assertIsNone(store.get(attempt_id))
+        self.assertIsNone(store.get_aggregate(attempt_id))
+
+    def test_aggregate_follows_part_writes(self):
+        store = self.make_store()
+        attempt_id = store.create()
+        self.assertEqual(store.get_aggregate(attempt_id), {})
+
+        store.set_part(attempt_id, 1, _part(5, 5, 5, 5))
+        store.set_part(attempt_id, 2, _part(9, 9, 9, 9))
+        store.set_part(attempt_id, 2, _part(7, 7, 7, 7))  # re-submission replaces the part
+        summary = speaking_band_from_aggregate(store.get_aggregate(attempt_id))
+        self.assertEqual(summary["parts_received"], [1, 2])
+        self.assertEqual(summary["band"], 6.0)  # (5 * 0.25 + 7 * 0.35) / 0.6
+
+    def test_writes_do_not_create_attempts(self):
+        store = self.make_store()
+        with self.assertRaises(AttemptNotFound):
+            store.set_part("missing", 2, {"band": 6.0})
+        self.assertFalse(store.exists("missing"))
+
+        store.set_part("given-id", 1, {"band": 5.5}, create=True)
+        self.assertEqual(store.get("given-id"), {"parts": {1: {"band": 5.5}}})
+        self.assertEqual(store.create("given-id"), "given-id")
+        self.assertEqual(store.get("given-id")["parts"], {1: {"band": 5.5}})
+
+    def test_attempts_expire(self):
+        store = self.make_store(ttl_seconds=1)
+        attempt_id = store.create()
+        store.set_part(attempt_id, 1, {"band": 6.0})
+        time.sleep(1.2)
+
+        self.assertIsNone(store.get(attempt_id))
+        with self.assertRaises(AttemptNotFound):
+            store.set_part(attempt_id, 2, {"band": 6.0})
+
+        # A new attempt under the same id starts empty
+        store.set_part(attempt_id, 3, {"band": 7.0}, create=True)
+        self.assertEqual(store.get(attempt_id), {"parts": {3: {"band": 7.0}}})
+
+
+class MemoryStoreTests(_StoreContract, unittest.TestCase):
+    def make_store(self, ttl_seconds: float = 60):
+        return MemoryAttemptStore(ttl_seconds=ttl_seconds, max_attempts=100)
+
+    def test_least_recently_used_attempts_are_evicted(self):
+        store = MemoryAttemptStore(ttl_seconds=60, max_attempts=2)
+        first, second = store.create(), store.create()
+        store.set_part(first, 1, {"band": 6.0})  # first is now the most recent
+        third = store.create()
+
+        self.assertEqual([store.exists(a) for a in (first, second, third)], [True, False, True])
+        self.assertEqual(store.stats()["evictions"], 1)
+
+    def test_results_are_copies(self):
+        store = self.make_store()
+        attempt_id = store.create()
+        result = {"band": 6.0}
+        store.set_part(attempt_id, 1, result)
+        result["band"] = 9.0
+        store.get(attempt_id)["parts"][1]["band"] = 1.0
+        self.assertEqual(store.get(attempt_id)["parts"][1], {"band": 6.0})
+
+
+def _write_parts(path: str, attempt_id: str, part: int, rounds: int):
+    store = SQLiteAttemptStore(path, ttl_seconds=60)
+    for n in range(rounds):
+        store.set_part(attempt_id, part, {"round": n, "pid": os.getpid()})
+
+
+class SQLiteStoreTests(_StoreContract, unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, "attempts.sqlite3")
+
+    def make_store(self, ttl_seconds: float = 60):
+        return SQLiteAttemptStore(self.path, ttl_seconds=ttl_seconds)
+
+    def test_parts_from_concurrent_processes_all_land(self):
+        attempt_id = self.make_store().create()
+        ctx = multiprocessing.get_context("spawn")
+        workers = [ctx.Process(target=_write_parts, args=(self.path, attempt_id, part, 25)) for part in (1, 2, 3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+            self.assertEqual(worker.exitcode, 0)
+
+        store = self.make_store()
+        parts = store.get(attempt_id)["parts"]
+        self.assertEqual(sorted(parts), [1, 2, 3])
+        self.assertEqual(speaking_band_from_aggregate(store.get_aggregate(attempt_id))["parts_received"], [1, 2, 3])
+        self.assertEqual({result["round"] for result in parts.values()}, {24})
+        self.assertEqual(len({result["pid"] for result in parts.values()}), 3)
+
+    def test_prune_removes_expired_attempts(self):
+        store = self.make_store(ttl_seconds=1)
+        store.set_part(store.create(), 1, {"band": 6.0})
+        time.sleep(1.2)
+        self.assertEqual(store.prune(), 1)
+        self.assertEqual(store.stats()["attempts"], 0)
+
+
+class RedisStoreTests(_StoreContract, unittest.TestCase):
+    def setUp(self):
+        self.server = _FakeRedisServer()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def make_store(self, ttl_seconds: float = 60):
+        store = RedisAttemptStore(self.server.url, ttl_seconds=ttl_seconds)
+        self.addCleanup(store.close)
+        return store
+
+    def test_part_write_retries_when_attempt_changes_underneath(self):
+        store = self.make_store()
+        attempt_id = store.create()
+        other = self.make_store()
+        execute = store._execute
+        raced = []
+
+        def racing_execute(*commands):
+            if commands[0][0] == "MULTI" and not raced:
+                raced.append(True)
+                other.set_part(attempt_id, 1, {"band": 5.0})  # bumps the watched key
+            return execute(*commands)
+
+        with patch.object(store, "_execute", racing_execute):
+            store.set_part(attempt_id, 2, {"band": 6.0})
+        self.assertEqual(store.get(attempt_id)["parts"], {1: {"band": 5.0}, 2: {"band": 6.0}})
+        self.assertEqual(sorted(store.get_aggregate(attempt_id)["parts"]), ["1", "2"])
+
+    def test_reconnects_after_dropped_connection(self):
+        store = self.make_store()
+        attempt_id = store.create()
+        store._local.conn._sock.close()
+        self.assertTrue(store.exists(attempt_id))
+
+
+class SpeakingBandAggregateTests(unittest.TestCase):
+    def test_matches_weighted_band_of_all_parts(self):
+        parts = {1: _part(6, 6.5, 5.5, 6), 2: _part(7, 6, 6, 6.5), 3: _part(6.5, 7, 6.5, 7)}
+        expected = apply_ielts_part_weighting(
+            {f"part_{p}": {"avg": sum(r.values()) / 4} for p, r in parts.items()}
+        )
+        self.assertEqual(calculate_final_speaking_band(parts), round(expected * 2) / 2)
+
+        aggregate = None
+        for part in (3, 1, 2):  # arrival order does not matter
+            aggregate = add_speaking_part(aggregate, part, parts[part])
+        summary = speaking_band_from_aggregate(aggregate)
+        self.assertTrue(summary["complete"])
+        self.assertEqual(summary["band"], calculate_final_speaking_band(parts))
+        self.assertEqual(summary["criteria"]["fluency"], 6.5)
+
+    def test_provisional_band_needs_two_parts(self):
+        aggregate = add_speaking_part(None, 1, _part(6, 6, 6, "n/a"))
+        self.assertIsNone(speaking_band_from_aggregate(aggregate)["band"])
+        self.assertEqual(aggregate["parts"]["1"]["pronunciation"], 5.0)
+
+        summary = speaking_band_from_aggregate(add_speaking_part(aggregate, 2, _part(6, 6, 6, 6)))
+        self.assertEqual((summary["band"], summary["complete"]), (6.0, False))
+        self.assertEqual(speaking_band_from_aggregate({})["parts_received"], [])
+
+
+class FinalEndpointTests(unittest.TestCase):
+    def setUp(self):
+        self.store = MemoryAttemptStore(ttl_seconds=60)
+        patcher = patch.object(speaking_final, "get_attempt_store", return_value=self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        app = FastAPI()
+        app.include_router(speaking_final.router)
+        self.client = TestClient(app)
+
+    def test_band_is_provisional_until_all_parts_arrive(self):
+        attempt_id = self.store.create()
+        self.store.set_part(attempt_id, 1, _part(6, 6, 6, 6))
+        body = self.client.get(f"/speaking/final/{attempt_id}").json()
+        self.assertEqual((body["status"], body["provisional_band"]), ("pending", None))
+
+        self.store.set_part(attempt_id, 2, _part(7, 7, 7, 7))
+        body = self.client.get(f"/speaking/final/{attempt_id}").json()
+        self.assertEqual((body["status"], body["provisional_band"], body["final_speaking_band"]), ("provisional", 6.5, None))
+        self.assertNotIn("part_results", body)
+
+        self.store.set_part(attempt_id, 3, _part(7, 7, 7, 7, feedback={"strengths": "Clear"}))
+        body = self.client.get(f"/speaking/final/{attempt_id}").json()
+        self.assertEqual((body["status"], body["final_speaking_band"]), ("complete", 7.0))
+        self.assertEqual(body["part_results"]["3"]["feedback"], {"strengths": "Clear"})
+
+        self.assertEqual(self.client.get("/speaking/final/unknown").status_code, 404)
+
+
+class AttemptRouteTests(unittest.TestCase):
+    """The mounted part routes start attempts on part 1 and only add parts 2 and 3 to live ones."""
+
+    def setUp(self):
+        self.store = MemoryAttemptStore(ttl_seconds=60)
+        patcher = patch.object(speaking_store, "_STORE", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = TestClient(main_api.app)
+
+    @staticmethod
+    async def fake_part(audio_bytes, part, question=None, questions=None, **kwargs):
+        return {"part": part, "transcript": "I work as a nurse.", "result": _part(6, 6, 7, 7)}
+
+    def _upload(self, part, **data):
+        with patch.object(speaking_audio, "_evaluate_speaking_part_audio", self.fake_part):
+            return self.client.post(f"/speaking/part/{part}/audio",
+                                    files={"file": ("a.webm", b"x" * 2000, "audio/webm")}, data=data)
+
+    def test_part_one_starts_the_attempt_and_later_parts_join_it(self):
+        attempt_id = self._upload(1).json()["attempt_id"]
+        self.assertEqual(self._upload(2, attempt_id=attempt_id).status_code, 200)
+        self.assertEqual(sorted(self.store.get(attempt_id)["parts"]), [1, 2])
+        self.assertEqual(speaking_band_from_aggregate(self.store.get_aggregate(attempt_id))["parts_received"], [1, 2])
+
+    def test_final_band_follows_the_uploaded_parts(self):
+        attempt_id = self._upload(1).json()["attempt_id"]
+        self._upload(2, attempt_id=attempt_id)
+        body = self.client.get(f"/speaking/final/{attempt_id}").json()
+        self.assertEqual((body["status"], body["provisional_band"]), ("provisional", 6.5))
+
+        self._upload(3, attempt_id=attempt_id)
+        body = self.client.get(f"/speaking/final/{attempt_id}").json()
+        self.assertEqual((body["status"], body["final_speaking_band"]), ("complete", 6.5))
+        self.assertEqual(sorted(body["part_results"]), ["1", "2", "3"])
+
+    def test_later_parts_need_a_live_attempt(self):
+        self.assertEqual(self._upload(2).status_code, 400)
+        self.assertEqual(self._upload(3, attempt_id="unknown").status_code, 404)
+        self.assertFalse(self.store.exists("unknown"))
+
+    def test_every_mounted_part_route_checks_the_attempt(self):
+        audio = {"file": ("a.webm", b"x" * 2000, "audio/webm")}
+        with patch("evaluators.api.speaking_text._evaluate_speaking_part_audio", self.fake_part):
+            legacy = self.client.post("/speaking/evaluate", files=audio, data={"part": "1"})
+            self.assertEqual(legacy.status_code, 200)
+            self.assertEqual(self.store.get(legacy.json()["attempt_id"])["parts"][1]["fluency"], 6)
+            self.assertEqual(self.client.post("/speaking/evaluate", files=audio,
+                                              data={"part": "2", "attempt_id": "unknown"}).status_code, 404)
+        self.assertEqual(self.client.post("/speaking/jobs/part/3", files=audio,
+                                          data={"attempt_id": "unknown"}).status_code, 404)
+        with self.client.websocket_connect("/speaking/part/2/stream") as ws:
+            ws.send_json({"event": "start", "format": "pcm_s16le", "attempt_id": "unknown"})
+            self.assertEqual(ws.receive_json()["error"], "attempt_not_found")
+        self.assertFalse(self.store.exists("unknown"))
+
+    def test_part_job_records_its_result(self):
+        attempt_id = self.store.create()
+        payload = {"audio": b"x" * 2000, "part": 3, "attempt_id": attempt_id}
+        with patch.object(speaking_audio, "_evaluate_speaking_part_audio", self.fake_part):
+            asyncio.run(speaking_audio._run_part_job(payload))
+            self.assertEqual(list(self.store.get(attempt_id)["parts"]), [3])
+
+            self.store.delete(attempt_id)
+            with self.assertRaises(JobError):
+                asyncio.run(speaking_audio._run_part_job(payload))
+
+
+class StoreSelectionTests(unittest.TestCase):
+    def test_incomplete_backend_fails_when_created(self):
+        class NoAggregates(speaking_store.AttemptStore):
+            create = exists = set_part = get = delete = lambda self, *args: None
+
+        with self.assertRaises(TypeError):
+            NoAggregates()
+
+    def test_backend_from_settings(self):
+        self.assertIsInstance(speaking_store.create_attempt_store("memory"), MemoryAttemptStore)
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                patch.object(speaking_store, "SPEAKING_STORE_DB", os.path.join(tmp_dir, "a.sqlite3")):
+            self.assertIsInstance(speaking_store.create_attempt_store("sqlite"), SQLiteAttemptStore)
+        with self.assertRaises(ValueError):
+            speaking_store.create_attempt_store("dynamo")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import io
+import shutil
+import unittest
+import wave
+from unittest.mock import patch
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from evaluators import speaking_audio
+from utils import inference_pool
+from utils.audio_stream import StreamSegmenter
+
+SR = 16000
+
+
+def speech_with_pauses() -> np.ndarray:
+    """1.5 s speech-like noise, 1 s silence, 2 s speech, 0.5 s silence."""
+    rng = np.random.default_rng(0)
+    parts = [
+        rng.normal(0, 0.2, int(1.5 * SR)),
+        np.zeros(SR),
+        rng.normal(0, 0.2, 2 * SR),
+        np.zeros(SR // 2),
+    ]
+    return np.concatenate(parts).astype(np.float32)
+
+
+class StreamSegmenterTests(unittest.TestCase):
+    def test_segments_at_pauses_across_chunk_boundaries(self):
+        audio = speech_with_pauses()
+        segmenter = StreamSegmenter()
+        segments = []
+        for offset in range(0, audio.size, 4000):  # 250 ms chunks
+            segments += segmenter.push(audio[offset:offset + 4000])
+        self.assertEqual(len(segments), 1)  # first segment closes during the pause
+        segments += segmenter.finish()
+
+        self.assertEqual(len(segments), 2)
+        (s1, e1), (s2, e2) = segments
+        self.assertLess(abs(e1 / SR - 1.5), 0.25)
+        self.assertLess(abs(s2 / SR - 2.5), 0.25)
+        self.assertEqual(segmenter.stats()["pause_count"], 1)
+
+
+class StreamEndpointTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        app = FastAPI()
+        app.include_router(speaking_audio.router)
+        cls.client = TestClient(app)
+
+    def _run_session(self, audio_format: str, chunks: list):
+        transcribed = []
+
+        async def fake_transcribe(samples, word_timestamps=False):
+            self.assertTrue(word_timestamps)
+            self.assertEqual(inference_pool.inference_pool_stats()["active_requests"], 1)
+            transcribed.append(samples.size)
+            n = len(transcribed)
+            return {"text": f"segment {n}", "words": [
+                {"word": "segment", "start": 0.1, "end": 0.5, "probability": 0.9},
+                {"word": str(n), "start": 0.6, "end": 0.9, "probability": 0.8},
+            ]}
+
+        async def direct(func, *args, **kwargs):
+            return func(*args, **kwargs)
+
+        async def fake_score(transcript, audio_metrics, part, question=None, questions=None, part_start=None):
+            return {
+                "part": part,
+                "transcript": transcript,
+                "audio_metrics": audio_metrics,
+                "result": {"fluency": 6, "lexical": 6, "grammar": 7, "pronunciation": 7},
+            }
+
+        def no_whole_clip_analysis(y, sr, **kwargs):
+            raise AssertionError("the stream must not re-analyse the whole buffer")
+
+        with patch.object(speaking_audio, "transcribe_batched", fake_transcribe), \
+                patch.object(speaking_audio, "run_inference", direct), \
+                patch.object(speaking_audio, "analyze_frames", no_whole_clip_analysis), \
+                patch.object(speaking_audio, "_score_part_transcript", fake_score):
+            with self.client.websocket_connect("/speaking/part/1/stream") as ws:
+                ws.send_json({"event": "start", "format": audio_format, "question": "Do you work?", "attempt_id": "a1"})
+                for chunk in chunks:
+                    ws.send_bytes(chunk)
+                ws.send_json({"event": "stop"})
+                events = []
+                while not events or events[-1]["event"] not in ("result", "error"):
+                    events.append(ws.receive_json())
+        return events
+
+    def test_pcm_stream_returns_segments_then_result(self):
+        pcm = (speech_with_pauses() * 32767).astype(np.int16).tobytes()
+        events = self._run_session("pcm_s16le", [pcm[i:i + 8000] for i in range(0, len(pcm), 8000)])
+
+        self.assertEqual([e["event"] for e in events], ["segment", "segment", "result"])
+        result = events[-1]
+        self.assertEqual(result["attempt_id"], "a1")
+        self.assertEqual(result["transcript"], "segment 1 segment 2")
+        self.assertEqual(result["result"]["overall_band"], 6.5)
+        self.assertAlmostEqual(result["audio_metrics"]["duration_sec"], 5.0, places=1)
+        self.assertEqual(inference_pool.inference_pool_stats()["active_requests"], 0)
+
+        # Features built up while streaming match a whole-clip pass with the segments' word timings
+        (s1, _), (s2, _) = [(e["start_sec"], e["end_sec"]) for e in events[:2]]
+        words = [
+            {"word": w, "start": round(start + a, 3), "end": round(start + b, 3), "probability": p}
+            for start, n in ((s1, 1), (s2, 2))
+            for w, a, b, p in (("segment", 0.1, 0.5, 0.9), (str(n), 0.6, 0.9, 0.8))
+        ]
+        audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        expected = speaking_audio.extract_acoustic_features(audio, "segment 1 segment 2", words)
+        streamed = result["audio_metrics"]
+        self.assertEqual(streamed.keys(), expected.keys())
+        for key, value in expected.items():
+            if isinstance(value, float):
+                self.assertAlmostEqual(streamed[key], value, delta=0.02, msg=key)
+            else:
+                self.assertEqual(streamed[key], value, key)
+
+    @unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg not installed")
+    def test_container_stream_is_decoded_by_ffmpeg(self):
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SR)
+            wav.writeframes((speech_with_pauses() * 32767).astype(np.int16).tobytes())
+        data = buffer.getvalue()
+        events = self._run_session("wav", [data[i:i + 16000] for i in range(0, len(data), 16000)])
+
+        self.assertEqual(events[-1]["event"], "result")
+        self.assertEqual(events[-1]["transcript"], "segment 1 segment 2")
+
+    def test_busy_pool_rejects_the_session_before_audio(self):
+        with patch("utils.inference_pool.INFERENCE_MAX_PENDING", 0):
+            with self.client.websocket_connect("/speaking/part/1/stream") as ws:
+                ws.send_json({"event": "start", "format": "pcm_s16le"})
+                self.assertEqual(ws.receive_json()["error"], "busy")
+        self.assertEqual(inference_pool.inference_pool_stats()["active_requests"], 0)
+
+    def test_rejects_missing_start_message(self):
+        with self.client.websocket_connect("/speaking/part/1/stream") as ws:
+            ws.send_bytes(b"\x00" * 100)
+            self.assertEqual(ws.receive_json()["error"], "protocol")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import unittest
+from unittest.mock import patch
+
+from evaluators import speaking_audio
+from utils.stage_graph import Stage, StageTimeout, run_stage_graph
+
+
+def _sleeper(seconds: float, value):
+    async def stage(**inputs):
+        await asyncio.sleep(seconds)
+        return value(**inputs) if callable(value) else value
+    return stage
+
+
+class StageGraphTests(unittest.TestCase):
+    def test_independent_stages_overlap(self):
+        stages = [
+            Stage("a", _sleeper(0.0, 1)),
+            Stage("b", _sleeper(0.1, lambda a: a + 1), needs=("a",)),
+            Stage("c", _sleeper(0.1, lambda a: a + 2), needs=("a",)),
+            Stage("d", _sleeper(0.0, lambda b, c: b * c), needs=("b", "c")),
+        ]
+        start = time.perf_counter()
+        results, timings = asyncio.run(run_stage_graph(stages))
+
+        self.assertEqual(results, {"a": 1, "b": 2, "c": 3, "d": 6})
+        self.assertLess(time.perf_counter() - start, 0.18)
+        self.assertLess(abs(timings["b"]["start"] - timings["c"]["start"]), 0.05)
+        self.assertGreaterEqual(timings["d"]["start"], 0.1)
+        self.assertEqual({t["status"] for t in timings.values()}, {"ok"})
+
+    def test_timeout_and_error_fallbacks(self):
+        async def broken(a):
+            raise RuntimeError("GPT unavailable")
+
+        stages = [
+            Stage("a", _sleeper(0.0, "text")),
+            Stage("slow", _sleeper(1.0, "late"), needs=("a",), timeout=0.05, fallback=lambda a: f"{a} (partial)"),
+            Stage("broken", broken, needs=("a",), fallback=lambda a: []),
+        ]
+        results, timings = asyncio.run(run_stage_graph(stages))
+
+        self.assertEqual((results["slow"], results["broken"]), ("text (partial)", []))
+        self.assertEqual((timings["slow"]["status"], timings["broken"]["status"]), ("timeout_fallback", "fallback"))
+
+    def test_failure_cancels_remaining_stages(self):
+        cancelled = []
+
+        async def long_running(a):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def failing(a):
+            raise ValueError("bad audio")
+
+        stages = [
+            Stage("a", _sleeper(0.0, 1)),
+            Stage("long", long_running, needs=("a",)),
+            Stage("fail", failing, needs=("a",)),
+            Stage("after", _sleeper(0.0, 0), needs=("fail",)),
+        ]
+        with self.assertRaises(ValueError):
+            asyncio.run(run_stage_graph(stages))
+        self.assertEqual(cancelled, [True])
+
+        with self.assertRaises(StageTimeout):
+            asyncio.run(run_stage_graph([Stage("slow", _sleeper(1.0, 0), timeout=0.01)]))
+
+    def test_invalid_graphs(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(run_stage_graph([Stage("a", _sleeper(0, 0), needs=("missing",))]))
+        with self.assertRaises(ValueError):
+            asyncio.run(run_stage_graph([
+                Stage("a", _sleeper(0, 0), needs=("b",)),
+                Stage("b", _sleeper(0, 0), needs=("a",)),
+            ]))
+
+
+class PartPipelineGraphTests(unittest.TestCase):
+    def _evaluate(self, split_delay: float, feature_delay: float = 0.1):
+        def fake_stages(audio_source, audio_hash, part, part_start):
+            return [
+                Stage("decode", _sleeper(0.0, None)),
+                Stage("asr", _sleeper(0.0, {"text": "I like football. I play on Sundays.", "words": None}), needs=("decode",)),
+                Stage("features", _sleeper(feature_delay, {"duration_sec": 50.0}), needs=("decode", "asr")),
+            ]
+
+        def fake_split(transcript, questions):
+            time.sleep(split_delay)
+            return ["I like football.", "I play on Sundays."]
+
+        events = []
+
+        async def on_stage(name, value, timing):
+            events.append(name)
+
+        with patch.object(speaking_audio, "_audio_stages", fake_stages), \
+                patch.object(speaking_audio, "SPEAKING_SPLIT_TIMEOUT_SECONDS", 0.3), \
+                patch.object(speaking_audio, "split_transcript_with_gpt", side_effect=fake_split), \
+                patch.object(speaking_audio, "evaluate_speaking_part",
+                             return_value={"fluency": 6, "lexical": 6, "grammar": 6, "pronunciation": 6}):
+            response = asyncio.run(speaking_audio._evaluate_speaking_part_audio(
+                b"x" * 2000, part=1, questions=json.dumps(["Do you like sport?", "When do you play?"]), on_stage=on_stage,
+            ))
+        return response, events
+
+    def test_features_and_split_overlap(self):
+        response, events = self._evaluate(split_delay=0.1)
+        timings = response["stage_timings"]
+
+        self.assertEqual([qa["answer"] for qa in response["qa_pairs"]], ["I like football.", "I play on Sundays."])
+        self.assertLess(abs(timings["features"]["start"] - timings["split"]["start"]), 0.05)
+        self.assertLess(timings["score"]["start"], 0.18)
+        self.assertEqual(events[:2], ["decode", "asr"])
+        self.assertEqual(events[-1], "score")
+
+    def test_slow_split_falls_back_to_whole_transcript(self):
+        response, _ = self._evaluate(split_delay=0.6)
+
+        self.assertEqual(response["stage_timings"]["split"]["status"], "timeout_fallback")
+        self.assertEqual([qa["answer"] for qa in response["qa_pairs"]], ["I like football. I play on Sundays."] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
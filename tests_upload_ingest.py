@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import os
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import soundfile as sf
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from evaluators import speaking_audio
+from utils import upload_ingest
+from utils.upload_ingest import UploadTooLarge, ingest_upload
+
+
+class _FakeUpload:
+    def __init__(self, data: bytes):
+        self._stream = io.BytesIO(data)
+        self.reads = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        self.reads += 1
+        return self._stream.read(size)
+
+
+def _wav_bytes(seconds: float) -> bytes:
+    buf = io.BytesIO()
+    sf.write(buf, np.zeros(int(seconds * 16000), dtype=np.float32), 16000, format="WAV", subtype="PCM_16")
+    return buf.getvalue()
+
+
+class IngestUploadTests(unittest.TestCase):
+    def test_small_upload_stays_in_memory(self):
+        data = os.urandom(100_000)
+        upload = asyncio.run(ingest_upload(_FakeUpload(data), spool_mb=1))
+
+        self.assertIsNone(upload.path)
+        self.assertEqual((upload.size, upload.sha256), (len(data), hashlib.sha256(data).hexdigest()))
+        self.assertEqual(upload.source, data)
+
+    def test_large_upload_spools_to_disk_in_chunks(self):
+        data = os.urandom(3 * 1024 * 1024)
+        source = _FakeUpload(data)
+        upload = asyncio.run(ingest_upload(source, spool_mb=1))
+
+        self.assertGreater(source.reads, 10)
+        self.assertTrue(os.path.exists(upload.path))
+        self.assertEqual(upload.source, upload.path)
+        self.assertEqual(upload.sha256, hashlib.sha256(data).hexdigest())
+        self.assertEqual(upload.read_bytes(), data)
+        upload.close()
+        self.assertFalse(os.path.exists(upload.path))
+
+    def test_size_limit_stops_reading_early(self):
+        source = _FakeUpload(os.urandom(4 * 1024 * 1024))
+        with patch.object(upload_ingest.IngestedUpload, "close", autospec=True,
+                          side_effect=upload_ingest.IngestedUpload.close) as close:
+            with self.assertRaises(UploadTooLarge):
+                asyncio.run(ingest_upload(source, max_bytes=1024 * 1024, spool_mb=0.5))
+        self.assertLessEqual(source.reads, 5)
+        close.assert_called_once()
+        self.assertFalse(os.path.exists(close.call_args[0][0].path))
+
+    def test_declared_duration_limit(self):
+        with self.assertRaises(UploadTooLarge):
+            asyncio.run(ingest_upload(_FakeUpload(_wav_bytes(40)), max_seconds=30, spool_mb=0.1))
+        upload = asyncio.run(ingest_upload(_FakeUpload(_wav_bytes(20)), max_seconds=30, spool_mb=0.1))
+        self.assertIsNotNone(upload.path)
+        upload.close()
+
+
+class IngestEndpointTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        app = FastAPI()
+        app.include_router(speaking_audio.router)
+        cls.client = TestClient(app)
+
+    def test_oversized_upload_is_rejected_with_413(self):
+        with patch.object(upload_ingest, "UPLOAD_MAX_BYTES", 10_000), \
+                patch.object(speaking_audio, "_evaluate_speaking_part_audio") as evaluate:
+            response = self.client.post("/speaking/part/1/audio", files={"file": ("a.webm", b"x" * 20_000, "audio/webm")})
+
+        self.assertEqual(response.status_code, 413)
+        evaluate.assert_not_called()
+
+    def test_evaluator_gets_hashed_upload(self):
+        seen = {}
+
+        async def fake_part(audio_bytes, part, question=None, questions=None):
+            seen.update(size=len(audio_bytes), sha256=audio_bytes.sha256)
+            return {"part": part, "transcript": "Hello.", "audio_metrics": {}, "result": {"fluency": 6, "lexical": 6, "grammar": 6, "pronunciation": 6}}
+
+        data = b"y" * 5000
+        with patch.object(speaking_audio, "_evaluate_speaking_part_audio", fake_part):
+            response = self.client.post("/speaking/part/1/audio", files={"file": ("a.webm", data, "audio/webm")})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(seen, {"size": 5000, "sha256": hashlib.sha256(data).hexdigest()})
+
+
+if __name__ == "__main__":
+    unittest.main()
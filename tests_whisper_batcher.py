@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from utils import whisper_batcher
+from utils.whisper_batcher import stitch_transcripts, stitch_words
+from utils.whisper_registry import split_windows
+
+SR = 16000
+
+
+class WhisperBatcherTests(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+
+        async def fake_run_inference(func, clips):
+            self.batches.append(len(clips))
+            await asyncio.sleep(0)
+            return [f"text {int(c[0])}" for c in clips]
+
+        patcher = patch.object(whisper_batcher, "run_inference", fake_run_inference)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def _transcribe_many(self, n):
+        clips = [np.full(10, i, dtype=np.float32) for i in range(n)]
+        return await asyncio.gather(*(whisper_batcher.transcribe_batched(c) for c in clips))
+
+    def test_groups_clips_into_batches_and_keeps_order(self):
+        with patch.object(whisper_batcher, "WHISPER_BATCH_SIZE", 4), \
+                patch.object(whisper_batcher, "WHISPER_BATCH_WAIT_MS", 5):
+            texts = asyncio.run(self._transcribe_many(6))
+
+        self.assertEqual(texts, [f"text {i}" for i in range(6)])
+        self.assertEqual(self.batches, [4, 2])
+
+    def test_batch_size_one_disables_batching(self):
+        with patch.object(whisper_batcher, "WHISPER_BATCH_SIZE", 1):
+            texts = asyncio.run(self._transcribe_many(3))
+
+        self.assertEqual(texts, ["text 0", "text 1", "text 2"])
+        self.assertEqual(self.batches, [1, 1, 1])
+
+    def test_failure_reaches_every_caller(self):
+        async def failing(func, clips):
+            raise RuntimeError("Whisper model not available; install dependencies.")
+
+        async def run():
+            return await asyncio.gather(
+                whisper_batcher.transcribe_batched(np.zeros(10, dtype=np.float32)),
+                whisper_batcher.transcribe_batched(np.zeros(10, dtype=np.float32)),
+                return_exceptions=True,
+            )
+
+        with patch.object(whisper_batcher, "run_inference", failing), \
+                patch.object(whisper_batcher, "WHISPER_BATCH_SIZE", 4), \
+                patch.object(whisper_batcher, "WHISPER_BATCH_WAIT_MS", 1):
+            results = asyncio.run(run())
+
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+
+    def test_cancelled_batch_releases_every_caller(self):
+        started = []
+
+        async def hanging(func, clips):
+            started.append(len(clips))
+            await asyncio.sleep(60)
+
+        async def run():
+            callers = asyncio.gather(
+                whisper_batcher.transcribe_batched(np.zeros(10, dtype=np.float32)),
+                whisper_batcher.transcribe_batched(np.zeros(10, dtype=np.float32)),
+                return_exceptions=True,
+            )
+            while not started:
+                await asyncio.sleep(0.001)
+            for task in list(whisper_batcher._RUNNING):
+                task.cancel()
+            return await asyncio.wait_for(callers, 5)
+
+        with patch.object(whisper_batcher, "run_inference", hanging), \
+                patch.object(whisper_batcher, "WHISPER_BATCH_SIZE", 4), \
+                patch.object(whisper_batcher, "WHISPER_BATCH_WAIT_MS", 1):
+            results = asyncio.run(run())
+
+        self.assertTrue(all(isinstance(r, asyncio.CancelledError) for r in results))
+
+    def test_word_timestamps_only_for_callers_that_ask(self):
+        calls = []
+
+        async def fake_run_inference(func, clips, word_timestamps=False):
+            calls.append((len(clips), word_timestamps))
+            return [{"text": f"text {int(c[0])}", "words": [{"word": "text", "start": 0.0, "end": 0.4}]} for c in clips]
+
+        async def run():
+            return await asyncio.gather(
+                whisper_batcher.transcribe_batched(np.full(10, 1, dtype=np.float32), word_timestamps=True),
+                whisper_batcher.transcribe_batched(np.full(10, 2, dtype=np.float32)),
+            )
+
+        with patch.object(whisper_batcher, "run_inference", fake_run_inference), \
+                patch.object(whisper_batcher, "WHISPER_BATCH_SIZE", 4), \
+                patch.object(whisper_batcher, "WHISPER_BATCH_WAIT_MS", 5):
+            with_words, text_only = asyncio.run(run())
+
+        self.assertEqual(calls, [(2, True)])
+        self.assertEqual(with_words["text"], "text 1")
+        self.assertEqual(text_only, "text 2")
+
+
+class LongClipTests(unittest.TestCase):
+    def test_stitch_drops_overlapping_words(self):
+        self.assertEqual(
+            stitch_transcripts(["I grew up in a small town.", "Small town near the coast, we had", "we had a boat."]),
+            "I grew up in a small town. near the coast, we had a boat.",
+        )
+        self.assertEqual(stitch_transcripts(["one two", "three four"]), "one two three four")
+        self.assertEqual(stitch_transcripts(["", "hello there"]), "hello there")
+
+    def test_long_clip_chunks_run_in_parallel_with_overlap(self):
+        calls = []
+        active = {"now": 0, "peak": 0}
+
+        async def fake_run_inference(func, clips):
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+            calls.append(clips[0].size)
+            index = len(calls)
+            await asyncio.sleep(0.01 * (4 - index))  # finish out of order
+            active["now"] -= 1
+            return [f"chunk{index}"]
+
+        samples = np.random.default_rng(1).normal(0, 0.1, 70 * SR).astype(np.float32)
+        with patch.object(whisper_batcher, "run_inference", fake_run_inference):
+            text = asyncio.run(whisper_batcher.transcribe_long(samples, SR))
+
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(active["peak"], 3)
+        self.assertTrue(all(size <= 30 * SR for size in calls))
+        overlap = int(whisper_batcher.LONG_CHUNK_OVERLAP_SECONDS * SR)
+        self.assertEqual(sum(calls), samples.size + 2 * overlap)
+        self.assertEqual(text, "chunk1 chunk2 chunk3")
+
+    def test_stitch_words_drops_overlap_and_offsets_chunks(self):
+        first = [{"word": "I", "start": 0.5, "end": 0.7}, {"word": "grew", "start": 28.6, "end": 29.0},
+                 {"word": "up", "start": 29.2, "end": 29.4}]  # "up" is in the overlap
+        second = [{"word": "up", "start": 0.2, "end": 0.4}, {"word": "here.", "start": 0.5, "end": 0.9}]
+        words = stitch_words([first, second], [(0.0, 29.0), (29.0, 40.0)])
+
+        self.assertEqual([w["word"] for w in words], ["I", "grew", "up", "here."])
+        self.assertEqual([w["start"] for w in words], [0.5, 28.6, 29.2, 29.5])
+        self.assertIsNone(stitch_words([first, None], [(0.0, 29.0), (29.0, 40.0)]))
+
+    def test_long_clip_word_timestamps(self):
+        async def fake_run_inference(func, clips, word_timestamps=False):
+            return [{"text": "word", "words": [{"word": "word", "start": 1.0, "end": 1.5}]}]
+
+        samples = np.random.default_rng(2).normal(0, 0.1, 70 * SR).astype(np.float32)
+        with patch.object(whisper_batcher, "run_inference", fake_run_inference):
+            result = asyncio.run(whisper_batcher.transcribe_long(samples, SR, word_timestamps=True))
+
+        starts = [w["start"] for w in result["words"]]
+        self.assertEqual(len(starts), 3)
+        self.assertEqual(starts[0], 1.0)
+        self.assertTrue(25 < starts[1] - 1.0 <= 29 and starts[1] < starts[2])
+
+
+class SplitWindowsTests(unittest.TestCase):
+    def test_short_clip_is_one_window(self):
+        samples = np.ones(20 * SR, dtype=np.float32)
+        self.assertEqual([p.size for p in split_windows(samples)], [20 * SR])
+
+    def test_cuts_long_clip_at_quiet_point(self):
+        samples = np.random.default_rng(0).normal(0, 0.2, 70 * SR).astype(np.float32)
+        samples[27 * SR:int(27.3 * SR)] = 0.0  # pause just before the 30 s limit
+        pieces = split_windows(samples)
+
+        self.assertTrue(all(p.size <= 30 * SR for p in pieces))
+        self.assertEqual(sum(p.size for p in pieces), samples.size)
+        self.assertTrue(27 * SR <= pieces[0].size <= int(27.3 * SR))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,323 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+import scipy.fft
+
+# Frame layout shared by every frame-level speaking feature. Matches librosa's
+# defaults (frame_length = n_fft = 2048, hop 512, centred frames) so results
+# line up with librosa.feature.rms / zero_crossing_rate / spectral_centroid
+# and librosa.effects.split.
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+# Frames per STFT block: the windowed frames and spectrum are built one block at a
+# time (as librosa does), so temporaries stay ~2 MB however long the clip is
+STFT_BLOCK_FRAMES = 256
+
+# |y| histogram behind a streamed signal's noise floor: log-spaced bins ~0.3% wide
+LEVEL_EDGES = np.concatenate(([0.0], np.geomspace(1e-6, 1.0, 4096), [np.inf]))
+CLIPPING_LEVEL = 0.98
+
+
+@dataclass
+class FrameAnalysis:
+    """Frame-level views of one signal, computed from a single framing pass."""
+    rms: np.ndarray            # (n_frames,) root-mean-square energy
+    zcr: np.ndarray            # (n_frames,) zero-crossing rate
+    centroid: np.ndarray       # (n_frames,) spectral centroid in Hz
+    magnitude: np.ndarray | None  # (n_frames, FRAME_LENGTH // 2 + 1) |STFT| (Hann window); None if not kept
+    intervals: np.ndarray      # (n_intervals, 2) non-silent [start, end) sample ranges
+    sample_rate: int
+
+
+def _frame(y: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """Zero-copy (n_frames, frame_length) view of y."""
+    n_frames = 1 + (y.size - frame_length) // hop_length
+    return np.lib.stride_tricks.as_strided(
+        y,
+        shape=(n_frames, frame_length),
+        strides=(y.strides[0] * hop_length, y.strides[0]),
+        writeable=False,
+    )
+
+
+def _zero_crossing_rate(signal: np.ndarray, signal_start: int, n_samples: int,
+                        frame_starts: np.ndarray, frame_length: int) -> np.ndarray:
+    """
+    Per-frame zero-crossing rate from one cumulative sum over the signal samples
+    signal = y[signal_start:signal_start + signal.size]. Equivalent to librosa's
+    edge-padded framing: the padding repeats the end samples, so it never adds crossings.
+    """
+    negative = signal < -1e-10  # librosa treats |x| <= 1e-10 as +0
+    crossings = np.zeros(signal.size + 1, dtype=np.int64)
+    np.cumsum(negative[1:] != negative[:-1], out=crossings[2:])
+
+    # Frame i covers samples [start, start + frame_length) of y, clipped to the signal
+    first = np.clip(frame_starts, 0, n_samples - 1) - signal_start
+    last = np.clip(frame_starts + frame_length - 1, 0, n_samples - 1) - signal_start
+    return (crossings[last + 1] - crossings[first + 1]) / float(frame_length)
+
+
+def frame_features(y: np.ndarray, offset: int, n_samples: int, sr: int, first_frame: int, n_frames: int,
+                   frame_length: int = FRAME_LENGTH, hop_length: int = HOP_LENGTH,
+                   keep_magnitude: bool = False) -> tuple:
+    """
+    (rms, zcr, centroid, magnitude or None) of frames [first_frame, first_frame + n_frames)
+    of an n_samples signal, centred and zero-padded as analyze_frames frames it. `y` holds
+    the signal from sample `offset` on and must cover those frames, so a signal that
+    arrives in pieces can be analysed block by block with the same values.
+    """
+    half = frame_length // 2
+    lo = first_frame * hop_length - half
+    hi = lo + (n_frames - 1) * hop_length + frame_length
+    a, b = max(lo, 0), max(min(hi, n_samples), max(lo, 0))
+    signal = np.ascontiguousarray(y[a - offset:b - offset], dtype=np.float32)
+    padded = np.zeros(max(hi - lo, frame_length), dtype=np.float32)
+    padded[a - lo:b - lo] = signal
+    frames = _frame(padded, frame_length, hop_length)[:n_frames]
+
+    # einsum avoids materialising the squared (n_frames, frame_length) array
+    rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / frame_length)
+
+    # Periodic Hann, as scipy/librosa use for STFT; float32 so scipy.fft stays in complex64
+    window = np.hanning(frame_length + 1)[:-1].astype(np.float32)
+    freqs = np.fft.rfftfreq(frame_length, d=1.0 / sr)
+    magnitude = np.empty((n_frames, frame_length // 2 + 1), dtype=np.float32) if keep_magnitude else None
+    centroid = np.empty(n_frames)
+    for start in range(0, n_frames, STFT_BLOCK_FRAMES):
+        block = np.abs(scipy.fft.rfft(frames[start:start + STFT_BLOCK_FRAMES] * window, axis=1))
+        total = block.sum(axis=1, dtype=np.float64)
+        total[total < np.finfo(np.float32).tiny] = 1.0
+        centroid[start:start + block.shape[0]] = (block @ freqs) / total
+        if magnitude is not None:
+            magnitude[start:start + block.shape[0]] = block
+
+    if signal.size:
+        frame_starts = lo + np.arange(n_frames) * hop_length
+        zcr = _zero_crossing_rate(signal, a, n_samples, frame_starts, frame_length)
+    else:
+        zcr = np.zeros(n_frames)
+    return rms, zcr, centroid, magnitude
+
+
+def split_non_silent(rms: np.ndarray, n_samples: int, top_db: float = 25, hop_length: int = HOP_LENGTH) -> np.ndarray:
+    """librosa.effects.split on precomputed frame RMS: (n, 2) non-silent sample ranges."""
+    if rms.size == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    power = rms.astype(np.float64) ** 2
+    ref = max(1e-10, float(power.max()))
+    db = 10.0 * np.log10(np.maximum(1e-10, power)) - 10.0 * np.log10(ref)
+    non_silent = db > -top_db
+
+    edges = [np.flatnonzero(np.diff(non_silent.astype(np.int8))) + 1]
+    if non_silent[0]:
+        edges.insert(0, np.array([0]))
+    if non_silent[-1]:
+        edges.append(np.array([non_silent.size]))
+
+    samples = np.minimum(np.concatenate(edges) * hop_length, n_samples)
+    return samples.reshape((-1, 2)).astype(np.int64)
+
+
+def analyze_frames(y: np.ndarray, sr: int, top_db: float = 25,
+                   frame_length: int = FRAME_LENGTH, hop_length: int = HOP_LENGTH,
+                   keep_magnitude: bool = True) -> FrameAnalysis:
+    """
+    Frame the signal once and derive RMS, centroid (from one shared STFT),
+    zero-crossing rate and non-silent intervals.
+    keep_magnitude=False drops the STFT matrix, e.g. before sending the result between processes.
+    """
+    y = np.ascontiguousarray(y, dtype=np.float32)
+    n_frames = 1 + y.size // hop_length
+    rms, zcr, centroid, magnitude = frame_features(
+        y, 0, y.size, sr, 0, n_frames, frame_length, hop_length, keep_magnitude=keep_magnitude
+    )
+    return FrameAnalysis(
+        rms=rms,
+        zcr=zcr,
+        centroid=centroid,
+        magnitude=magnitude,
+        intervals=split_non_silent(rms, y.size, top_db=top_db, hop_length=hop_length),
+        sample_rate=sr,
+    )
+
+
+# ------------------------------------------------------------
+# Streams: the same analysis, block by block as audio arrives
+# ------------------------------------------------------------
+@dataclass
+class SignalLevels:
+    """Sample-level statistics that add up across blocks of a signal."""
+    n_samples: int = 0
+    peak: float = 0.0
+    clipped: int = 0           # samples with |y| > CLIPPING_LEVEL
+    histogram: np.ndarray = field(default_factory=lambda: np.zeros(LEVEL_EDGES.size - 1, dtype=np.int64))
+
+    @classmethod
+    def of(cls, y: np.ndarray) -> "SignalLevels":
+        abs_y = np.abs(y)
+        return cls(
+            n_samples=int(abs_y.size),
+            peak=float(abs_y.max()) if abs_y.size else 0.0,
+            clipped=int(np.count_nonzero(abs_y > CLIPPING_LEVEL)),
+            histogram=np.histogram(abs_y, bins=LEVEL_EDGES)[0],
+        )
+
+    def add(self, other: "SignalLevels"):
+        self.n_samples += other.n_samples
+        self.peak = max(self.peak, other.peak)
+        self.clipped += other.clipped
+        self.histogram = self.histogram + other.histogram
+
+    def percentile(self, q: float) -> float:
+        """np.percentile(|y|, q), interpolated within one histogram bin."""
+        if not self.n_samples:
+            return 0.0
+        position = q / 100.0 * (self.n_samples - 1)
+        below = np.cumsum(self.histogram)
+        k = int(np.searchsorted(below, position, side="right"))
+        before = below[k - 1] if k else 0
+        low, high = LEVEL_EDGES[k], LEVEL_EDGES[k + 1]
+        if not np.isfinite(high):
+            return float(low)
+        return float(low + (high - low) * (position - before + 0.5) / self.histogram[k])
+
+
+@dataclass
+class FrameBlock:
+    """Frames [first_frame, first_frame + rms.size) of a stream and the levels of its new samples."""
+    first_frame: int
+    rms: np.ndarray
+    zcr: np.ndarray
+    centroid: np.ndarray
+    levels: SignalLevels
+
+
+def analyze_frame_block(y: np.ndarray, offset: int, n_samples: int, sr: int, first_frame: int, n_frames: int,
+                        level_start: int) -> FrameBlock:
+    """One FrameStream block (runs wherever the caller likes, e.g. on the inference pool)."""
+    rms, zcr, centroid, _ = frame_features(y, offset, n_samples, sr, first_frame, n_frames)
+    return FrameBlock(first_frame, rms, zcr, centroid, SignalLevels.of(y[level_start - offset:]))
+
+
+class FrameStream:
+    """
+    analyze_frames for a signal that arrives in pieces. next_block() takes everything
+    received so far and returns the analyze_frame_block arguments for the frames those
+    samples complete (None until a block's worth is ready, unless final); add() each
+    result. finish() merges them into the FrameAnalysis analyze_frames would give for
+    the whole signal (without the magnitude matrix) and the signal's SignalLevels:
+    array work on the frame values only, however long the signal is.
+    """
+
+    def __init__(self, sr: int, top_db: float = 25, block_frames: int = STFT_BLOCK_FRAMES):
+        self.sr = sr
+        self.top_db = top_db
+        self.block_frames = block_frames
+        self.frames_scheduled = 0
+        self.samples_scheduled = 0
+        self.blocks = []
+
+    def next_block(self, y: np.ndarray, final: bool = False) -> tuple | None:
+        half = FRAME_LENGTH // 2
+        if final:
+            complete = 1 + y.size // HOP_LENGTH
+        else:
+            # Frame i is complete once samples up to i * hop + half have arrived
+            complete = (y.size - half) // HOP_LENGTH + 1 if y.size >= half else 0
+        n_frames = complete - self.frames_scheduled
+        if n_frames <= 0 and not (final and y.size > self.samples_scheduled):
+            return None
+        if not final and n_frames < self.block_frames:
+            return None
+
+        first = self.frames_scheduled
+        start = min(max(0, first * HOP_LENGTH - half), self.samples_scheduled)
+        end = y.size if final else (complete - 1) * HOP_LENGTH + half
+        args = (y[start:end].copy(), start, y.size, self.sr, first, max(n_frames, 0), self.samples_scheduled)
+        self.frames_scheduled, self.samples_scheduled = max(complete, first), end
+        return args
+
+    def add(self, block: FrameBlock):
+        self.blocks.append(block)
+
+    def finish(self, n_samples: int) -> tuple:
+        """(FrameAnalysis, SignalLevels) of the whole stream, once every block is added."""
+        blocks = sorted(self.blocks, key=lambda block: block.first_frame)
+        levels = SignalLevels()
+        for block in blocks:
+            levels.add(block.levels)
+        rms, zcr, centroid = (
+            np.concatenate([getattr(block, name) for block in blocks]) if blocks else np.zeros(0)
+            for name in ("rms", "zcr", "centroid")
+        )
+        frames = FrameAnalysis(
+            rms=rms,
+            zcr=zcr,
+            centroid=centroid,
+            magnitude=None,
+            intervals=split_non_silent(rms, n_samples, top_db=self.top_db),
+            sample_rate=self.sr,
+        )
+        return frames, levels
+
+
+@dataclass
+class CondensedSpeech:
+    """Speech-only copy of a signal plus the map from its timeline back to the original."""
+    samples: np.ndarray
+    segments: np.ndarray       # (n, 3) rows of [condensed_start, original_start, length] in samples
+    sample_rate: int
+
+    @property
+    def duration(self) -> float:
+        return self.samples.size / float(self.sample_rate)
+
+    def to_original(self, seconds):
+        """Map condensed-timeline seconds (scalar or array) to seconds in the original signal."""
+        t = np.asarray(seconds, dtype=np.float64) * self.sample_rate
+        if not len(self.segments):
+            return t / self.sample_rate
+        idx = np.clip(np.searchsorted(self.segments[:, 0], t, side="right") - 1, 0, len(self.segments) - 1)
+        condensed_start, original_start, length = (self.segments[idx, k] for k in range(3))
+        # Inserted gaps (past the end of a kept segment) map to that segment's end
+        offset = np.clip(t - condensed_start, 0, length)
+        return (original_start + offset) / self.sample_rate
+
+
+def condense_speech(y: np.ndarray, intervals: np.ndarray, sr: int,
+                    pad_seconds: float = 0.1, gap_seconds: float = 0.2) -> CondensedSpeech:
+    """
+    Keep only the non-silent intervals (padded by pad_seconds, merged when they
+    touch) and join them with at most gap_seconds of silence, so an ASR model
+    still hears word boundaries but not the long pauses.
+    """
+    pad = int(pad_seconds * sr)
+    max_gap = int(gap_seconds * sr)
+
+    merged = []
+    for start, end in np.asarray(intervals, dtype=np.int64).tolist():
+        start, end = max(0, start - pad), min(y.size, end + pad)
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    pieces, segments = [], []
+    position = 0
+    previous_end = None
+    for start, end in merged:
+        if previous_end is not None:
+            gap = min(max_gap, start - previous_end)
+            pieces.append(np.zeros(gap, dtype=y.dtype))
+            position += gap
+        pieces.append(y[start:end])
+        segments.append((position, start, end - start))
+        position += end - start
+        previous_end = end
+
+    return CondensedSpeech(
+        samples=np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32),
+        segments=np.array(segments, dtype=np.int64).reshape(-1, 3),
+        sample_rate=sr,
+    )
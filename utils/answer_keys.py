@@ -0,0 +1,262 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import cached_property, lru_cache
+
+from utils.answer_matching import LABEL_QUESTION_TYPES, AnswerMatcher, matching_rules
+
+
+# Registered reading / listening answer keys. A test is registered once (test_id ->
+# compiled key, question types and answer matchers); evaluation requests then send only
+# test_id and the user's answers. Keys live in SQLite, shared by every worker process; each process keeps
+# recently used compiled keys in memory for ANSWER_KEY_CACHE_TTL_SECONDS, which bounds how
+# long a key replaced from another worker can be served stale.
+ANSWER_KEY_DB = os.getenv("ANSWER_KEY_DB", "answer_keys.sqlite3")
+ANSWER_KEY_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_KEY_CACHE_MAX_ENTRIES", "256"))
+ANSWER_KEY_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_KEY_CACHE_TTL_SECONDS", "300"))
+
+MODULES = ("reading", "listening")
+
+_LOCAL = threading.local()
+_CACHE = OrderedDict()  # (module, test_id) -> (AnswerKey, loaded_at)
+_CACHE_LOCK = threading.Lock()
+_STATS = {"hits": 0, "disk_loads": 0, "misses": 0, "registrations": 0}
+
+
+class AnswerKeyNotFound(KeyError):
+    """No answer key is registered under this test_id."""
+
+
+class AnswerKeyConflict(ValueError):
+    """A different answer key is already registered under this test_id."""
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    module: str
+    question_ids: tuple
+    key_values: tuple
+    question_types: tuple
+    total_questions: int  # reading accuracy also counts questions without a usable key
+    test_type: str | None = None
+    accepted_answers: tuple = ()    # per question: further answers marked correct
+    spelling_tolerance: tuple = ()  # per question: override of matching["spelling_tolerance"] (None = key default)
+    matching: dict | None = None    # utils.answer_matching rules for the whole key
+
+    @property
+    def fingerprint(self) -> str:
+        payload = json.dumps(asdict(self), sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def type_map(self) -> dict:
+        return dict(zip(self.question_ids, self.question_types))
+
+    @cached_property
+    def matchers(self) -> tuple:
+        """One compiled AnswerMatcher per question, built once per key."""
+        parts = (self.key_values, self.question_types, self.accepted_answers, self.spelling_tolerance)
+        rule_items = tuple(sorted(matching_rules(self.matching).items()))
+        try:
+            # Inline keys are recompiled on every request: share matchers between equal keys.
+            # Value types are part of the cache key since 1, 1.0 and True hash alike.
+            return _cached_matchers(tuple(map(type, self.key_values)), *parts, rule_items)
+        except TypeError:
+            # Unhashable answers (lists, dicts)
+            return _build_matchers(*parts, rule_items)
+
+
+def _build_matchers(key_values, question_types, accepted_answers, spelling_tolerance, rule_items) -> tuple:
+    rules = dict(rule_items)
+    matchers = []
+    for j, (answer, qtype) in enumerate(zip(key_values, question_types)):
+        accepted = accepted_answers[j] if j < len(accepted_answers) else ()
+        tolerance = spelling_tolerance[j] if j < len(spelling_tolerance) else None
+        if qtype in LABEL_QUESTION_TYPES:
+            question_rules = matching_rules(rules, spelling_tolerance=0, strip_articles=False, number_words=False)
+        else:
+            question_rules = rules if tolerance is None else matching_rules(rules, spelling_tolerance=tolerance)
+        matchers.append(AnswerMatcher(answer, accepted, question_rules))
+    return tuple(matchers)
+
+
+@lru_cache(maxsize=1024)
+def _cached_matchers(value_types, *parts) -> tuple:
+    return _build_matchers(*parts)
+
+
+def _accepted(values) -> tuple:
+    if values is None:
+        return ()
+    if not isinstance(values, list):
+        raise ValueError("accepted_answers must be a list")
+    return tuple(values)
+
+
+def _matching(data: dict) -> dict | None:
+    rules = data.get("matching")
+    if rules is not None and not isinstance(rules, dict):
+        raise ValueError("matching must be an object")
+    return rules
+
+
+def compile_answer_key(module: str, data: dict) -> AnswerKey:
+    """
+    Validate and compile a key from an evaluation-style payload: {"questions": [...],
+    "test_type": ...} for reading (questions may carry "accepted_answers" and
+    "spelling_tolerance"), {"answer_key": {...}, "accepted_answers": {qid: [...]}} for
+    listening; either may carry "matching" rules.
+    """
+    if module == "reading":
+        questions = data.get("questions")
+        if not questions or not isinstance(questions, list):
+            raise ValueError("Invalid reading input format")
+        # Questions without an id or key are never marked but count towards accuracy
+        graded = [q for q in questions if isinstance(q, dict) and q.get("question_id") and q.get("answer_key") is not None]
+        return AnswerKey(
+            module=module,
+            question_ids=tuple(q["question_id"] for q in graded),
+            key_values=tuple(q["answer_key"] for q in graded),
+            question_types=tuple(q.get("type", "UNKNOWN") for q in graded),
+            total_questions=len(questions),
+            test_type=data.get("test_type", "academic"),
+            accepted_answers=tuple(_accepted(q.get("accepted_answers")) for q in graded),
+            spelling_tolerance=tuple(q.get("spelling_tolerance") for q in graded),
+            matching=_matching(data),
+        )
+
+    if module == "listening":
+        key = data.get("answer_key")
+        if not isinstance(key, dict):
+            raise ValueError("user_answers and answer_key are required")
+        accepted = data.get("accepted_answers") or {}
+        if not isinstance(accepted, dict):
+            raise ValueError("accepted_answers must map question ids to lists")
+        return AnswerKey(
+            module=module,
+            question_ids=tuple(key),
+            key_values=tuple(key.values()),
+            question_types=("LISTENING",) * len(key),
+            total_questions=len(key),
+            accepted_answers=tuple(_accepted(accepted.get(qid)) for qid in key),
+            matching=_matching(data),
+        )
+
+    raise ValueError(f"Unsupported module: {module}")
+
+
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_LOCAL, "conn", None)
+    if conn is None or getattr(_LOCAL, "path", None) != ANSWER_KEY_DB:
+        conn = sqlite3.connect(ANSWER_KEY_DB, timeout=10.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS answer_keys ("
+            "module TEXT NOT NULL, test_id TEXT NOT NULL, answer_key TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (module, test_id))"
+        )
+        _LOCAL.conn, _LOCAL.path = conn, ANSWER_KEY_DB
+    return conn
+
+
+def _remember(module: str, test_id: str, key: AnswerKey):
+    with _CACHE_LOCK:
+        _CACHE[(module, test_id)] = (key, time.time())
+        _CACHE.move_to_end((module, test_id))
+        while len(_CACHE) > max(1, ANSWER_KEY_CACHE_MAX_ENTRIES):
+            _CACHE.popitem(last=False)
+
+
+def register_answer_key(test_id: str, module: str, data: dict, replace: bool = False) -> dict:
+    """
+    Compile and store the key for test_id. Registering the same key again is a no-op;
+    a different key raises AnswerKeyConflict unless replace=True.
+    """
+    test_id = str(test_id or "").strip()
+    if not test_id:
+        raise ValueError("test_id is required")
+    key = compile_answer_key(module, data)
+    key.matchers  # compile now: invalid matching rules fail the registration, not a grading request
+    fingerprint = key.fingerprint
+    now = time.time()
+
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT fingerprint FROM answer_keys WHERE module = ? AND test_id = ?", (module, test_id)
+        ).fetchone()
+        if row is not None and row[0] != fingerprint and not replace:
+            raise AnswerKeyConflict(f"A different {module} answer key is already registered as {test_id}")
+        if row is None or row[0] != fingerprint:
+            conn.execute(
+                "INSERT INTO answer_keys (module, test_id, answer_key, fingerprint, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (module, test_id) DO UPDATE SET "
+                "answer_key = excluded.answer_key, fingerprint = excluded.fingerprint, updated_at = excluded.updated_at",
+                (module, test_id, json.dumps(asdict(key)), fingerprint, now, now),
+            )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+    _remember(module, test_id, key)
+    _STATS["registrations"] += 1
+    print({"event": "answer_key_registered", "module": module, "test_id": test_id,
+           "questions": len(key.question_ids), "fingerprint": fingerprint})
+    return {
+        "test_id": test_id,
+        "module": module,
+        "questions": key.total_questions,
+        "graded_questions": len(key.question_ids),
+        "fingerprint": fingerprint,
+        "created": row is None,
+    }
+
+
+def get_answer_key(test_id: str, module: str) -> AnswerKey:
+    """Compiled key for test_id from memory, else from disk. Raises AnswerKeyNotFound."""
+    cache_key = (module, str(test_id))
+    with _CACHE_LOCK:
+        entry = _CACHE.get(cache_key)
+        if entry is not None and time.time() - entry[1] < ANSWER_KEY_CACHE_TTL_SECONDS:
+            _CACHE.move_to_end(cache_key)
+            _STATS["hits"] += 1
+            return entry[0]
+
+    row = _connect().execute(
+        "SELECT answer_key FROM answer_keys WHERE module = ? AND test_id = ?", cache_key
+    ).fetchone()
+    if row is None:
+        _STATS["misses"] += 1
+        raise AnswerKeyNotFound(f"Unknown {module} test_id: {test_id}")
+
+    stored = json.loads(row[0])
+    key = AnswerKey(**{name: tuple(value) if isinstance(value, list) else value for name, value in stored.items()})
+    _remember(module, str(test_id), key)
+    _STATS["disk_loads"] += 1
+    return key
+
+
+def resolve_answer_key(module: str, data: dict) -> AnswerKey:
+    """The registered key when the request names a test_id (and carries no key), else the inline key."""
+    inline = data.get("questions") if module == "reading" else data.get("answer_key")
+    if data.get("test_id") and inline is None:
+        return get_answer_key(data["test_id"], module)
+    return compile_answer_key(module, data)
+
+
+def clear_answer_key_cache():
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+
+def answer_key_stats() -> dict:
+    with _CACHE_LOCK:
+        return {"cached": len(_CACHE), **_STATS}
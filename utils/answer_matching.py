@@ -0,0 +1,203 @@
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from itertools import combinations
+
+# Answer matching for reading / listening keys. Each question's accepted answers are
+# normalised once into a set (plus, when spelling tolerance is on, an index of their
+# deletion variants), so checking an answer is one normalisation and a few set lookups
+# however many variants a key lists.
+#
+# Rules (per key, "matching" in the key payload; a reading question may override
+# spelling_tolerance):
+#   exact             plain == comparison, nothing else applies
+#   fold_case         case-insensitive; whitespace and punctuation are always folded
+#   strip_articles    a leading "a" / "an" / "the" is ignored ("the museum" == "museum"), unless it
+#                     is the whole answer or precedes a single letter ("a c", "the a" are options)
+#   number_words      number words equal digits ("twelve" == "12", "twenty-one" == "21")
+#   spelling_tolerance  edits allowed on word answers: 1 from 5 letters, 2 from 10
+DEFAULT_MATCHING = {
+    "exact": False,
+    "fold_case": True,
+    "strip_articles": True,
+    "number_words": True,
+    "spelling_tolerance": 0,
+}
+MAX_SPELLING_TOLERANCE = 2
+# Answers that are labels, not words: compared without spelling tolerance, article
+# stripping or number words
+LABEL_QUESTION_TYPES = {"MCQ", "TRUE_FALSE_NOT_GIVEN", "YES_NO_NOT_GIVEN"}
+
+ARTICLES = {"a", "an", "the"}
+_UNITS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8,
+    "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+_TENS = {"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90}
+_SCALES = {"hundred": 100, "thousand": 1000, "million": 1000000}
+
+_TOKEN = re.compile(r"[^\W_]+(?:[.'][^\W_]+)*")
+_DIGIT_LETTER = re.compile(r"(?<=\d)(?=[^\W\d_])|(?<=[^\W\d_])(?=\d)")
+_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3}\b)")
+
+
+def matching_rules(rules: dict | None = None, **overrides) -> dict:
+    merged = {**DEFAULT_MATCHING, **(rules or {}), **{k: v for k, v in overrides.items() if v is not None}}
+    merged["spelling_tolerance"] = max(0, min(MAX_SPELLING_TOLERANCE, int(merged["spelling_tolerance"] or 0)))
+    return merged
+
+
+def _numbers_to_digits(tokens: list) -> list:
+    """
+    Replace runs of number words with their value ("one hundred and five" -> "105").
+    Only a tens word takes a following unit ("twenty one" -> "21"); a word after a unit
+    starts a new number, so spoken digit sequences stay digits ("one two" -> "1 2").
+    """
+    out, total, current, last = [], 0, 0, None  # last: None | "unit" | "tens" | "scale"
+    for i, token in enumerate(tokens):
+        lower = token.lower()
+        if lower in _UNITS or lower in _TENS:
+            value = _UNITS.get(lower, _TENS.get(lower, 0))
+            if last == "unit" or (last == "tens" and not 0 < value < 10):
+                out.append(str(total + current))
+                total, current = 0, 0
+            current += value
+            last = "unit" if lower in _UNITS else "tens"
+            continue
+        if lower in _SCALES:
+            scale = _SCALES[lower]
+            if scale == 100:
+                current = max(current, 1) * 100
+            else:
+                total, current = total + max(current, 1) * scale, 0
+            last = "scale"
+            continue
+        if lower == "and" and last == "scale" and i + 1 < len(tokens) and (
+            tokens[i + 1].lower() in _UNITS or tokens[i + 1].lower() in _TENS
+        ):
+            continue
+        if last:
+            out.append(str(total + current))
+            total, current, last = 0, 0, None
+        out.append(token)
+    if last:
+        out.append(str(total + current))
+    return out
+
+
+def normalise_answer(value, rules: dict):
+    """
+    Comparable form of an answer under `rules`: a string for text and numbers, a tuple
+    for multi-part (list) answers, and the value itself (or its JSON) for anything else.
+    """
+    if type(value) is str and not rules["exact"]:
+        return _normalise_text(value, rules["fold_case"], rules["strip_articles"], rules["number_words"])
+    if rules["exact"]:
+        return ("__json__", json.dumps(value, sort_keys=True, default=str)) if isinstance(value, (list, dict)) else value
+    if isinstance(value, (list, tuple)):
+        return tuple(normalise_answer(item, rules) for item in value)
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        value = str(int(value)) if float(value).is_integer() else str(value)
+    if not isinstance(value, str):
+        return ("__json__", json.dumps(value, sort_keys=True, default=str))
+
+    return _normalise_text(value, rules["fold_case"], rules["strip_articles"], rules["number_words"])
+
+
+@lru_cache(maxsize=65536)
+def _normalise_text(text: str, fold_case: bool, strip_articles: bool, number_words: bool) -> str:
+    # Keys and common answers repeat across requests, so most calls are cache hits
+    text = unicodedata.normalize("NFKC", text)
+    if fold_case:
+        text = text.casefold()
+    text = _DIGIT_LETTER.sub(" ", _THOUSANDS.sub("", text))
+    tokens = _TOKEN.findall(text)
+    if strip_articles and len(tokens) > 1 and tokens[0].lower() in ARTICLES and not (
+        len(tokens[1]) == 1 and tokens[1].isalpha()
+    ):
+        tokens = tokens[1:]
+    if number_words:
+        tokens = _numbers_to_digits(tokens)
+    return " ".join(tokens)
+
+
+def _allowed_edits(form, tolerance: int) -> int:
+    """Spelling tolerance for one accepted form: word answers only, scaled by length."""
+    if not tolerance or not isinstance(form, str) or any(ch.isdigit() for ch in form):
+        return 0
+    return min(tolerance, len(form.replace(" ", "")) // 5)
+
+
+def _deletes(word: str, max_edits: int) -> set:
+    variants = {word}
+    for n in range(1, min(max_edits, len(word)) + 1):
+        for positions in combinations(range(len(word)), n):
+            variants.add("".join(ch for i, ch in enumerate(word) if i not in positions))
+    return variants
+
+
+def _within_edits(a: str, b: str, max_edits: int) -> bool:
+    """Edit distance (insertions, deletions, substitutions, adjacent swaps) <= max_edits."""
+    if abs(len(a) - len(b)) > max_edits:
+        return False
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        before, previous = previous, current
+    return previous[-1] <= max_edits
+
+
+class AnswerMatcher:
+    """Compiled matcher for one question: matcher(user_answer) -> bool."""
+
+    __slots__ = ("rules", "forms", "_allowed", "_index", "_max_edits", "_max_len")
+
+    def __init__(self, answer, accepted=(), rules: dict | None = None):
+        self.rules = rules or matching_rules()
+        self.forms = set()
+        for value in (answer, *accepted):
+            try:
+                self.forms.add(normalise_answer(value, self.rules))
+            except TypeError:
+                self.forms.add(("__json__", json.dumps(value, sort_keys=True, default=str)))
+
+        # Symmetric-delete index: a misspelling within k edits of a form shares a
+        # deletion variant with it, so lookups never scan the accepted forms.
+        self._allowed, self._index, self._max_edits, self._max_len = {}, {}, 0, 0
+        if not self.rules["exact"]:
+            for form in self.forms:
+                edits = _allowed_edits(form, self.rules["spelling_tolerance"])
+                if edits:
+                    self._allowed[form] = edits
+                    self._max_edits = max(self._max_edits, edits)
+                    self._max_len = max(self._max_len, len(form) + edits)
+                    for variant in _deletes(form, edits):
+                        self._index.setdefault(variant, set()).add(form)
+
+    def __call__(self, value) -> bool:
+        try:
+            form = normalise_answer(value, self.rules)
+            if form in self.forms:
+                return True
+        except TypeError:
+            return ("__json__", json.dumps(value, sort_keys=True, default=str)) in self.forms
+        if not self._max_edits or not isinstance(form, str) or any(ch.isdigit() for ch in form):
+            return False
+        if len(form) > self._max_len:
+            # Too long to be within edit distance of any form; also bounds the delete variants
+            return False
+        for variant in _deletes(form, self._max_edits):
+            for candidate in self._index.get(variant, ()):
+                if _within_edits(form, candidate, self._allowed[candidate]):
+                    return True
+        return False
+
@@ -0,0 +1,64 @@
+import hashlib
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from utils.acoustic_frames import CondensedSpeech, FrameAnalysis, analyze_frames, condense_speech
+from utils.audio_fingerprint import audio_fingerprint
+from utils.audio_normalizer import SAMPLE_RATE, decode_audio_bytes, decode_audio_file
+
+
+@dataclass(frozen=True)
+class AudioClip:
+    """
+    One decoded speaking answer, created once per request and shared by
+    trimming, Whisper (which accepts float32 arrays) and feature extraction.
+    `frames` holds the frame analysis (incl. speech intervals) once computed,
+    so VAD for Whisper and the pause statistics use the same intervals.
+    `fingerprint` is its perceptual fingerprint, used to find cached results of the
+    same answer uploaded in another encoding.
+    """
+    samples: np.ndarray
+    sample_rate: int
+    audio_hash: str
+    frames: FrameAnalysis | None = None
+    fingerprint: np.ndarray | None = None
+
+    @property
+    def duration(self) -> float:
+        return self.samples.size / float(self.sample_rate) if self.sample_rate else 0.0
+
+    @classmethod
+    def from_bytes(cls, audio_bytes: bytes, audio_hash: str | None = None, max_seconds: float | None = None) -> "AudioClip":
+        return cls(
+            samples=decode_audio_bytes(audio_bytes, SAMPLE_RATE, max_seconds),
+            sample_rate=SAMPLE_RATE,
+            audio_hash=audio_hash or hashlib.sha256(audio_bytes).hexdigest(),
+        )
+
+    @classmethod
+    def from_file(cls, path: str, audio_hash: str, max_seconds: float | None = None) -> "AudioClip":
+        return cls(samples=decode_audio_file(path, SAMPLE_RATE, max_seconds), sample_rate=SAMPLE_RATE, audio_hash=audio_hash)
+
+    def trimmed(self, max_seconds: float) -> "AudioClip":
+        """Return a clip capped at max_seconds (a view, no copy); self if already short enough."""
+        max_samples = int(max_seconds * self.sample_rate)
+        if self.samples.size <= max_samples:
+            return self
+        return AudioClip(self.samples[:max_samples], self.sample_rate, self.audio_hash)
+
+    def with_fingerprint(self) -> "AudioClip":
+        if self.fingerprint is not None:
+            return self
+        return replace(self, fingerprint=audio_fingerprint(self.samples, self.sample_rate))
+
+    def with_frames(self, top_db: float = 25) -> "AudioClip":
+        """Return a copy carrying its frame analysis (computed once; the STFT matrix is not kept)."""
+        if self.frames is not None:
+            return self
+        return replace(self, frames=analyze_frames(self.samples, self.sample_rate, top_db=top_db, keep_magnitude=False))
+
+    def speech_only(self) -> CondensedSpeech:
+        """The voiced intervals joined with short gaps, for transcription."""
+        frames = self.frames or self.with_frames().frames
+        return condense_speech(self.samples, frames.intervals, self.sample_rate)
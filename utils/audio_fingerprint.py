@@ -0,0 +1,145 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+# Perceptual fingerprint of a decoded 16 kHz clip, used to recognise the same answer
+# after it was re-encoded (other container/codec, browser re-upload). Each frame gives
+# FINGERPRINT_BANDS - 1 bits: whether a band holds more energy than the band above it.
+# Gain changes and codecs flip few bits (10-16% after Opus/MP3/AAC round trips);
+# different recordings disagree on 40-50%. Only frames voiced in both clips are compared.
+FINGERPRINT_FRAME = 2048
+FINGERPRINT_HOP = 512
+FINGERPRINT_BANDS = 17
+FINGERPRINT_MIN_HZ = 300.0
+FINGERPRINT_MAX_HZ = 4000.0
+
+# Largest bit error rate still treated as the same recording
+AUDIO_FINGERPRINT_MAX_BER = float(os.getenv("AUDIO_FINGERPRINT_MAX_BER", "0.25"))
+AUDIO_FINGERPRINT_MAX_ENTRIES = int(os.getenv("AUDIO_FINGERPRINT_MAX_ENTRIES", "2048"))
+# Frames quieter than this (relative to the loudest) are pauses: their bits are noise
+_VOICED_DB = -35.0
+# Codec priming/padding shifts the signal by up to ~0.25 s; frames searched either way
+_MAX_SHIFT_FRAMES = 8
+_MAX_DURATION_DIFF_FRAMES = 16
+_MIN_FRAMES = 16
+
+_INDEX = None
+
+
+def audio_fingerprint(samples: np.ndarray, sample_rate: int = 16000) -> np.ndarray:
+    """
+    (n_frames, FINGERPRINT_BANDS) boolean fingerprint of a mono signal: FINGERPRINT_BANDS - 1
+    band-comparison bits plus a last column flagging voiced frames.
+    Clips shorter than one frame give an empty fingerprint.
+    """
+    y = np.asarray(samples, dtype=np.float32)
+    if y.size < FINGERPRINT_FRAME:
+        return np.zeros((0, FINGERPRINT_BANDS), dtype=bool)
+
+    n_frames = 1 + (y.size - FINGERPRINT_FRAME) // FINGERPRINT_HOP
+    frames = np.lib.stride_tricks.as_strided(
+        y,
+        shape=(n_frames, FINGERPRINT_FRAME),
+        strides=(y.strides[0] * FINGERPRINT_HOP, y.strides[0]),
+        writeable=False,
+    )
+    power = np.abs(np.fft.rfft(frames * np.hanning(FINGERPRINT_FRAME).astype(np.float32), axis=1)) ** 2
+
+    freqs = np.fft.rfftfreq(FINGERPRINT_FRAME, 1.0 / sample_rate)
+    edges = np.geomspace(FINGERPRINT_MIN_HZ, min(FINGERPRINT_MAX_HZ, sample_rate / 2.0), FINGERPRINT_BANDS + 1)
+    bins = np.searchsorted(freqs, edges)
+    # Sum of power per band via one cumulative sum over the frequency axis
+    cumulative = np.concatenate([np.zeros((n_frames, 1)), np.cumsum(power, axis=1)], axis=1)
+    energy = cumulative[:, bins[1:]] - cumulative[:, bins[:-1]]
+
+    frame_power = np.einsum("ij,ij->i", frames, frames, dtype=np.float64)
+    voiced = frame_power > frame_power.max() * 10.0 ** (_VOICED_DB / 10.0)
+
+    return np.column_stack([energy[:, :-1] > energy[:, 1:], voiced])
+
+
+def bit_error_rate(a: np.ndarray, b: np.ndarray, max_shift: int = _MAX_SHIFT_FRAMES) -> float:
+    """
+    Lowest fraction of differing bits over the frames voiced in both fingerprints,
+    allowing a small frame shift. 1.0 when they share too few voiced frames.
+    """
+    best = 1.0
+    for shift in range(-max_shift, max_shift + 1):
+        x = a[max(0, shift):]
+        z = b[max(0, -shift):]
+        n = min(len(x), len(z))
+        both_voiced = x[:n, -1] & z[:n, -1]
+        if np.count_nonzero(both_voiced) < _MIN_FRAMES:
+            continue
+        best = min(best, float(np.mean(x[:n, :-1][both_voiced] != z[:n, :-1][both_voiced])))
+    return best
+
+
+class FingerprintIndex:
+    """
+    Bounded LRU map from perceptual fingerprint to the exact audio hash whose results
+    are cached. A lookup only compares fingerprints of recordings of about the same length.
+    """
+
+    def __init__(self, max_entries: int = AUDIO_FINGERPRINT_MAX_ENTRIES, max_ber: float = AUDIO_FINGERPRINT_MAX_BER):
+        self.max_entries = max(1, int(max_entries))
+        self.max_ber = max_ber
+        self._entries = OrderedDict()  # audio_hash -> (packed fingerprint, n_frames)
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "matches": 0, "adds": 0, "evictions": 0}
+
+    def add(self, audio_hash: str, fingerprint: np.ndarray):
+        if len(fingerprint) < _MIN_FRAMES:
+            return
+        with self._lock:
+            self._entries.pop(audio_hash, None)
+            self._entries[audio_hash] = (np.packbits(fingerprint, axis=1), len(fingerprint))
+            self._stats["adds"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def match(self, fingerprint: np.ndarray, exclude: str | None = None):
+        """Return (audio_hash, bit_error_rate) of the closest stored recording within tolerance, else None."""
+        if len(fingerprint) < _MIN_FRAMES:
+            return None
+        n_bits = fingerprint.shape[1]
+        with self._lock:
+            self._stats["lookups"] += 1
+            candidates = [
+                (audio_hash, packed)
+                for audio_hash, (packed, n_frames) in self._entries.items()
+                if audio_hash != exclude and abs(n_frames - len(fingerprint)) <= _MAX_DURATION_DIFF_FRAMES
+            ]
+
+        best = None
+        for audio_hash, packed in candidates:
+            ber = bit_error_rate(fingerprint, np.unpackbits(packed, axis=1, count=n_bits).astype(bool))
+            if ber <= self.max_ber and (best is None or ber < best[1]):
+                best = (audio_hash, ber)
+
+        if best is not None:
+            with self._lock:
+                if best[0] in self._entries:
+                    self._entries.move_to_end(best[0])
+                self._stats["matches"] += 1
+        return best
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "max_entries": self.max_entries, "max_ber": self.max_ber}
+
+
+def get_fingerprint_index() -> FingerprintIndex:
+    """The process-wide index shared by the speaking endpoints."""
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = FingerprintIndex()
+    return _INDEX
+
+
+def fingerprint_index_stats() -> dict:
+    return get_fingerprint_index().stats()
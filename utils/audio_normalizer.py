@@ -1,20 +1,90 @@
+import os
+import re
 import subprocess
 import tempfile
-from pathlib import Path
 
-def normalize_to_wav(upload_file):
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as src:
-        src.write(upload_file.file.read())
-        src_path = src.name
+import numpy as np
 
-    dst_path = Path(src_path).with_suffix(".wav")
+SAMPLE_RATE = 16000
 
-    subprocess.run([
-        "ffmpeg", "-y",
-        "-i", src_path,
-        "-ar", "16000",
+_DURATION_RE = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+
+
+class AudioDecodeError(RuntimeError):
+    """ffmpeg could not decode the uploaded audio."""
+
+
+def _ffmpeg_decode(source: str, stdin_bytes: bytes | None, sample_rate: int, max_seconds: float | None = None) -> np.ndarray:
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+    if stdin_bytes is None:
+        cmd.append("-nostdin")
+    cmd += ["-i", source]
+    if max_seconds:
+        cmd += ["-t", str(max_seconds)]
+    cmd += [
+        "-f", "f32le",
+        "-acodec", "pcm_f32le",
         "-ac", "1",
-        str(dst_path)
-    ], check=True)
+        "-ar", str(sample_rate),
+        "pipe:1",
+    ]
+
+    proc = subprocess.run(
+        cmd,
+        input=stdin_bytes,
+        stdin=subprocess.DEVNULL if stdin_bytes is None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if proc.returncode != 0 or not proc.stdout:
+        raise AudioDecodeError(proc.stderr.decode("utf-8", errors="ignore").strip()[-300:] or "empty output")
+
+    # Copy so the array is writable (torch.from_numpy warns on read-only buffers)
+    return np.frombuffer(proc.stdout, dtype=np.float32).copy()
+
+
+def decode_audio_bytes(audio_bytes: bytes, sample_rate: int = SAMPLE_RATE, max_seconds: float | None = None) -> np.ndarray:
+    """
+    Decode an upload to mono float32 samples at `sample_rate`, piping bytes through
+    ffmpeg stdin/stdout so nothing is written to disk. max_seconds stops decoding early.
+
+    Containers that need seeking (e.g. MP4/M4A with the moov atom at the end) cannot be
+    read from a pipe; those fall back to a private temporary directory that is always removed.
+    """
+    try:
+        return _ffmpeg_decode("pipe:0", audio_bytes, sample_rate, max_seconds)
+    except AudioDecodeError as pipe_error:
+        with tempfile.TemporaryDirectory(prefix="ielts_audio_") as tmp_dir:
+            src_path = os.path.join(tmp_dir, "upload")
+            with open(src_path, "wb") as src:
+                src.write(audio_bytes)
+            try:
+                return _ffmpeg_decode(src_path, None, sample_rate, max_seconds)
+            except AudioDecodeError as file_error:
+                raise AudioDecodeError(f"{file_error} (pipe decode: {pipe_error})") from file_error
+
+
+def decode_audio_file(path: str, sample_rate: int = SAMPLE_RATE, max_seconds: float | None = None) -> np.ndarray:
+    """Like decode_audio_bytes for an upload already on disk; ffmpeg reads (and seeks) the file itself."""
+    return _ffmpeg_decode(path, None, sample_rate, max_seconds)
+
+
+def probe_duration(path: str) -> float | None:
+    """
+    Container-declared duration in seconds, read from the file header (`ffmpeg -i` without
+    an output only parses the input). None when the container does not declare one
+    (e.g. MediaRecorder WebM) or ffmpeg fails.
+    """
+    try:
+        proc = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-nostdin", "-i", path],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=10,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    match = _DURATION_RE.search(proc.stderr.decode("utf-8", errors="ignore"))
+    if match is None:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
 
-    return str(dst_path)
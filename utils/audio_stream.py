@@ -0,0 +1,205 @@
+import asyncio
+import os
+
+import numpy as np
+
+from utils.audio_normalizer import SAMPLE_RATE, AudioDecodeError
+
+
+# Formats a streaming client may declare in its "start" message. Raw PCM is
+# converted in-process; anything else (MediaRecorder webm/ogg chunks) is piped
+# through one long-lived ffmpeg process per session.
+PCM_FORMATS = {"pcm_s16le": np.int16, "pcm_f32le": np.float32}
+
+# Energy VAD: a frame is speech when it is within VAD_TOP_DB of the loudest frame
+# so far (same idea as librosa.effects.split(top_db=25)) and above an absolute floor.
+VAD_FRAME_SECONDS = 0.03
+VAD_TOP_DB = float(os.getenv("STREAM_VAD_TOP_DB", "30"))
+VAD_FLOOR_DB = -55.0
+VAD_MIN_SILENCE_SECONDS = float(os.getenv("STREAM_VAD_MIN_SILENCE", "0.6"))
+VAD_MIN_SPEECH_SECONDS = 0.3
+VAD_MAX_SEGMENT_SECONDS = 25.0
+VAD_PAD_SECONDS = 0.15
+
+
+class StreamDecoder:
+    """
+    Incremental decoder for one streaming session. feed() takes container or PCM
+    bytes as they arrive; decoded mono float32 samples at SAMPLE_RATE are passed to
+    on_samples as soon as they are available. close() flushes everything.
+    """
+
+    def __init__(self, audio_format: str, on_samples):
+        self.audio_format = (audio_format or "webm").lower()
+        self.on_samples = on_samples
+        self._pending = b""
+        self._proc = None
+        self._reader = None
+        self._stderr = b""
+
+    async def start(self):
+        if self.audio_format in PCM_FORMATS:
+            return
+        self._proc = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+            "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        self._reader = asyncio.create_task(self._read_ffmpeg())
+
+    async def _read_ffmpeg(self):
+        while True:
+            data = await self._proc.stdout.read(64 * 1024)
+            if not data:
+                break
+            self._emit(data, np.float32)
+
+    def _emit(self, data: bytes, dtype):
+        data = self._pending + data
+        width = np.dtype(dtype).itemsize
+        usable = len(data) - len(data) % width
+        self._pending = data[usable:]
+        if not usable:
+            return
+        samples = np.frombuffer(data[:usable], dtype=dtype)
+        if dtype == np.int16:
+            samples = samples.astype(np.float32) / 32768.0
+        self.on_samples(np.asarray(samples, dtype=np.float32))
+
+    async def feed(self, chunk: bytes):
+        if self.audio_format in PCM_FORMATS:
+            self._emit(chunk, PCM_FORMATS[self.audio_format])
+            return
+        try:
+            self._proc.stdin.write(chunk)
+            await self._proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as exc:
+            raise AudioDecodeError(await self._error_text() or str(exc)) from exc
+
+    async def close(self):
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        await self._reader
+        returncode = await self._proc.wait()
+        if returncode != 0:
+            raise AudioDecodeError(await self._error_text() or f"ffmpeg exited with {returncode}")
+
+    async def abort(self):
+        """Stop ffmpeg without flushing (client went away)."""
+        if self._proc is not None and self._proc.returncode is None:
+            self._proc.kill()
+            await self._proc.wait()
+        if self._reader is not None:
+            self._reader.cancel()
+
+    async def _error_text(self) -> str:
+        if self._proc is not None and self._proc.stderr is not None and not self._stderr:
+            self._stderr = await self._proc.stderr.read()
+        return self._stderr.decode("utf-8", errors="ignore").strip()[-300:]
+
+
+class StreamSegmenter:
+    """
+    Collects the samples of one streamed answer and cuts them into speech segments
+    at pauses, so each finished segment can be transcribed while the candidate is
+    still speaking. Also keeps running speech / pause statistics.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.frame = max(1, int(VAD_FRAME_SECONDS * sample_rate))
+        self._buffer = np.zeros(30 * sample_rate, dtype=np.float32)  # grows by doubling
+        self._size = 0
+        self._analysed = 0          # samples already classified into frames
+        self._peak_db = VAD_FLOOR_DB
+        self._segment_start = None  # first voiced sample of the open segment
+        self._last_voiced = None    # end of the last voiced frame of the open segment
+        self._last_segment_end = 0
+        self.speech_seconds = 0.0
+        self.pauses = []            # silences between segments, in seconds
+
+    @property
+    def duration(self) -> float:
+        return self._size / float(self.sample_rate)
+
+    def samples(self) -> np.ndarray:
+        """Everything received so far (a view; copy before keeping it past the next push)."""
+        return self._buffer[:self._size]
+
+    def push(self, samples: np.ndarray) -> list:
+        """Add samples; return the (start, end) sample ranges of segments finished by them."""
+        if samples.size:
+            needed = self._size + samples.size
+            if needed > self._buffer.size:
+                grown = np.zeros(max(needed, 2 * self._buffer.size), dtype=np.float32)
+                grown[:self._size] = self._buffer[:self._size]
+                self._buffer = grown
+            self._buffer[self._size:needed] = samples
+            self._size = needed
+
+        n_frames = (self._size - self._analysed) // self.frame
+        if n_frames <= 0:
+            return []
+
+        audio = self.samples()
+        frames = audio[self._analysed:self._analysed + n_frames * self.frame].reshape(n_frames, self.frame)
+        db = 10.0 * np.log10(np.maximum(1e-10, np.mean(np.square(frames, dtype=np.float64), axis=1)))
+
+        finished = []
+        for i, frame_db in enumerate(db):
+            frame_start = self._analysed + i * self.frame
+            self._peak_db = max(self._peak_db, float(frame_db))
+            voiced = frame_db > max(VAD_FLOOR_DB, self._peak_db - VAD_TOP_DB)
+
+            if voiced:
+                if self._segment_start is None:
+                    self._segment_start = frame_start
+                self._last_voiced = frame_start + self.frame
+            elif self._segment_start is not None:
+                silence = (frame_start + self.frame - self._last_voiced) / self.sample_rate
+                if silence >= VAD_MIN_SILENCE_SECONDS:
+                    finished.extend(self._close_segment())
+
+            if self._segment_start is not None and \
+                    (frame_start + self.frame - self._segment_start) / self.sample_rate >= VAD_MAX_SEGMENT_SECONDS:
+                self._last_voiced = frame_start + self.frame
+                finished.extend(self._close_segment())
+
+        self._analysed += n_frames * self.frame
+        return finished
+
+    def finish(self) -> list:
+        """End of stream: return the open segment, if any."""
+        self.push(np.zeros(0, dtype=np.float32))
+        return self._close_segment()
+
+    def _close_segment(self) -> list:
+        start, end = self._segment_start, self._last_voiced
+        self._segment_start = self._last_voiced = None
+        if start is None or (end - start) / self.sample_rate < VAD_MIN_SPEECH_SECONDS:
+            return []
+
+        pad = int(VAD_PAD_SECONDS * self.sample_rate)
+        start = max(self._last_segment_end, start - pad)
+        end = min(self._size, end + pad)
+        if self._last_segment_end:
+            self.pauses.append(round((start - self._last_segment_end) / self.sample_rate, 3))
+        self._last_segment_end = end
+        self.speech_seconds += (end - start) / self.sample_rate
+        return [(start, end)]
+
+    def stats(self) -> dict:
+        return {
+            "duration_sec": round(self.duration, 3),
+            "speech_sec": round(self.speech_seconds, 3),
+            "pause_count": len(self.pauses),
+            "avg_pause_duration": round(sum(self.pauses) / len(self.pauses), 3) if self.pauses else 0.0,
+        }
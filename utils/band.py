@@ -1,3 +1,6 @@
+import numpy as np
+
+
 # =========================
 # IELTS ACADEMIC READING 
 # =========================
@@ -108,8 +111,92 @@ def listening_band_from_correct(correct: int) -> float:
         return 2.0
 
 
+# =========================
+# BULK LOOKUP (READING / LISTENING)
+# =========================
+# Band for every raw score 0..40 plus one entry for anything above 40, so whole
+# arrays of totals map to bands with a single indexing operation.
+MAX_OBJECTIVE_SCORE = 40
+ACADEMIC_READING_BANDS = np.array([band_from_correct(n) for n in range(MAX_OBJECTIVE_SCORE + 2)])
+GENERAL_READING_BANDS = np.array([general_reading_band(n) for n in range(MAX_OBJECTIVE_SCORE + 2)])
+LISTENING_BANDS = np.array([listening_band_from_correct(n) for n in range(MAX_OBJECTIVE_SCORE + 2)])
+
+
+def bands_from_totals(totals: np.ndarray, table: np.ndarray) -> np.ndarray:
+    """Vectorised equivalent of the *_band_from_correct functions above."""
+    return table[np.clip(totals, 0, table.size - 1)]
+
+
 # =========================
 # COMMON (WRITING / SPEAKING)
 # =========================
 def round_band(band: float) -> float:
-    return round(band * 2) / 2
\ No newline at end of file
+    return round(band * 2) / 2
+
+# =========================
+# IELTS SPEAKING (PART-WISE ATTEMPTS)
+# =========================
+SPEAKING_CRITERIA = ("fluency", "lexical", "grammar", "pronunciation")
+SPEAKING_PART_WEIGHTS = {1: 0.25, 2: 0.35, 3: 0.40}  # same weighting as apply_ielts_part_weighting
+SPEAKING_PROVISIONAL_MIN_PARTS = 2
+
+
+def speaking_part_scores(result: dict) -> dict:
+    """The four criterion scores of one part result (5 where missing or invalid)."""
+    scores = {}
+    for criterion in SPEAKING_CRITERIA:
+        try:
+            scores[criterion] = float(result.get(criterion, 5))
+        except (TypeError, ValueError):
+            scores[criterion] = 5.0
+    return scores
+
+
+def add_speaking_part(aggregate: dict | None, part: int, result: dict) -> dict:
+    """
+    Fold one part result into a running aggregate:
+    {"parts": {"1": scores, ...}, "weight": summed part weight, "totals": {criterion: weighted sum}}.
+    A re-submitted part replaces its earlier scores. Keys are strings so the
+    aggregate round-trips through JSON unchanged.
+    """
+    parts = dict((aggregate or {}).get("parts", {}))
+    if int(part) in SPEAKING_PART_WEIGHTS:
+        parts[str(int(part))] = speaking_part_scores(result)
+
+    weight = sum(SPEAKING_PART_WEIGHTS[int(p)] for p in parts)
+    totals = {
+        criterion: sum(SPEAKING_PART_WEIGHTS[int(p)] * scores[criterion] for p, scores in parts.items())
+        for criterion in SPEAKING_CRITERIA
+    }
+    return {"parts": parts, "weight": weight, "totals": totals}
+
+
+def speaking_band_from_aggregate(aggregate: dict | None) -> dict:
+    """
+    Per-criterion bands and the overall band of the parts received so far. Part
+    weights are renormalised over those parts, so with all three parts this equals
+    the weighted 25/35/40 band; the band is only reported once
+    SPEAKING_PROVISIONAL_MIN_PARTS parts are in.
+    """
+    aggregate = aggregate or {}
+    received = sorted(int(p) for p in aggregate.get("parts", {}))
+    weight = aggregate.get("weight", 0)
+    if not weight:
+        return {"parts_received": received, "complete": False, "criteria": {}, "band": None}
+
+    criteria = {criterion: total / weight for criterion, total in aggregate["totals"].items()}
+    band = round_band(sum(criteria.values()) / len(criteria))
+    return {
+        "parts_received": received,
+        "complete": received == sorted(SPEAKING_PART_WEIGHTS),
+        "criteria": {criterion: round_band(value) for criterion, value in criteria.items()},
+        "band": band if len(received) >= SPEAKING_PROVISIONAL_MIN_PARTS else None,
+    }
+
+
+def calculate_final_speaking_band(parts: dict) -> float:
+    """Weighted speaking band from {part: result} for parts 1-3."""
+    aggregate = None
+    for part, result in parts.items():
+        aggregate = add_speaking_part(aggregate, part, result)
+    return speaking_band_from_aggregate(aggregate)["band"]
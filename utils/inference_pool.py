@@ -0,0 +1,208 @@
+import asyncio
+import functools
+import importlib
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+
+from utils.whisper_registry import warm_up_whisper, whisper_model_stats
+
+
+# Dedicated worker pool for CPU-bound speaking work (ffmpeg, Whisper, librosa).
+# Async handlers await run_inference() so the event loop keeps serving other
+# requests (including /health) while audio is being processed.
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+INFERENCE_TORCH_THREADS = int(os.getenv("INFERENCE_TORCH_THREADS", "2"))
+INFERENCE_MAX_PENDING = int(os.getenv("INFERENCE_MAX_PENDING", "8"))
+INFERENCE_PRELOAD = [
+    m.strip() for m in os.getenv("INFERENCE_PRELOAD", "evaluators.speaking_audio").split(",") if m.strip()
+]
+
+
+class InferencePoolBusy(RuntimeError):
+    """Raised when the pool already holds INFERENCE_MAX_PENDING admitted requests."""
+
+
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+_WORKER_MODELS = {}  # worker pid -> whisper_model_stats() reported after warm-up
+_WORKER_REPORTS = None  # multiprocessing queue the worker initializers report on
+_STATS_LOCK = threading.Lock()
+_STATS = {
+    "admitted": 0,
+    "rejected": 0,
+    "active_requests": 0,
+    "submitted": 0,
+    "completed": 0,
+    "failed": 0,
+    "pending_tasks": 0,
+    "max_pending_tasks": 0,
+    "total_task_seconds": 0.0,
+}
+
+
+def _init_worker(torch_threads: int, preload: list, reports=None):
+    """
+    Runs once in every worker process before it accepts tasks:
+    pins torch/BLAS thread counts, imports the speaking modules and loads Whisper,
+    then reports the loaded model on `reports`.
+    """
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(torch_threads)
+
+    try:
+        import torch  # type: ignore
+
+        torch.set_num_threads(torch_threads)
+        torch.set_num_interop_threads(1)
+    except (ImportError, RuntimeError):
+        pass
+
+    start = time.time()
+    for module_name in preload:
+        importlib.import_module(module_name)
+    warm_up_whisper()
+    if reports is not None:
+        reports.put({"pid": os.getpid(), "whisper": whisper_model_stats()})
+
+    print({
+        "event": "inference_worker_ready",
+        "pid": os.getpid(),
+        "torch_threads": torch_threads,
+        "preload_seconds": round(time.time() - start, 3),
+    })
+
+
+def _collect_worker_reports():
+    while _WORKER_REPORTS is not None:
+        try:
+            info = _WORKER_REPORTS.get_nowait()
+        except (queue.Empty, OSError, ValueError):
+            break
+        _WORKER_MODELS[info["pid"]] = info["whisper"]
+
+
+def get_inference_executor():
+    """
+    Return the shared process pool, creating it on first use.
+    Returns None when INFERENCE_WORKERS=0 (work then runs on the default thread pool).
+    """
+    global _EXECUTOR, _WORKER_REPORTS
+
+    if INFERENCE_WORKERS <= 0:
+        return None
+
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            # spawn: never fork a parent that already holds torch/OpenMP threads
+            context = multiprocessing.get_context("spawn")
+            _WORKER_MODELS.clear()  # workers of a previous (broken) pool
+            _WORKER_REPORTS = context.Queue()
+            _EXECUTOR = ProcessPoolExecutor(
+                max_workers=INFERENCE_WORKERS,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(INFERENCE_TORCH_THREADS, INFERENCE_PRELOAD, _WORKER_REPORTS),
+            )
+        return _EXECUTOR
+
+
+def start_inference_pool():
+    """
+    Spawn every worker up front so the model is loaded before the first upload.
+    Does not block: workers finish preloading in the background.
+    """
+    executor = get_inference_executor()
+    if executor is None:
+        return
+    # Each submission finding no idle worker spawns one; the workers report their
+    # model from _init_worker, whichever of them ends up running these tasks
+    for _ in range(INFERENCE_WORKERS):
+        executor.submit(os.getpid)
+
+
+def shutdown_inference_pool():
+    global _EXECUTOR
+
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+            _EXECUTOR = None
+
+
+@asynccontextmanager
+async def inference_admission():
+    """
+    Bounded admission for one request's worth of inference work.
+    Raises InferencePoolBusy instead of letting the queue grow without limit.
+    """
+    with _STATS_LOCK:
+        if _STATS["active_requests"] >= INFERENCE_MAX_PENDING:
+            _STATS["rejected"] += 1
+            raise InferencePoolBusy(
+                f"Inference pool is at capacity ({INFERENCE_MAX_PENDING} requests in progress)"
+            )
+        _STATS["active_requests"] += 1
+        _STATS["admitted"] += 1
+
+    try:
+        yield
+    finally:
+        with _STATS_LOCK:
+            _STATS["active_requests"] -= 1
+
+
+async def run_inference(func, *args, **kwargs):
+    """
+    Run a picklable, module-level function on the inference pool and await its result.
+    """
+    global _EXECUTOR
+
+    loop = asyncio.get_running_loop()
+    executor = get_inference_executor()
+    call = functools.partial(func, *args, **kwargs)
+
+    with _STATS_LOCK:
+        _STATS["submitted"] += 1
+        _STATS["pending_tasks"] += 1
+        _STATS["max_pending_tasks"] = max(_STATS["max_pending_tasks"], _STATS["pending_tasks"])
+
+    start = time.time()
+    ok = False
+    try:
+        result = await loop.run_in_executor(executor, call)
+        ok = True
+        return result
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM while decoding); drop the pool so the next call rebuilds it.
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is executor:
+                _EXECUTOR = None
+        raise
+    finally:
+        with _STATS_LOCK:
+            _STATS["pending_tasks"] -= 1
+            _STATS["completed" if ok else "failed"] += 1
+            _STATS["total_task_seconds"] += time.time() - start
+
+
+def inference_pool_stats() -> dict:
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+
+    finished = stats["completed"] + stats["failed"]
+    stats["avg_task_seconds"] = round(stats.pop("total_task_seconds") / finished, 3) if finished else 0.0
+    # Tasks beyond the worker count are waiting in the executor queue
+    stats["queued_tasks"] = max(0, stats["pending_tasks"] - max(INFERENCE_WORKERS, 1))
+    stats["workers"] = INFERENCE_WORKERS
+    stats["torch_threads"] = INFERENCE_TORCH_THREADS
+    stats["max_pending_requests"] = INFERENCE_MAX_PENDING
+    # Workers load their own model; with INFERENCE_WORKERS=0 it lives in this process
+    _collect_worker_reports()
+    stats["worker_models"] = list(_WORKER_MODELS.values()) if INFERENCE_WORKERS > 0 else [whisper_model_stats()]
+    return stats
@@ -0,0 +1,277 @@
+import asyncio
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+
+
+# Local, persistent job queue for long speaking evaluations. Jobs live in SQLite, so
+# they survive a restart: a graceful shutdown hands running jobs back at once, and jobs
+# of a worker that crashed are re-queued when their lease expires. A running job's lease
+# is renewed every JOB_LEASE_SECONDS / 3, so a slow evaluation is never run twice.
+JOB_QUEUE_DB = os.getenv("JOB_QUEUE_DB", "speaking_jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "600"))
+JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", "86400"))
+JOB_POLL_SECONDS = 0.5
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+_HANDLERS = {}  # kind -> async handler(payload) -> JSON-serialisable result
+_LOCAL = threading.local()
+_WORKER_TASKS = []
+_WAKE = None  # asyncio.Event set on enqueue so idle workers start immediately
+
+
+class JobError(RuntimeError):
+    """A job failed permanently; retrying will not help."""
+
+
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_LOCAL, "conn", None)
+    if conn is None or getattr(_LOCAL, "path", None) != JOB_QUEUE_DB:
+        conn = sqlite3.connect(JOB_QUEUE_DB, timeout=10.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, priority INTEGER NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL, payload BLOB, "
+            "result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+            "available_at REAL NOT NULL, lease_until REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, created_at)")
+        _LOCAL.conn, _LOCAL.path = conn, JOB_QUEUE_DB
+    return conn
+
+
+def _json_default(value):
+    # numpy scalars in audio metrics
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def register_job_handler(kind: str, handler):
+    _HANDLERS[kind] = handler
+
+
+def enqueue_job(kind: str, payload: dict, priority: int = 0, max_attempts: int = JOB_MAX_ATTEMPTS) -> str:
+    """Persist a job and return its id. Higher priority runs first; ties run in arrival order."""
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    _connect().execute(
+        "INSERT INTO jobs (id, kind, status, priority, max_attempts, payload, created_at, updated_at, available_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (job_id, kind, QUEUED, int(priority), max(1, int(max_attempts)),
+         sqlite3.Binary(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)), now, now, now),
+    )
+    if _WAKE is not None:
+        _WAKE.set()
+    return job_id
+
+
+def get_job(job_id: str) -> dict | None:
+    row = _connect().execute(
+        "SELECT id, kind, status, priority, attempts, max_attempts, result, error, created_at, updated_at "
+        "FROM jobs WHERE id = ?",
+        (job_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    job = dict(row)
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def claim_job(kinds=None):
+    """
+    Atomically move the best ready job to RUNNING and return (id, kind, payload, attempts),
+    or None. Jobs found out of attempts on the way are marked FAILED. Safe across
+    processes sharing the database file.
+    """
+    now = time.time()
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Jobs whose worker died (restart, crash) come back once their lease expires
+        conn.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ? AND lease_until < ?",
+            (QUEUED, now, RUNNING, now),
+        )
+        kinds = list(kinds or _HANDLERS)
+        if not kinds:
+            conn.execute("COMMIT")
+            return None
+        while True:
+            row = conn.execute(
+                f"SELECT id, kind, payload, attempts, max_attempts FROM jobs "
+                f"WHERE status = ? AND available_at <= ? AND kind IN ({','.join('?' * len(kinds))}) "
+                f"ORDER BY priority DESC, created_at LIMIT 1",
+                (QUEUED, now, *kinds),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            if row["attempts"] < row["max_attempts"]:
+                break
+            # Interrupted on its last attempt: fail it and look at the next ready job
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, payload = NULL, updated_at = ? WHERE id = ?",
+                (FAILED, "worker interrupted", now, row["id"]),
+            )
+        conn.execute(
+            "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_until = ?, updated_at = ? WHERE id = ?",
+            (RUNNING, now + JOB_LEASE_SECONDS, now, row["id"]),
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return row["id"], row["kind"], pickle.loads(row["payload"]), row["attempts"] + 1
+
+
+def complete_job(job_id: str, result):
+    now = time.time()
+    _connect().execute(
+        "UPDATE jobs SET status = ?, result = ?, error = NULL, payload = NULL, lease_until = NULL, updated_at = ? "
+        "WHERE id = ?",
+        (DONE, json.dumps(result, default=_json_default), now, job_id),
+    )
+
+
+def fail_job(job_id: str, error: str, attempts: int, retry: bool = True):
+    """Re-queue with exponential backoff, or mark FAILED when out of attempts."""
+    now = time.time()
+    conn = _connect()
+    row = conn.execute("SELECT max_attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if retry and row is not None and attempts < row["max_attempts"]:
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, available_at = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+            (QUEUED, error, now + 2 ** attempts, now, job_id),
+        )
+    else:
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, payload = NULL, lease_until = NULL, updated_at = ? WHERE id = ?",
+            (FAILED, error, now, job_id),
+        )
+
+
+def renew_lease(job_id: str):
+    now = time.time()
+    _connect().execute(
+        "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND status = ?",
+        (now + JOB_LEASE_SECONDS, now, job_id, RUNNING),
+    )
+
+
+def release_job(job_id: str):
+    _connect().execute(
+        "UPDATE jobs SET status = ?, attempts = MAX(0, attempts - 1), lease_until = NULL, updated_at = ? "
+        "WHERE id = ? AND status = ?",
+        (QUEUED, time.time(), job_id, RUNNING),
+    )
+
+
+def purge_finished_jobs(older_than: float = JOB_RESULT_TTL_SECONDS) -> int:
+    cursor = _connect().execute(
+        "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+        (DONE, FAILED, time.time() - older_than),
+    )
+    return cursor.rowcount
+
+
+def job_queue_stats() -> dict:
+    rows = _connect().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+    counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+    counts.update({row["status"]: row["n"] for row in rows})
+    return {**counts, "workers": len(_WORKER_TASKS), "db": JOB_QUEUE_DB}
+
+
+async def _keep_lease(job_id: str):
+    while True:
+        await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+        try:
+            await asyncio.to_thread(renew_lease, job_id)
+        except Exception as exc:  # keep trying: the lease still has two renewals of slack
+            print({"event": "job_lease_error", "job_id": job_id, "error": str(exc)})
+
+
+async def _run_handler(job_id: str, kind: str, payload):
+    heartbeat = asyncio.create_task(_keep_lease(job_id))
+    try:
+        return await _HANDLERS[kind](payload)
+    finally:
+        heartbeat.cancel()
+        await asyncio.gather(heartbeat, return_exceptions=True)
+
+
+async def _run_one() -> bool:
+    """Claim and run one job; returns False when nothing was ready."""
+    claimed = await asyncio.to_thread(claim_job)
+    if claimed is None:
+        return False
+
+    job_id, kind, payload, attempts = claimed
+    start = time.time()
+    print({"event": "job_start", "job_id": job_id, "kind": kind, "attempt": attempts})
+    try:
+        result = await _run_handler(job_id, kind, payload)
+    except asyncio.CancelledError:
+        # Shutting down: hand the job back without spending an attempt
+        await asyncio.to_thread(release_job, job_id)
+        raise
+    except JobError as exc:
+        await asyncio.to_thread(fail_job, job_id, str(exc), attempts, False)
+        print({"event": "job_failed", "job_id": job_id, "kind": kind, "error": str(exc), "retry": False})
+    except Exception as exc:
+        error = getattr(exc, "detail", None) or str(exc) or type(exc).__name__
+        await asyncio.to_thread(fail_job, job_id, str(error), attempts)
+        print({"event": "job_failed", "job_id": job_id, "kind": kind, "error": str(error), "attempt": attempts})
+    else:
+        await asyncio.to_thread(complete_job, job_id, result)
+        print({"event": "job_done", "job_id": job_id, "kind": kind, "seconds": round(time.time() - start, 3)})
+    return True
+
+
+async def _worker_loop():
+    while True:
+        try:
+            if await _run_one():
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # database errors: log and keep the worker alive
+            print({"event": "job_worker_error", "error": str(exc)})
+        _WAKE.clear()
+        try:
+            await asyncio.wait_for(_WAKE.wait(), timeout=JOB_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_job_workers(workers: int = JOB_WORKERS):
+    """Start the in-process job workers on the running event loop (call from the app lifespan)."""
+    global _WAKE
+
+    if workers <= 0 or _WORKER_TASKS:
+        return
+    _WAKE = asyncio.Event()
+    purge_finished_jobs()
+    for _ in range(workers):
+        _WORKER_TASKS.append(asyncio.create_task(_worker_loop()))
+
+
+async def stop_job_workers():
+    global _WAKE
+
+    for task in _WORKER_TASKS:
+        task.cancel()
+    await asyncio.gather(*_WORKER_TASKS, return_exceptions=True)
+    _WORKER_TASKS.clear()
+    _WAKE = None
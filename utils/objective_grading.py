@@ -0,0 +1,109 @@
+import os
+from itertools import chain
+
+import numpy as np
+
+from utils.answer_matching import AnswerMatcher, matching_rules
+
+# Grading of many reading / listening submissions against one answer key. Each
+# question's answers are encoded to integer codes (one per distinct answer, and answers
+# repeat heavily), its compiled matcher runs once per code, and the correctness column
+# is a NumPy gather of those results; totals, per-type errors and bands are then
+# whole-array operations. Reading the answers out of the submission dicts stays a
+# per-cell cost.
+BULK_GRADING_MAX_SUBMISSIONS = int(os.getenv("BULK_GRADING_MAX_SUBMISSIONS", "50000"))
+
+# Answer types that can share a code table: 1, 1.0 and True hash alike, so numbers do not
+_CODED_TYPES = {str, type(None)}
+
+INVALID_SUBMISSION = "user_answers must be a non-empty object"
+
+
+class _AnswerCodes(dict):
+    """answer -> integer code, assigned in order of first appearance."""
+
+    __slots__ = ()
+
+    def __missing__(self, answer):
+        code = self[answer] = len(self)
+        return code
+
+
+def submission_answers(submissions: list) -> tuple:
+    """
+    (user_answers of each bulk submission, indexes of the gradable ones). As with the
+    single-submission endpoints, a submission is graded only when it carries a non-empty
+    "user_answers" object; anything else gets an INVALID_SUBMISSION result.
+    """
+    answers = [s.get("user_answers") if isinstance(s, dict) else None for s in submissions]
+    return answers, [i for i, a in enumerate(answers) if isinstance(a, dict) and a]
+
+
+def mark_submissions(question_ids: list, matchers: list, submissions: list) -> np.ndarray:
+    """
+    (submissions, questions) bool matrix of matcher(answer); a missing answer is None, as
+    with dict.get in the single evaluators. Each column of text answers is encoded to
+    integer codes, the matcher runs once per distinct answer and the column is
+    matches[codes]; columns holding numbers, lists or dicts call the matcher per cell.
+    """
+    n, q = len(submissions), len(question_ids)
+    answers = list(chain.from_iterable(map(a.get, question_ids) for a in submissions))
+    correct = np.zeros((n, q), dtype=bool)
+    for j, matcher in enumerate(matchers):
+        column = answers[j::q]
+        codes = _AnswerCodes()
+        try:
+            column_codes = np.fromiter(map(codes.__getitem__, column), dtype=np.int32, count=n)
+        except TypeError:
+            codes = None  # unhashable answers
+        if codes is not None and set(map(type, codes)) <= _CODED_TYPES:
+            matches = np.fromiter(map(matcher, codes), dtype=bool, count=len(codes))
+            correct[:, j] = matches[column_codes]
+        else:
+            correct[:, j] = np.fromiter(map(matcher, column), dtype=bool, count=n)
+    return correct
+
+
+def grade_submissions(
+    question_ids: list,
+    key_values: list,
+    submissions: list,
+    question_types: list | None = None,
+    matchers: list | None = None,
+) -> dict:
+    """
+    Grade every submission against one key (compiled matchers, e.g. AnswerKey.matchers;
+    plain == comparison with key_values when None):
+    - correct: (submissions, questions) bool matrix
+    - totals: correct answers per submission
+    - types / type_errors: distinct question types (in question order) and a
+      (submissions, types) bool matrix of types with at least one wrong answer
+    - question_accuracy: share of submissions answering each question correctly
+    """
+    if matchers is None:
+        exact = matching_rules(exact=True)
+        matchers = [AnswerMatcher(value, rules=exact) for value in key_values]
+    correct = mark_submissions(question_ids, matchers, submissions)
+
+    types = list(dict.fromkeys(question_types or []))
+    if types:
+        type_index = np.array([types.index(t) for t in question_types])
+        membership = np.zeros((len(question_ids), len(types)), dtype=np.int32)
+        membership[np.arange(len(question_ids)), type_index] = 1
+        type_errors = (~correct).astype(np.int32) @ membership > 0
+    else:
+        type_errors = np.zeros((len(submissions), 0), dtype=bool)
+
+    return {
+        "correct": correct,
+        "totals": correct.sum(axis=1),
+        "types": types,
+        "type_errors": type_errors,
+        "question_accuracy": correct.mean(axis=0) if len(submissions) else np.zeros(len(question_ids)),
+    }
+
+
+def band_distribution(bands: np.ndarray) -> dict:
+    """{band: number of submissions}, ordered by band."""
+    values, counts = np.unique(bands, return_counts=True)
+    return {float(band): int(count) for band, count in zip(values, counts)}
@@ -0,0 +1,150 @@
+import os
+import time
+
+import numpy as np
+import scipy.fft
+
+# Frame-wise YIN (de Cheveigné & Kawahara, 2002) on voiced frames only, vectorised
+# over frames with one batched FFT. Runs at 4 kHz (plenty for a 70-400 Hz voice) and
+# analyses PITCH_FRAMES_PER_SECOND frames per second of speech (at most PITCH_MAX_FRAMES),
+# spread evenly over it: enough for range and variability statistics, and a small,
+# length-proportional fraction of feature extraction time.
+PITCH_SAMPLE_RATE = 4000
+PITCH_FMIN = 70.0
+PITCH_FMAX = 400.0
+PITCH_WINDOW = 128           # YIN integration window (32 ms at 4 kHz)
+PITCH_HOP = 80               # 20 ms between candidate frames at 4 kHz
+PITCH_THRESHOLD = 0.15       # CMNDF dip that counts as periodic
+PITCH_FRAMES_PER_SECOND = float(os.getenv("PITCH_FRAMES_PER_SECOND", "2.5"))
+PITCH_MAX_FRAMES = int(os.getenv("PITCH_MAX_FRAMES", "400"))
+PITCH_BUDGET_MS = float(os.getenv("PITCH_BUDGET_MS", "10"))
+_BATCH = 100
+
+
+def _gather_frames(y: np.ndarray, factor: int, starts: np.ndarray, frame_length: int) -> np.ndarray:
+    """
+    (len(starts), frame_length) mean-removed frames decimated by `factor` straight from `y`,
+    with a box pre-filter (enough anti-aliasing for pitch); only the analysed frames are touched.
+    """
+    index = (starts[:, None] + np.arange(frame_length)) * factor
+    frames = y[index]
+    for k in range(1, factor):
+        frames += y[index + k]
+    if factor > 1:
+        frames /= factor
+    return frames - frames.mean(axis=1, keepdims=True)
+
+
+def _frame_starts(intervals: np.ndarray, factor: int, n_samples: int, frame_length: int, max_frames: int) -> np.ndarray:
+    """Start samples (decimated timeline) of candidate frames inside the voiced intervals."""
+    starts = []
+    for start, end in (intervals // factor).tolist():
+        last = min(end, n_samples) - frame_length
+        if last >= start:
+            starts.append(np.arange(start, last + 1, PITCH_HOP))
+    if not starts:
+        return np.empty(0, dtype=np.int64)
+    starts = np.concatenate(starts)
+    if starts.size > max_frames:
+        starts = starts[np.linspace(0, starts.size - 1, max_frames).astype(np.int64)]
+    return starts
+
+
+def _yin_batch(frames: np.ndarray, tau_min: int, tau_max: int, threshold: float) -> np.ndarray:
+    """f0 (in samples of lag, NaN where aperiodic) for each row of `frames`."""
+    n_frames, frame_length = frames.shape
+    w = PITCH_WINDOW
+    n_fft = scipy.fft.next_fast_len(frame_length, real=True)  # >= w + tau_max: no wrap-around for lags <= tau_max
+
+    # Difference function d(tau) = E(0) + E(tau) - 2 r(tau), r via one FFT cross-correlation
+    # (scipy.fft keeps float32 in float32, unlike numpy.fft)
+    spectrum = scipy.fft.rfft(frames, n_fft, axis=1)
+    head = scipy.fft.rfft(frames[:, :w], n_fft, axis=1)
+    r = scipy.fft.irfft(np.conj(head) * spectrum, n_fft, axis=1)[:, : tau_max + 1]
+    energy = np.zeros((n_frames, frame_length + 1), dtype=frames.dtype)
+    np.cumsum(frames * frames, axis=1, out=energy[:, 1:])
+    window_energy = energy[:, w:w + tau_max + 1] - energy[:, :tau_max + 1]
+    d = window_energy[:, :1] + window_energy - 2.0 * r
+    np.maximum(d, 0.0, out=d)
+    d[:, 0] = 0.0
+
+    # Cumulative mean normalised difference (d'(0) = 1)
+    lags = np.arange(tau_max + 1)
+    running = np.cumsum(d, axis=1)
+    cmndf = d * lags / np.maximum(running, 1e-12)
+    cmndf[:, 0] = 1.0
+
+    # First dip under the threshold that is a local minimum
+    band = cmndf[:, tau_min:tau_max]
+    dips = (band < threshold) & (band <= cmndf[:, tau_min + 1:tau_max + 1])
+    found = dips.any(axis=1)
+    tau = np.argmax(dips, axis=1) + tau_min
+
+    # Parabolic interpolation around the dip
+    rows = np.arange(n_frames)
+    left, mid, right = cmndf[rows, tau - 1], cmndf[rows, tau], cmndf[rows, np.minimum(tau + 1, tau_max)]
+    denom = left - 2.0 * mid + right
+    shift = np.where(np.abs(denom) > 1e-12, 0.5 * (left - right) / np.where(denom == 0, 1.0, denom), 0.0)
+    return np.where(found, tau + np.clip(shift, -1.0, 1.0), np.nan)
+
+
+def yin_pitch(
+    y: np.ndarray,
+    sr: int,
+    intervals=None,
+    frames_per_second: float | None = None,
+    max_frames: int | None = None,
+    budget_ms: float | None = None,
+) -> np.ndarray:
+    """
+    Pitch contour in Hz over the voiced intervals ((n, 2) sample ranges at `sr`,
+    e.g. FrameAnalysis.intervals; the whole signal if None). Aperiodic frames are NaN.
+    Frames are processed in batches and analysis stops once budget_ms is spent, so
+    the cost per clip is bounded even on a loaded worker.
+    """
+    frames_per_second = PITCH_FRAMES_PER_SECOND if frames_per_second is None else frames_per_second
+    max_frames = PITCH_MAX_FRAMES if max_frames is None else max_frames
+    budget_ms = PITCH_BUDGET_MS if budget_ms is None else budget_ms
+    started = time.perf_counter()
+
+    y = np.asarray(y, dtype=np.float32)
+    factor = max(1, int(round(sr / PITCH_SAMPLE_RATE)))
+    rate = sr / factor
+    n_samples = y.size // factor
+    tau_min = int(rate / PITCH_FMAX)
+    tau_max = int(np.ceil(rate / PITCH_FMIN))
+    frame_length = PITCH_WINDOW + tau_max + 1
+    if intervals is None:
+        intervals = np.array([[0, y.size]])
+    intervals = np.asarray(intervals, dtype=np.int64).reshape(-1, 2)
+    speech_seconds = float((intervals[:, 1] - intervals[:, 0]).sum()) / sr
+    max_frames = min(max_frames, int(np.ceil(speech_seconds * frames_per_second)))
+    starts = _frame_starts(intervals, factor, n_samples, frame_length, max_frames)
+    if not starts.size:
+        return np.empty(0)
+
+    contour = []
+    for first in range(0, starts.size, _BATCH):
+        frames = _gather_frames(y, factor, starts[first:first + _BATCH], frame_length)
+        contour.append(_yin_batch(frames, tau_min, tau_max, PITCH_THRESHOLD))
+        if (time.perf_counter() - started) * 1000 > budget_ms:
+            break
+    return rate / np.concatenate(contour)
+
+
+def pitch_statistics(f0: np.ndarray) -> dict:
+    """
+    Range (10th-90th percentile) and variability (standard deviation) of the voiced
+    pitch in semitones, which do not depend on the speaker's register.
+    """
+    voiced = f0[np.isfinite(f0)]
+    if voiced.size < 5:
+        return {"voiced_frames": int(voiced.size), "range_semitones": None, "variability_semitones": None}
+    semitones = np.sort(12.0 * np.log2(voiced / np.median(voiced)))
+    # np.percentile's linear interpolation, on the already sorted values (np.percentile is slow on small arrays)
+    p10, p90 = np.interp((semitones.size - 1) * np.array([0.1, 0.9]), np.arange(semitones.size), semitones)
+    return {
+        "voiced_frames": int(voiced.size),
+        "range_semitones": round(float(p90 - p10), 2),
+        "variability_semitones": round(float(semitones.std()), 2),
+    }
@@ -0,0 +1,228 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# Defaults for every named cache; a cache can override them at construction.
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "512"))
+RESULT_CACHE_MAX_MB = float(os.getenv("RESULT_CACHE_MAX_MB", "64"))
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "86400"))
+# Path of a SQLite file shared by all worker processes; empty disables the disk tier
+RESULT_CACHE_DB = os.getenv("RESULT_CACHE_DB", "").strip()
+
+# Expired rows are purged from the disk tier once every this many writes
+_DISK_PRUNE_EVERY = 200
+
+_CACHES = {}
+
+
+class ResultCache:
+    """
+    Process-local LRU cache with TTL expiry and a byte budget, optionally backed by a
+    SQLite table that every worker process on the host reads and writes.
+    - Values are pickled once on insert; the pickled size is what the budget counts
+    - get() returns a fresh copy, so callers may mutate the result
+    - Disk hits are promoted into memory
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        max_mb: float = RESULT_CACHE_MAX_MB,
+        ttl_seconds: float = RESULT_CACHE_TTL_SECONDS,
+        disk_path: str | None = RESULT_CACHE_DB,
+    ):
+        self.name = name
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path or None
+
+        self._entries = OrderedDict()  # key -> (payload bytes, stored_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk_local = threading.local()
+        self._disk_writes = 0
+        self._stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "disk_errors": 0,
+        }
+
+    # ------------------------------------------------------------
+    # Memory tier
+    # ------------------------------------------------------------
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - stored_at > self.ttl_seconds
+
+    def _drop(self, key):
+        payload, _ = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+    def _insert(self, key, payload: bytes, stored_at: float):
+        if key in self._entries:
+            self._drop(key)
+        if len(payload) > self.max_bytes:
+            return
+        self._entries[key] = (payload, stored_at)
+        self._bytes += len(payload)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self._stats["evictions"] += 1
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry[1], now):
+                    self._drop(key)
+                    self._stats["expirations"] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return pickle.loads(entry[0])
+
+        row = self._disk_get(key, now)
+        if row is None:
+            with self._lock:
+                self._stats["misses"] += 1
+            return default
+
+        payload, stored_at = row
+        with self._lock:
+            self._insert(key, payload, stored_at)
+            self._stats["disk_hits"] += 1
+        return pickle.loads(payload)
+
+    def set(self, key, value):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        with self._lock:
+            self._insert(key, payload, now)
+            self._stats["sets"] += 1
+        self._disk_set(key, payload, now)
+
+    def __contains__(self, key) -> bool:
+        """True when get() would return a value, from either tier (without loading it)."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry[1], now):
+                return True
+        return self._disk_has(key, now)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # ------------------------------------------------------------
+    # Disk tier (best effort: errors are counted, never raised)
+    # ------------------------------------------------------------
+    def _disk(self):
+        conn = getattr(self._disk_local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.disk_path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS result_cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, payload BLOB NOT NULL, "
+                "stored_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            conn.commit()
+            self._disk_local.conn = conn
+        return conn
+
+    def _disk_get(self, key, now: float):
+        if not self.disk_path:
+            return None
+        try:
+            row = self._disk().execute(
+                "SELECT payload, stored_at FROM result_cache WHERE namespace = ? AND key = ?",
+                (self.name, str(key)),
+            ).fetchone()
+        except sqlite3.Error as exc:
+            self._disk_error("get", exc)
+            return None
+        if row is None or self._expired(row[1], now):
+            return None
+        return bytes(row[0]), row[1]
+
+    def _disk_has(self, key, now: float) -> bool:
+        if not self.disk_path:
+            return False
+        try:
+            row = self._disk().execute(
+                "SELECT stored_at FROM result_cache WHERE namespace = ? AND key = ?",
+                (self.name, str(key)),
+            ).fetchone()
+        except sqlite3.Error as exc:
+            self._disk_error("has", exc)
+            return False
+        return row is not None and not self._expired(row[0], now)
+
+    def _disk_set(self, key, payload: bytes, now: float):
+        if not self.disk_path:
+            return
+        try:
+            conn = self._disk()
+            conn.execute(
+                "INSERT OR REPLACE INTO result_cache (namespace, key, payload, stored_at) VALUES (?, ?, ?, ?)",
+                (self.name, str(key), sqlite3.Binary(payload), now),
+            )
+            self._disk_writes += 1
+            if self.ttl_seconds > 0 and self._disk_writes % _DISK_PRUNE_EVERY == 0:
+                conn.execute(
+                    "DELETE FROM result_cache WHERE namespace = ? AND stored_at < ?",
+                    (self.name, now - self.ttl_seconds),
+                )
+            conn.commit()
+        except sqlite3.Error as exc:
+            self._disk_error("set", exc)
+
+    def _disk_error(self, op: str, exc: Exception):
+        with self._lock:
+            self._stats["disk_errors"] += 1
+        print({"event": "result_cache_disk_error", "cache": self.name, "op": op, "error": str(exc)})
+
+    # ------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            entries = len(self._entries)
+            size = self._bytes
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        return {
+            **stats,
+            "hit_ratio": round((stats["hits"] + stats["disk_hits"]) / lookups, 4) if lookups else None,
+            "entries": entries,
+            "bytes": size,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "disk_path": self.disk_path,
+        }
+
+
+def get_result_cache(name: str, **options) -> ResultCache:
+    """Return the process-wide cache registered under `name`, creating it on first use."""
+    cache = _CACHES.get(name)
+    if cache is None:
+        cache = _CACHES.setdefault(name, ResultCache(name, **options))
+    return cache
+
+
+def result_cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in _CACHES.items()}
@@ -0,0 +1,113 @@
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass
+
+
+# Minimal dependency-graph executor for request pipelines: every stage starts as soon
+# as the stages it needs have finished, so independent CPU (inference pool) and network
+# (GPT) stages overlap instead of running in a fixed serial order.
+
+
+class StageTimeout(asyncio.TimeoutError):
+    """A stage ran longer than its timeout and had no fallback."""
+
+
+@dataclass
+class Stage:
+    """
+    One node of a stage graph. `func` is an async callable receiving the results of
+    `needs` as keyword arguments (named after the stages). On error or timeout,
+    `fallback` (if set) is called with the same arguments and its return value is
+    used as a partial result instead of failing the graph.
+    """
+    name: str
+    func: object
+    needs: tuple = ()
+    timeout: float | None = None
+    fallback: object = None
+
+
+def _check_graph(stages: list):
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate stage names: {names}")
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        missing = [need for need in stage.needs if need not in by_name]
+        if missing:
+            raise ValueError(f"Stage {stage.name!r} needs unknown stages {missing}")
+
+    # Kahn's algorithm: anything left over is on a cycle
+    remaining = {stage.name: set(stage.needs) for stage in stages}
+    while remaining:
+        ready = [name for name, needs in remaining.items() if not needs]
+        if not ready:
+            raise ValueError(f"Stage graph has a cycle among {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for needs in remaining.values():
+            needs.difference_update(ready)
+
+
+async def run_stage_graph(stages: list, on_done=None):
+    """
+    Run `stages` concurrently in dependency order.
+    Returns (results, timings): results maps stage name -> value; timings maps stage name ->
+    {"start", "seconds", "status"} with start relative to the graph start and status one of
+    "ok", "fallback" or "timeout_fallback".
+    on_done(name, value, timing), sync or async, is called as each stage finishes.
+    The first stage that fails without a fallback cancels the rest and its exception is raised.
+    """
+    _check_graph(stages)
+    graph_start = time.perf_counter()
+    results, timings, tasks = {}, {}, {}
+
+    async def run(stage: Stage):
+        for need in stage.needs:
+            await tasks[need]
+        inputs = {need: results[need] for need in stage.needs}
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            value = await asyncio.wait_for(stage.func(**inputs), timeout=stage.timeout)
+        except asyncio.TimeoutError:
+            if stage.fallback is None:
+                raise StageTimeout(f"Stage {stage.name!r} timed out after {stage.timeout} s") from None
+            value, status = stage.fallback(**inputs), "timeout_fallback"
+        except Exception as exc:
+            if stage.fallback is None:
+                raise
+            print({"event": "stage_fallback", "stage": stage.name, "error": str(exc) or type(exc).__name__})
+            value, status = stage.fallback(**inputs), "fallback"
+        if inspect.isawaitable(value):
+            value = await value
+
+        results[stage.name] = value
+        timings[stage.name] = {
+            "start": round(started - graph_start, 4),
+            "seconds": round(time.perf_counter() - started, 4),
+            "status": status,
+        }
+        if on_done is not None:
+            done = on_done(stage.name, value, timings[stage.name])
+            if inspect.isawaitable(done):
+                await done
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.ensure_future(run(stage))
+
+    pending = set(tasks.values())
+    try:
+        while pending:
+            finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+            errors = [task.exception() for task in finished if not task.cancelled() and task.exception()]
+            if errors:
+                raise errors[0]
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    return results, timings
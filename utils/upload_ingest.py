@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+
+from utils.audio_normalizer import probe_duration
+
+
+# Uploads are read in chunks: hashed as they arrive, rejected as soon as they pass
+# UPLOAD_MAX_BYTES, and kept in memory only up to UPLOAD_SPOOL_MAX_MB; larger ones
+# go to a temporary file that ffmpeg (in the inference pool) reads directly.
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+UPLOAD_MAX_SECONDS = float(os.getenv("UPLOAD_MAX_SECONDS", "600"))
+UPLOAD_SPOOL_MAX_MB = float(os.getenv("UPLOAD_SPOOL_MAX_MB", "1"))
+UPLOAD_CHUNK_BYTES = 256 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """The upload exceeds UPLOAD_MAX_BYTES or its declared duration exceeds UPLOAD_MAX_SECONDS."""
+
+
+class IngestedUpload:
+    """
+    One upload after ingestion: its SHA-256, size, and content either in memory
+    (`path` is None) or in a temporary file. close() removes the file.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.path = None
+        self._hasher = hashlib.sha256()
+        self._buffer = bytearray()
+        self._file = None
+
+    @property
+    def sha256(self) -> str:
+        return self._hasher.hexdigest()
+
+    @property
+    def source(self) -> bytes | str:
+        """What the decoder takes: the bytes, or the path of the spooled file."""
+        return bytes(self._buffer) if self.path is None else self.path
+
+    def _write(self, chunk: bytes, spool_bytes: int):
+        self._hasher.update(chunk)
+        self.size += len(chunk)
+        if self._file is None and self.size > spool_bytes:
+            self._file = tempfile.NamedTemporaryFile(prefix="ielts_upload_", delete=False)
+            self.path = self._file.name
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._buffer += chunk
+
+    def read_bytes(self) -> bytes:
+        if self.path is None:
+            return bytes(self._buffer)
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+        self._buffer = bytearray()
+
+    def __len__(self) -> int:
+        return self.size
+
+
+async def ingest_upload(
+    upload,
+    max_bytes: int | None = None,
+    max_seconds: float | None = None,
+    spool_mb: float | None = None,
+) -> IngestedUpload:
+    """
+    Read an UploadFile (anything with an async read(n)) into an IngestedUpload.
+    Raises UploadTooLarge as soon as the size limit is passed, or when a spooled
+    file declares a duration over max_seconds; nothing is left on disk in that case.
+    Limits default to the UPLOAD_* settings.
+    """
+    max_bytes = UPLOAD_MAX_BYTES if max_bytes is None else max_bytes
+    max_seconds = UPLOAD_MAX_SECONDS if max_seconds is None else max_seconds
+    spool_bytes = int((UPLOAD_SPOOL_MAX_MB if spool_mb is None else spool_mb) * 1024 * 1024)
+    ingested = IngestedUpload()
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            if ingested.size + len(chunk) > max_bytes:
+                raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+            ingested._write(chunk, spool_bytes)
+
+        if ingested._file is not None:
+            ingested._file.close()
+            ingested._file = None
+            # Small uploads are cheap to decode; large ones are checked from the header first
+            duration = await asyncio.to_thread(probe_duration, ingested.path)
+            if duration is not None and duration > max_seconds:
+                raise UploadTooLarge(f"Audio is {duration:.0f} s long; the limit is {max_seconds:.0f} s")
+    except BaseException:
+        ingested.close()
+        raise
+    return ingested
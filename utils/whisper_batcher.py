@@ -0,0 +1,205 @@
+import asyncio
+import os
+import re
+import threading
+
+import numpy as np
+
+from utils.inference_pool import run_inference
+from utils.whisper_registry import WHISPER_WINDOW_SECONDS, split_windows, transcribe_batch
+
+
+# Micro-batching for Whisper: clips that arrive within WHISPER_BATCH_WAIT_MS of each
+# other (question-wise uploads, concurrent candidates) are transcribed by one
+# transcribe_batch() call on the inference pool. WHISPER_BATCH_SIZE=1 disables batching.
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "4"))
+WHISPER_BATCH_WAIT_MS = float(os.getenv("WHISPER_BATCH_WAIT_MS", "25"))
+
+# Speech longer than one Whisper window is cut at quiet points into chunks that are
+# transcribed in parallel on separate pool workers. Each chunk also covers the first
+# LONG_CHUNK_OVERLAP_SECONDS of the next one; the repeated words are removed when stitching.
+LONG_CHUNK_SECONDS = WHISPER_WINDOW_SECONDS - 1.0
+LONG_CHUNK_OVERLAP_SECONDS = float(os.getenv("WHISPER_CHUNK_OVERLAP_SECONDS", "1.0"))
+_STITCH_MAX_WORDS = 8
+
+_PENDING = []  # (samples, word_timestamps, future) waiting for the next batch
+_FLUSH_HANDLE = None
+_RUNNING = set()  # batch tasks, referenced so they are not garbage collected
+_STATS_LOCK = threading.Lock()
+_STATS = {
+    "batches": 0,
+    "clips": 0,
+    "max_batch_size": 0,
+    "failed_batches": 0,
+}
+
+
+async def transcribe_batched(samples, word_timestamps: bool = False):
+    """
+    Transcribe one 16 kHz float32 clip, sharing a batched Whisper pass with any
+    clips submitted around the same time. Returns the transcript, or with
+    word_timestamps a {"text", "words"} dict (see transcribe_batch).
+    """
+    global _FLUSH_HANDLE
+
+    if WHISPER_BATCH_SIZE <= 1:
+        _record_batch(1, ok=True)
+        if word_timestamps:
+            return (await run_inference(transcribe_batch, [samples], True))[0]
+        return (await run_inference(transcribe_batch, [samples]))[0]
+
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    _PENDING.append((samples, word_timestamps, future))
+
+    if len(_PENDING) >= WHISPER_BATCH_SIZE:
+        _flush()
+    elif _FLUSH_HANDLE is None:
+        _FLUSH_HANDLE = loop.call_later(WHISPER_BATCH_WAIT_MS / 1000.0, _flush)
+
+    return await future
+
+
+def _flush():
+    """Send up to WHISPER_BATCH_SIZE pending clips as one batch; reschedule any remainder."""
+    global _FLUSH_HANDLE
+
+    if _FLUSH_HANDLE is not None:
+        _FLUSH_HANDLE.cancel()
+        _FLUSH_HANDLE = None
+
+    # Skip clips whose caller has gone away (request cancelled)
+    live = [item for item in _PENDING if not item[2].done()]
+    batch = live[:WHISPER_BATCH_SIZE]
+    _PENDING[:] = live[WHISPER_BATCH_SIZE:]
+
+    if _PENDING:
+        loop = asyncio.get_running_loop()
+        if len(_PENDING) >= WHISPER_BATCH_SIZE:
+            loop.call_soon(_flush)
+        else:
+            _FLUSH_HANDLE = loop.call_later(WHISPER_BATCH_WAIT_MS / 1000.0, _flush)
+
+    if batch:
+        task = asyncio.ensure_future(_run_batch(batch))
+        _RUNNING.add(task)
+        task.add_done_callback(_RUNNING.discard)
+
+
+async def _run_batch(batch: list):
+    # Aligning words costs one extra decoder pass per window: only when a caller asked for it
+    word_timestamps = any(wants_words for _, wants_words, _ in batch)
+    clips = [samples for samples, _, _ in batch]
+    try:
+        if word_timestamps:
+            results = await run_inference(transcribe_batch, clips, True)
+        else:
+            results = await run_inference(transcribe_batch, clips)
+    except BaseException as exc:
+        # Also on cancellation (shutdown): no caller may be left waiting on its future
+        _record_batch(len(batch), ok=False)
+        for _, _, future in batch:
+            if not future.done():
+                if isinstance(exc, Exception):
+                    future.set_exception(exc)
+                else:
+                    future.cancel()
+        if not isinstance(exc, Exception):
+            raise
+        return
+
+    _record_batch(len(batch), ok=True)
+    for (_, wants_words, future), result in zip(batch, results):
+        if not future.done():
+            future.set_result(result["text"] if word_timestamps and not wants_words else result)
+
+
+async def transcribe_long(samples, sample_rate: int = 16000, word_timestamps: bool = False):
+    """
+    Transcribe a clip of any length: short clips go through the micro-batcher, longer
+    ones are split at silences and their chunks transcribed concurrently.
+    With word_timestamps, returns {"text", "words"} with word times from the clip start.
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if samples.size <= WHISPER_WINDOW_SECONDS * sample_rate:
+        return await transcribe_batched(samples, word_timestamps)
+
+    overlap = int(LONG_CHUNK_OVERLAP_SECONDS * sample_rate)
+    chunks, bounds, start = [], [], 0
+    for piece in split_windows(samples, sample_rate, window_seconds=LONG_CHUNK_SECONDS):
+        end = start + piece.size
+        chunks.append(samples[start:min(samples.size, end + overlap)])
+        bounds.append((start / sample_rate, end / sample_rate))
+        start = end
+
+    if not word_timestamps:
+        results = await asyncio.gather(*(run_inference(transcribe_batch, [chunk]) for chunk in chunks))
+        return stitch_transcripts([texts[0] for texts in results])
+
+    results = [
+        items[0] for items in
+        await asyncio.gather(*(run_inference(transcribe_batch, [chunk], True) for chunk in chunks))
+    ]
+    return {
+        "text": stitch_transcripts([result["text"] for result in results]),
+        "words": stitch_words([result["words"] for result in results], bounds),
+    }
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def stitch_transcripts(texts: list) -> str:
+    """
+    Join chunk transcripts, dropping the words at the start of each chunk that repeat
+    the end of the previous one (the overlap region was heard twice).
+    """
+    words = []
+    for text in texts:
+        incoming = text.split()
+        if words and incoming:
+            tail = [_normalize_word(w) for w in words[-_STITCH_MAX_WORDS:]]
+            head = [_normalize_word(w) for w in incoming[:_STITCH_MAX_WORDS]]
+            for size in range(min(len(tail), len(head)), 0, -1):
+                if tail[-size:] == head[:size]:
+                    incoming = incoming[size:]
+                    break
+        words.extend(incoming)
+    return " ".join(words)
+
+
+def stitch_words(chunk_words: list, bounds: list):
+    """
+    Join per-chunk word timings onto the clip timeline. bounds[i] is chunk i's
+    (start, end) in seconds without its trailing overlap; words starting inside the
+    overlap belong to the next chunk. None if any chunk has no word timings.
+    """
+    if any(words is None for words in chunk_words):
+        return None
+    stitched = []
+    for index, (words, (start, end)) in enumerate(zip(chunk_words, bounds)):
+        last = index == len(bounds) - 1
+        for word in words:
+            if last or word["start"] < end - start:
+                stitched.append({**word, "start": round(word["start"] + start, 3), "end": round(word["end"] + start, 3)})
+    return stitched
+
+
+def _record_batch(size: int, ok: bool):
+    with _STATS_LOCK:
+        _STATS["batches"] += 1
+        _STATS["clips"] += size
+        _STATS["max_batch_size"] = max(_STATS["max_batch_size"], size)
+        if not ok:
+            _STATS["failed_batches"] += 1
+
+
+def whisper_batcher_stats() -> dict:
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    stats["avg_batch_size"] = round(stats["clips"] / stats["batches"], 2) if stats["batches"] else 0.0
+    stats["pending_clips"] = len(_PENDING)
+    stats["batch_size"] = WHISPER_BATCH_SIZE
+    stats["batch_wait_ms"] = WHISPER_BATCH_WAIT_MS
+    return stats
@@ -0,0 +1,296 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+
+# One Whisper model per process, loaded on first use (or explicit warm-up).
+# Every transcription call site goes through get_whisper_model().
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "small")
+# "fp32" (default) or "int8": dynamic int8 quantisation of the Linear layers for CPU-only hosts
+WHISPER_INFERENCE_MODE = os.getenv("WHISPER_INFERENCE_MODE", "fp32").strip().lower()
+
+# Fixed decoding for IELTS answers: English only (skips language detection),
+# greedy decoding without temperature fallback, no previous-text conditioning.
+WHISPER_DECODE_OPTIONS = {
+    "language": "en",
+    "task": "transcribe",
+    "temperature": 0.0,
+    "beam_size": None,
+    "best_of": None,
+    "condition_on_previous_text": False,
+    "fp16": False,
+    "verbose": False,
+}
+
+# Whisper's fixed input window; longer clips are split (at quiet points) for batched decoding
+WHISPER_WINDOW_SECONDS = 30.0
+# Largest number of 30 s windows sent through one batched encoder/decoder pass
+WHISPER_MAX_BATCH_WINDOWS = int(os.getenv("WHISPER_MAX_BATCH_WINDOWS", "16"))
+
+_MODEL = None
+_LOAD_LOCK = threading.Lock()
+_STATS = {
+    "model_size": WHISPER_MODEL_SIZE,
+    "inference_mode": WHISPER_INFERENCE_MODE,
+    "loaded": False,
+    "pid": None,
+    "load_seconds": None,
+    "parameter_mb": None,
+    "rss_before_mb": None,
+    "rss_after_mb": None,
+    "error": None,
+}
+
+
+def _current_rss_mb():
+    """Resident set size of this process in MB (Linux only; None elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
+
+
+def _state_bytes(value) -> int:
+    if isinstance(value, (tuple, list)):
+        return sum(_state_bytes(v) for v in value)
+    if hasattr(value, "element_size"):
+        return value.numel() * value.element_size()
+    return 0
+
+
+def quantize_whisper_int8(model):
+    """
+    Apply dynamic int8 quantisation to every Linear layer of a CPU Whisper model (in place).
+    """
+    import torch
+    from whisper.model import Linear as WhisperLinear
+
+    # Whisper subclasses nn.Linear only to cast weights to the input dtype, which is a
+    # no-op in fp32; torch's dynamic quantisation only accepts the exact nn.Linear type.
+    for module in model.modules():
+        if type(module) is WhisperLinear:
+            module.__class__ = torch.nn.Linear
+
+    return torch.ao.quantization.quantize_dynamic(
+        model,
+        {torch.nn.Linear},
+        dtype=torch.qint8,
+        inplace=True,
+    )
+
+
+def _load_model():
+    import whisper
+
+    if WHISPER_INFERENCE_MODE not in ("fp32", "int8"):
+        raise ValueError(f"Unsupported WHISPER_INFERENCE_MODE: {WHISPER_INFERENCE_MODE}")
+
+    rss_before = _current_rss_mb()
+    start = time.time()
+    model = whisper.load_model(WHISPER_MODEL_SIZE, device="cpu")
+    if WHISPER_INFERENCE_MODE == "int8":
+        model = quantize_whisper_int8(model)
+    load_seconds = round(time.time() - start, 3)
+
+    # Quantised weights live in packed params rather than parameters(), so count the state dict
+    parameter_bytes = sum(_state_bytes(v) for v in model.state_dict().values())
+    _STATS.update({
+        "loaded": True,
+        "pid": os.getpid(),
+        "load_seconds": load_seconds,
+        "parameter_mb": round(parameter_bytes / (1024 * 1024), 1),
+        "rss_before_mb": rss_before,
+        "rss_after_mb": _current_rss_mb(),
+        "error": None,
+    })
+    print({"event": "whisper_loaded", **_STATS})
+    return model
+
+
+def get_whisper_model():
+    """
+    Return the process-wide Whisper model, loading it on first call.
+    Raises RuntimeError if Whisper (or the model weights) are unavailable.
+    """
+    global _MODEL
+
+    if _MODEL is not None:
+        return _MODEL
+
+    with _LOAD_LOCK:
+        if _MODEL is None:
+            try:
+                _MODEL = _load_model()
+            except Exception as exc:
+                _STATS["error"] = str(exc)
+                print({"event": "whisper_load_failed", "model_size": WHISPER_MODEL_SIZE, "error": str(exc)})
+                raise RuntimeError("Whisper model not available; install dependencies.") from exc
+    return _MODEL
+
+
+def transcribe(audio, **options) -> dict:
+    """
+    Transcribe a path or 16 kHz float32 array with the shared model and IELTS decode options.
+    """
+    return get_whisper_model().transcribe(audio, **{**WHISPER_DECODE_OPTIONS, **options})
+
+
+def split_windows(samples: np.ndarray, sample_rate: int = 16000,
+                  window_seconds: float = WHISPER_WINDOW_SECONDS, search_seconds: float = 5.0) -> list:
+    """
+    Split a clip into pieces no longer than window_seconds. Each cut is placed at the
+    quietest 20 ms frame within the last search_seconds of the window, so words are
+    rarely split across windows.
+    """
+    window = int(window_seconds * sample_rate)
+    search = int(search_seconds * sample_rate)
+    frame = max(1, int(0.02 * sample_rate))
+
+    pieces = []
+    start = 0
+    while samples.size - start > window:
+        zone_start = start + window - search
+        zone = samples[zone_start:start + window]
+        n_frames = zone.size // frame
+        energy = np.square(zone[:n_frames * frame].astype(np.float64)).reshape(n_frames, frame).sum(axis=1)
+        cut = zone_start + (int(np.argmin(energy)) + 1) * frame
+        pieces.append(samples[start:cut])
+        start = cut
+    if samples.size - start > 0:
+        pieces.append(samples[start:])
+    return pieces
+
+
+# Punctuation attached to the neighbouring word in word timestamps (whisper.transcribe's defaults)
+_PREPEND_PUNCTUATIONS = "\"'“¿([{-"
+_APPEND_PUNCTUATIONS = "\"'.。,，!！?？:：”)]}、"
+
+
+class _EncodedWindow:
+    """
+    Stands in for the model in whisper.timing.find_alignment: the decoder runs on the
+    encoder output the greedy decode already computed instead of re-encoding the window.
+    """
+
+    def __init__(self, model, audio_features):
+        self._model = model
+        self._audio_features = audio_features.unsqueeze(0)
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+    def __call__(self, mel, tokens):
+        return self._model.decoder(tokens, self._audio_features)
+
+
+def _align_words(model, tokenizer, result, mel, n_samples: int, offset: float) -> list:
+    """Word timings for one decoded window, in seconds from the start of its clip."""
+    from whisper.audio import HOP_LENGTH
+    from whisper.timing import find_alignment, merge_punctuations
+
+    text_tokens = [token for token in result.tokens if token < tokenizer.eot]
+    alignment = find_alignment(
+        _EncodedWindow(model, result.audio_features), tokenizer, text_tokens, mel, n_samples // HOP_LENGTH
+    )
+    merge_punctuations(alignment, _PREPEND_PUNCTUATIONS, _APPEND_PUNCTUATIONS)
+    return [
+        {
+            "word": timing.word.strip(),
+            "start": round(offset + float(timing.start), 3),
+            "end": round(offset + float(timing.end), 3),
+            "probability": round(float(timing.probability), 3),
+        }
+        for timing in alignment
+        if timing.word.strip()
+    ]
+
+
+def transcribe_batch(clips: list, word_timestamps: bool = False) -> list:
+    """
+    Transcribe several 16 kHz float32 clips together: every clip is split into 30 s
+    windows, the padded log-mel windows are stacked into one batch, and the encoder
+    and greedy decoder run once per batch of up to WHISPER_MAX_BATCH_WINDOWS windows.
+    Returns one transcript per clip, in order. With word_timestamps, each item is
+    {"text", "words"} instead: words are {"word", "start", "end", "probability"} dicts
+    (seconds from the clip start), aligned by one teacher-forced decoder pass over the
+    encoder output of the same decode; "words" is None if alignment failed.
+    """
+    import torch
+    import whisper
+
+    model = get_whisper_model()
+    windows, owners, offsets = [], [], []
+    for idx, samples in enumerate(clips):
+        start = 0
+        for piece in split_windows(np.asarray(samples, dtype=np.float32)):
+            windows.append(piece)
+            owners.append(idx)
+            offsets.append(start / 16000.0)
+            start += piece.size
+
+    options = whisper.DecodingOptions(
+        task=WHISPER_DECODE_OPTIONS["task"],
+        language=WHISPER_DECODE_OPTIONS["language"],
+        temperature=WHISPER_DECODE_OPTIONS["temperature"],
+        beam_size=WHISPER_DECODE_OPTIONS["beam_size"],
+        best_of=WHISPER_DECODE_OPTIONS["best_of"],
+        fp16=WHISPER_DECODE_OPTIONS["fp16"],
+        without_timestamps=True,
+    )
+    tokenizer = whisper.tokenizer.get_tokenizer(
+        model.is_multilingual,
+        num_languages=model.num_languages,
+        language=options.language,
+        task=options.task,
+    ) if word_timestamps else None
+
+    texts = [[] for _ in clips]
+    words = [[] for _ in clips]
+    step = max(1, WHISPER_MAX_BATCH_WINDOWS)
+    for offset in range(0, len(windows), step):
+        chunk = windows[offset:offset + step]
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(piece)), n_mels=model.dims.n_mels)
+            for piece in chunk
+        ]).to(model.device)
+        with torch.no_grad():
+            results = whisper.decode(model, mel, options)
+        for index, (owner, result) in enumerate(zip(owners[offset:offset + step], results), start=offset):
+            # Same silence rule as whisper.transcribe (no_speech_threshold / logprob_threshold)
+            if result.no_speech_prob > 0.6 and result.avg_logprob < -1.0:
+                continue
+            if not result.text.strip():
+                continue
+            texts[owner].append(result.text.strip())
+            if word_timestamps and words[owner] is not None:
+                try:
+                    words[owner].extend(_align_words(
+                        model, tokenizer, result, mel[index - offset], windows[index].size, offsets[index]
+                    ))
+                except Exception as exc:
+                    print({"event": "word_alignment_failed", "error": str(exc)})
+                    words[owner] = None
+
+    if word_timestamps:
+        return [{"text": " ".join(parts), "words": clip_words} for parts, clip_words in zip(texts, words)]
+    return [" ".join(parts) for parts in texts]
+
+
+def warm_up_whisper() -> dict:
+    """
+    Load the model now instead of on the first request.
+    Never raises: failures are recorded in the returned stats.
+    """
+    try:
+        get_whisper_model()
+    except RuntimeError:
+        pass
+    return whisper_model_stats()
+
+
+def whisper_model_stats() -> dict:
+    return dict(_STATS)